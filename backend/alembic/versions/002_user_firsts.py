@@ -0,0 +1,48 @@
+"""Per-user firsts index for new_region / new_country bonuses
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16 00:00:00
+
+Backfills the index from existing visits. The bonus now goes to the user's
+earliest active visit to a region/country within each calendar-year season;
+run ``python -m app.cli recalculate`` afterwards to rescore point_logs.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "002"
+down_revision = "001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_firsts",
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("season", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(16), nullable=False),
+        sa.Column("ref_id", sa.Integer(), nullable=False),
+        sa.Column("visit_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], name="fk_user_firsts_user_id_users"),
+        sa.ForeignKeyConstraint(["visit_id"], ["visits.id"], name="fk_user_firsts_visit_id_visits"),
+        sa.PrimaryKeyConstraint("user_id", "season", "kind", "ref_id", name="pk_user_firsts"),
+    )
+
+    for kind, column in (("region", "region_id"), ("country", "country_id")):
+        op.execute(f"""
+            INSERT INTO user_firsts (user_id, season, kind, ref_id, visit_id)
+            SELECT DISTINCT ON (vp.user_id, EXTRACT(YEAR FROM v.visited_at AT TIME ZONE 'UTC'), b.{column})
+                   vp.user_id, EXTRACT(YEAR FROM v.visited_at AT TIME ZONE 'UTC')::int, '{kind}', b.{column}, v.id
+            FROM visits v
+            JOIN visit_participants vp ON vp.visit_id = v.id
+            JOIN baths b ON b.id = v.bath_id
+            WHERE v.status IN ('confirmed', 'draft', 'pending') AND b.{column} IS NOT NULL
+            ORDER BY vp.user_id, EXTRACT(YEAR FROM v.visited_at AT TIME ZONE 'UTC'), b.{column},
+                     v.visited_at, v.created_at, v.id
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table("user_firsts")
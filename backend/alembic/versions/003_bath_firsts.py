@@ -0,0 +1,47 @@
+"""Bath first-visit index for the ultraunique bonus
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16 00:00:00
+
+Backfills the index from existing visits: the first active visit to each
+bath on or after ULTRAUNIQUE_START_DATE, same-day visits ordered by
+created_at. Run ``python -m app.cli recalculate`` afterwards to rescore
+point_logs.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bath_firsts",
+        sa.Column("bath_id", sa.Integer(), nullable=False),
+        sa.Column("visit_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["bath_id"], ["baths.id"], name="fk_bath_firsts_bath_id_baths"),
+        sa.ForeignKeyConstraint(["visit_id"], ["visits.id"], name="fk_bath_firsts_visit_id_visits"),
+        sa.PrimaryKeyConstraint("bath_id", name="pk_bath_firsts"),
+    )
+
+    op.execute(
+        sa.text("""
+            INSERT INTO bath_firsts (bath_id, visit_id)
+            SELECT DISTINCT ON (v.bath_id) v.bath_id, v.id
+            FROM visits v
+            WHERE v.bath_id IS NOT NULL
+              AND v.status IN ('confirmed', 'draft', 'pending')
+              AND v.visited_at >= CAST(:start AS timestamptz)
+            ORDER BY v.bath_id, date(v.visited_at AT TIME ZONE 'UTC'), v.created_at, v.id
+        """).bindparams(start=settings.ULTRAUNIQUE_START_DATE)
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("bath_firsts")
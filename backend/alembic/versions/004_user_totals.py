@@ -0,0 +1,57 @@
+"""Materialized per-user totals
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16 00:00:00
+
+user_totals / user_season_totals hold SUM(points) and the number of scored
+visits per user, kept up to date as point_logs are rewritten. Backfilled
+from the current point_logs.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_season_totals",
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("season", sa.Integer(), nullable=False),
+        sa.Column("points", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("visit_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], name="fk_user_season_totals_user_id_users"),
+        sa.PrimaryKeyConstraint("user_id", "season", name="pk_user_season_totals"),
+    )
+    op.create_table(
+        "user_totals",
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("points", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("visit_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], name="fk_user_totals_user_id_users"),
+        sa.PrimaryKeyConstraint("user_id", name="pk_user_totals"),
+    )
+
+    op.execute("""
+        INSERT INTO user_season_totals (user_id, season, points, visit_count)
+        SELECT pl.user_id, EXTRACT(YEAR FROM v.visited_at AT TIME ZONE 'UTC')::int,
+               SUM(pl.points), COUNT(*) FILTER (WHERE pl.reason = 'base')
+        FROM point_logs pl
+        JOIN visits v ON v.id = pl.visit_id
+        GROUP BY pl.user_id, EXTRACT(YEAR FROM v.visited_at AT TIME ZONE 'UTC')::int
+    """)
+    op.execute("""
+        INSERT INTO user_totals (user_id, points, visit_count)
+        SELECT user_id, SUM(points), SUM(visit_count)
+        FROM user_season_totals
+        GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("user_totals")
+    op.drop_table("user_season_totals")
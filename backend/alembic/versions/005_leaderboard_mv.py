@@ -0,0 +1,39 @@
+"""Leaderboard materialized view
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16 00:00:00
+
+Points and scored visits per (user, season, region) for the DB-backed
+leaderboard (LEADERBOARD_SOURCE=db). The unique index allows
+REFRESH MATERIALIZED VIEW CONCURRENTLY.
+"""
+from alembic import op
+
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS leaderboard_mv AS
+        SELECT pl.user_id,
+               EXTRACT(YEAR FROM v.visited_at)::int AS season,
+               COALESCE(b.region_id, 0) AS region_id,
+               SUM(pl.points) AS points,
+               COUNT(*) FILTER (WHERE pl.reason = 'base') AS visit_count
+        FROM point_logs pl
+        JOIN visits v ON v.id = pl.visit_id
+        LEFT JOIN baths b ON b.id = v.bath_id
+        GROUP BY 1, 2, 3
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS uq_leaderboard_mv
+        ON leaderboard_mv (user_id, season, region_id)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS leaderboard_mv")
@@ -0,0 +1,47 @@
+"""Weekly per-user totals
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16 00:00:00
+
+Points and scored visits per user and ISO week (in settings.TIMEZONE),
+backfilled from point_logs. Serves /api/visits/weekly and the bot /week.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "weekly_totals",
+        sa.Column("iso_year", sa.Integer(), nullable=False),
+        sa.Column("iso_week", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("points", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("visit_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], name="fk_weekly_totals_user_id_users"),
+        sa.PrimaryKeyConstraint("iso_year", "iso_week", "user_id", name="pk_weekly_totals"),
+    )
+
+    op.execute(sa.text("""
+        INSERT INTO weekly_totals (user_id, iso_year, iso_week, points, visit_count)
+        SELECT pl.user_id,
+               EXTRACT(ISOYEAR FROM timezone(:tz, v.visited_at))::int AS iso_year,
+               EXTRACT(WEEK FROM timezone(:tz, v.visited_at))::int AS iso_week,
+               SUM(pl.points), COUNT(*) FILTER (WHERE pl.reason = 'base')
+        FROM point_logs pl
+        JOIN visits v ON v.id = pl.visit_id
+        GROUP BY 1, 2, 3
+    """).bindparams(tz=settings.TIMEZONE))
+
+
+def downgrade() -> None:
+    op.drop_table("weekly_totals")
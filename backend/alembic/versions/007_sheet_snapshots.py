@@ -0,0 +1,30 @@
+"""Persistent Google Sheets snapshots
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16 00:00:00
+
+Lets workers start with the last fetched spreadsheet values instead of
+blocking on Google, and share fresh fetches with each other.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sheet_snapshots",
+        sa.Column("spreadsheet_id", sa.String(128), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("spreadsheet_id", name="pk_sheet_snapshots"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sheet_snapshots")
@@ -0,0 +1,42 @@
+"""DB-to-Sheets export bookkeeping
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16 00:00:00
+
+sheet_export_state keeps the high-water mark (last exported updated_at) of
+each export stream; sheet_export_rows maps exported records to their row.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sheet_export_state",
+        sa.Column("stream", sa.String(32), nullable=False),
+        sa.Column("high_water", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("stream", name="pk_sheet_export_state"),
+    )
+    op.create_table(
+        "sheet_export_rows",
+        sa.Column("sheet", sa.String(128), nullable=False),
+        sa.Column("key", sa.String(64), nullable=False),
+        sa.Column("row", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("sheet", "key", name="pk_sheet_export_rows"),
+    )
+    # Change readers scan by updated_at past the high-water mark
+    op.create_index("ix_visits_updated_at", "visits", ["updated_at"])
+    op.create_index("ix_weekly_totals_updated_at", "weekly_totals", ["updated_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_weekly_totals_updated_at", table_name="weekly_totals")
+    op.drop_index("ix_visits_updated_at", table_name="visits")
+    op.drop_table("sheet_export_rows")
+    op.drop_table("sheet_export_state")
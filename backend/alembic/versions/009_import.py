@@ -0,0 +1,36 @@
+"""Historical workbook import bookkeeping
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16 00:00:00
+
+visits.source marks visits created by an importer (one value per imported
+sheet, so a sheet can be re-imported); imported_sheets records finished
+sheets so an interrupted import resumes where it stopped.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("visits", sa.Column("source", sa.String(255), nullable=True))
+    op.create_index("ix_visits_source", "visits", ["source"])
+    op.create_table(
+        "imported_sheets",
+        sa.Column("source", sa.String(255), nullable=False),
+        sa.Column("sheet", sa.String(128), nullable=False),
+        sa.Column("visits", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("source", "sheet", name="pk_imported_sheets"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("imported_sheets")
+    op.drop_index("ix_visits_source", table_name="visits")
+    op.drop_column("visits", "source")
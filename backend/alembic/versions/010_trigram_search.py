@@ -0,0 +1,46 @@
+"""Trigram indexes for bath and user search
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16 00:00:00
+
+pg_trgm GIN indexes on the search text of baths (name and aliases) and
+users (full name and username). The search text is built by IMMUTABLE SQL
+functions so that it can be indexed and the index matches the queries in
+app/services/search.py.
+"""
+from alembic import op
+
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bath_search_text(name varchar, aliases varchar[])
+        RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE AS
+        $$ SELECT coalesce(name, '') || ' ' || coalesce(array_to_string(aliases, ' '), '') $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION user_search_text(full_name varchar, username varchar)
+        RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE AS
+        $$ SELECT coalesce(full_name, '') || ' ' || coalesce(username, '') $$
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_baths_search_trgm
+        ON baths USING gin (bath_search_text(name, aliases) gin_trgm_ops)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_users_search_trgm
+        ON users USING gin (user_search_text(full_name, username) gin_trgm_ops)
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_users_search_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_baths_search_trgm")
+    op.execute("DROP FUNCTION IF EXISTS user_search_text(varchar, varchar)")
+    op.execute("DROP FUNCTION IF EXISTS bath_search_text(varchar, varchar[])")
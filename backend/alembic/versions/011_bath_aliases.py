@@ -0,0 +1,36 @@
+"""Learned bath aliases
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-16 00:00:00
+
+visits.bath_query keeps the bath text of the mention a visit was created
+from; bath_aliases records that text (normalized) once a user confirms
+which bath it meant, with the number of confirmations.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "011"
+down_revision = "010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("visits", sa.Column("bath_query", sa.String(512), nullable=True))
+    op.create_table(
+        "bath_aliases",
+        sa.Column("alias", sa.String(512), primary_key=True),
+        sa.Column("bath_id", sa.Integer(), sa.ForeignKey("baths.id"), nullable=False),
+        sa.Column("hits", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("last_used_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_bath_aliases_bath_id", "bath_aliases", ["bath_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bath_aliases_bath_id", table_name="bath_aliases")
+    op.drop_table("bath_aliases")
+    op.drop_column("visits", "bath_query")
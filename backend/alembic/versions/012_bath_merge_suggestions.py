@@ -0,0 +1,39 @@
+"""Duplicate bath merge suggestions
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-16 00:00:00
+
+bath_merge_suggestions holds the report of the duplicate detection job
+(app/services/duplicates.py): pairs of baths that look like the same place,
+ranked by score, until an admin applies or dismisses them.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "012"
+down_revision = "011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bath_merge_suggestions",
+        sa.Column("source_id", sa.Integer(), sa.ForeignKey("baths.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("target_id", sa.Integer(), sa.ForeignKey("baths.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("name_score", sa.Float(), nullable=False),
+        sa.Column("distance_km", sa.Float(), nullable=True),
+        sa.Column("same_region", sa.Boolean(), nullable=True),
+        sa.Column("same_country", sa.Boolean(), nullable=True),
+        sa.Column("status", sa.String(16), nullable=False, server_default="pending"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("source_id", "target_id", name="pk_bath_merge_suggestions"),
+    )
+    op.create_index("ix_bath_merge_suggestions_status_score", "bath_merge_suggestions", ["status", "score"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bath_merge_suggestions_status_score", table_name="bath_merge_suggestions")
+    op.drop_table("bath_merge_suggestions")
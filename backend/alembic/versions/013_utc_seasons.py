@@ -0,0 +1,45 @@
+"""Seasons by UTC calendar year in the leaderboard view
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-16 00:00:00
+
+leaderboard_mv took the season from EXTRACT(YEAR FROM visited_at), which
+follows the session TimeZone, while the scoring code uses the UTC year.
+Visits around New Year could land in different seasons. The view is
+recreated with the year taken at UTC explicitly.
+"""
+from alembic import op
+
+revision = "013"
+down_revision = "012"
+branch_labels = None
+depends_on = None
+
+VIEW_SQL = """
+    CREATE MATERIALIZED VIEW leaderboard_mv AS
+    SELECT pl.user_id,
+           EXTRACT(YEAR FROM v.visited_at{tz})::int AS season,
+           COALESCE(b.region_id, 0) AS region_id,
+           SUM(pl.points) AS points,
+           COUNT(*) FILTER (WHERE pl.reason = 'base') AS visit_count
+    FROM point_logs pl
+    JOIN visits v ON v.id = pl.visit_id
+    LEFT JOIN baths b ON b.id = v.bath_id
+    GROUP BY 1, 2, 3
+"""
+INDEX_SQL = "CREATE UNIQUE INDEX uq_leaderboard_mv ON leaderboard_mv (user_id, season, region_id)"
+
+
+def _recreate(tz: str) -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS leaderboard_mv")
+    op.execute(VIEW_SQL.format(tz=tz))
+    op.execute(INDEX_SQL)
+
+
+def upgrade() -> None:
+    _recreate(" AT TIME ZONE 'UTC'")
+
+
+def downgrade() -> None:
+    _recreate("")
@@ -0,0 +1,33 @@
+"""Stamp weekly_totals at commit
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-16 00:00:00
+
+weekly_totals.updated_at defaulted to now(), the start of the writing
+transaction, so a long transaction could commit rows stamped behind a
+Sheets export mark that had already moved on. Writers now leave it NULL
+and app.services.points stamps the rows with clock_timestamp() just
+before the transaction commits; the partial index finds them.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "014"
+down_revision = "013"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column("weekly_totals", "updated_at", nullable=True, server_default=None)
+    op.create_index(
+        "ix_weekly_totals_unstamped", "weekly_totals", ["iso_year"],
+        postgresql_where=sa.text("updated_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_weekly_totals_unstamped", table_name="weekly_totals")
+    op.execute("UPDATE weekly_totals SET updated_at = now() WHERE updated_at IS NULL")
+    op.alter_column("weekly_totals", "updated_at", nullable=False, server_default=sa.func.now())
@@ -0,0 +1,39 @@
+"""Count participations in user_totals.visit_count
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-16 00:00:00
+
+user_totals.visit_count counted scored visits (base point_logs), which
+include drafts and leave out visits without a bath. It now counts a
+user's participations in confirmed and pending visits, the number the
+bot's /me and GET /users/me show; app.services.points keeps it up to date.
+"""
+from alembic import op
+
+revision = "015"
+down_revision = "014"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE user_totals SET visit_count = 0")
+    op.execute("""
+        INSERT INTO user_totals (user_id, points, visit_count)
+        SELECT vp.user_id, 0, COUNT(*)
+        FROM visit_participants vp
+        JOIN visits v ON v.id = vp.visit_id
+        WHERE v.status IN ('confirmed', 'pending')
+        GROUP BY vp.user_id
+        ON CONFLICT (user_id) DO UPDATE SET visit_count = EXCLUDED.visit_count
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        UPDATE user_totals ut
+        SET visit_count = COALESCE(
+            (SELECT SUM(visit_count) FROM user_season_totals ust WHERE ust.user_id = ut.user_id), 0
+        )
+    """)
@@ -0,0 +1,25 @@
+"""Deactivate users created by the workbook import
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-16 00:00:00
+
+The ЕБЛ.xlsx importer gives people who are not Telegram users synthetic
+negative ids. It created them active, so they showed up in leaderboards,
+/top and user search; it now creates them inactive, and existing ones
+are deactivated here.
+"""
+from alembic import op
+
+revision = "016"
+down_revision = "015"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE users SET is_active = false WHERE id < 0")
+
+
+def downgrade() -> None:
+    op.execute("UPDATE users SET is_active = true WHERE id < 0")
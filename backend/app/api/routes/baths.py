@@ -1,16 +1,21 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
 from pydantic import BaseModel
-from sqlalchemy import select, func
+from sqlalchemy import delete, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime, timedelta
 import os
 
 from app.db.session import get_db
-from app.db.models import User, Bath, Country, Region, Visit, VisitParticipant
+from app.db.models import User, Bath, BathAlias, Country, Region, Visit, VisitParticipant
 from app.api.deps import get_current_user, get_admin_user
-from app.services.bath import create_bath, merge_baths
+from app.services.bath import create_bath, drop_merge_suggestions, merge_baths, nearby_baths
 from app.services import sheets as sheets_svc
+from app.services import bath_index
+from app.services import duplicates as duplicates_svc
+from app.services.points import recalculate_cascade, visit_dependencies
+from app.services.sheets_export import schedule_export, touch_visits
+from app.services import search as search_svc
 from app.config import settings
 
 router = APIRouter(prefix="/baths", tags=["baths"])
@@ -45,17 +50,28 @@ def bath_to_dict(bath: Bath) -> dict:
 @router.get("")
 async def list_baths(
     q: Optional[str] = None,
+    mode: str = Query("contains", pattern="^(contains|similar)$"),
     include_archived: bool = False,
     limit: int = Query(50, le=200),
     offset: int = 0,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    """List baths; with *q*, those whose name or an alias matches it.
+
+    mode=contains matches substrings (alphabetical), mode=similar is
+    typo-tolerant and ranked by similarity (returned as "similarity").
+    """
+    if q:
+        found = await search_svc.search_baths(db, q, mode, include_archived, limit, offset)
+        return [
+            bath_to_dict(b) | ({"similarity": score} if score is not None else {})
+            for b, score in found
+        ]
+
     query = select(Bath)
     if not include_archived:
         query = query.where(Bath.is_archived == False)
-    if q:
-        query = query.where(Bath.name.ilike(f"%{q}%"))
     query = query.order_by(Bath.name).limit(limit).offset(offset)
     result = await db.execute(query)
     return [bath_to_dict(b) for b in result.scalars().all()]
@@ -97,6 +113,90 @@ async def bath_map(
     return data
 
 
+@router.get("/nearby")
+async def list_nearby_baths(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(10, gt=0, le=1000),
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Active baths within *radius* km of (lat, lng), nearest first."""
+    found = await nearby_baths(db, lat, lng, radius, limit)
+    return [bath_to_dict(b) | {"distance_km": round(km, 3)} for b, km in found]
+
+
+def _suggestion_to_dict(s, baths: dict[int, Bath]) -> dict:
+    return {
+        "source": bath_to_dict(baths[s.source_id]),
+        "target": bath_to_dict(baths[s.target_id]),
+        "score": s.score,
+        "name_score": s.name_score,
+        "distance_km": s.distance_km,
+        "same_region": s.same_region,
+        "same_country": s.same_country,
+        "created_at": s.created_at.isoformat(),
+    }
+
+
+@router.get("/duplicates")
+async def list_duplicates(
+    min_score: float = 0,
+    limit: int = Query(100, le=500),
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(get_admin_user),
+):
+    """Pending merge suggestions of the duplicate job, best first."""
+    report = await duplicates_svc.get_report(db, min_score, limit)
+    ids = {s.source_id for s in report} | {s.target_id for s in report}
+    q = await db.execute(select(Bath).where(Bath.id.in_(ids)))
+    baths = {b.id: b for b in q.scalars().all()}
+    return [_suggestion_to_dict(s, baths) for s in report]
+
+
+@router.post("/duplicates/scan")
+async def scan_duplicates(
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(get_admin_user),
+):
+    """Rebuild the report now instead of waiting for the scheduled scan."""
+    count = await duplicates_svc.scan(db)
+    if count is None:
+        raise HTTPException(409, "A duplicate scan is already running")
+    return {"suggestions": count}
+
+
+class DuplicatePairs(BaseModel):
+    pairs: Optional[list[tuple[int, int]]] = None  # (source_id, target_id)
+    min_score: Optional[float] = None
+
+
+@router.post("/duplicates/apply")
+async def apply_duplicates(
+    data: DuplicatePairs,
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(get_admin_user),
+):
+    """Merge the given suggestions, or all scoring at least min_score."""
+    if data.pairs is None and data.min_score is None:
+        raise HTTPException(400, "Give pairs or min_score")
+    merged = await duplicates_svc.apply_suggestions(db, data.pairs, data.min_score)
+    return {"merged": merged}
+
+
+@router.post("/duplicates/dismiss")
+async def dismiss_duplicates(
+    data: DuplicatePairs,
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(get_admin_user),
+):
+    """Mark suggestions as not duplicates; they are not suggested again."""
+    if not data.pairs:
+        raise HTTPException(400, "Give pairs")
+    return {"dismissed": await duplicates_svc.dismiss_suggestions(db, data.pairs)}
+
+
 @router.get("/{bath_id}")
 async def get_bath(
     bath_id: int,
@@ -155,9 +255,35 @@ async def update_bath(
     bath = q.scalar_one_or_none()
     if not bath:
         raise HTTPException(404, "Bath not found")
-    for field, value in data.model_dump(exclude_none=True).items():
+    updates = data.model_dump(exclude_none=True)
+    relocated = any(
+        field in updates and updates[field] != getattr(bath, field)
+        for field in ("region_id", "country_id")
+    )
+    if relocated:
+        # Region/country bonuses of the bath's visits depend on user_firsts
+        # keyed by the old and new region/country
+        visits_q = await db.execute(select(Visit.id).where(Visit.bath_id == bath_id))
+        visit_ids = list(visits_q.scalars().all())
+        before = await visit_dependencies(db, visit_ids)
+    renamed = "name" in updates and updates["name"] != bath.name
+    for field, value in updates.items():
         setattr(bath, field, value)
-    await db.commit()
+    if renamed:
+        # The Sheets export picks visits up by updated_at; their rows show the bath name
+        touch_visits(db, select(Visit.id).where(Visit.bath_id == bath_id))
+    if updates.keys() & {"name", "aliases", "is_archived", "lat", "lng"}:
+        await bath_index.changed(db, bath_id)
+    if updates.get("is_archived"):
+        await drop_merge_suggestions(db, bath_id)
+    if relocated:
+        await db.flush()
+        # Commits; the leaderboard (split by the bath's region) is refreshed too
+        await recalculate_cascade(db, visit_ids, before)
+    else:
+        await db.commit()
+        if renamed:
+            schedule_export()
     await db.refresh(bath)
     return bath_to_dict(bath)
 
@@ -172,7 +298,9 @@ async def delete_bath(
     bath = q.scalar_one_or_none()
     if not bath:
         raise HTTPException(404, "Bath not found")
+    await db.execute(delete(BathAlias).where(BathAlias.bath_id == bath_id))
     await db.delete(bath)
+    await bath_index.changed(db, bath_id)
     await db.commit()
     return {"ok": True}
 
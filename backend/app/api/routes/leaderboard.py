@@ -1,10 +1,15 @@
 import os
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
 
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
 from app.db.models import User
 from app.api.deps import get_current_user
 from app.services import sheets as sheets_svc
+from app.services import leaderboard as leaderboard_svc
 from app.config import settings
 
 router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
@@ -19,9 +24,22 @@ def _creds() -> str:
 
 @router.get("")
 async def get_leaderboard(
+    season: Optional[int] = None,
+    region_id: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Overall standings from Google Sheets 'Общий зачет'."""
+    """Overall standings, from the DB or Google Sheets 'Общий зачет'
+    depending on LEADERBOARD_SOURCE. Season and region filters need the DB.
+    The DB returns pages of 100 by default; the Sheets table is returned
+    whole unless *limit* is given."""
+    if settings.LEADERBOARD_SOURCE == "db":
+        return await leaderboard_svc.get_leaderboard(db, season, region_id, limit or 100, offset)
+    if season is not None or region_id is not None:
+        raise HTTPException(400, "Season and region filters require LEADERBOARD_SOURCE=db")
+
     try:
         rows = await sheets_svc.get_overall_stats(
             _creds(), settings.GOOGLE_SPREADSHEET_ID
@@ -29,7 +47,7 @@ async def get_leaderboard(
     except Exception as e:
         raise HTTPException(500, f"Sheets error: {e}")
 
-    return [
+    ranked = [
         {
             "rank": i + 1,
             "name": row["name"],
@@ -38,3 +56,4 @@ async def get_leaderboard(
         }
         for i, row in enumerate(rows)
     ]
+    return ranked[offset:] if limit is None else ranked[offset:offset + limit]
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Query, HTTPException
+from pydantic import BaseModel, Field
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
@@ -8,6 +8,14 @@ from app.db.session import get_db
 from app.db.models import User
 from app.db.models.config import PointConfig, DEFAULT_CONFIG
 from app.api.deps import get_admin_user
+from app.services.points import (
+    recalculate_season, rescore_for_config_change, get_config,
+    invalidate_config, config_version, CONFIG_CHANNEL,
+)
+from app.services.notify import notify
+from app.services import jobs
+from app.services import sheets as sheets_svc
+from app.services.simulator import simulate
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
@@ -41,6 +49,7 @@ async def update_settings(
     admin: User = Depends(get_admin_user),
 ):
     updates = data.model_dump(exclude_none=True)
+    old_cfg = await get_config(db)
     for key, value in updates.items():
         q = await db.execute(select(PointConfig).where(PointConfig.key == key))
         cfg = q.scalar_one_or_none()
@@ -49,5 +58,81 @@ async def update_settings(
         else:
             _, desc = DEFAULT_CONFIG.get(key, (value, ""))
             db.add(PointConfig(key=key, value=value, description=desc))
+    await notify(db, CONFIG_CHANNEL)
     await db.commit()
-    return {"status": "ok", "updated": list(updates.keys())}
+    invalidate_config()
+
+    # Existing point_logs are brought in line in the background
+    new_cfg = await get_config(db)
+    job = None
+    if new_cfg != old_cfg:
+        # A superseded, failed or cancelled job may have left point_logs
+        # half-way: unless the latest one finished, redo everything
+        previous = jobs.list_jobs("rescore")
+        incomplete = bool(previous) and previous[0].status != "done"
+        job = jobs.start_job(
+            "rescore",
+            lambda job: rescore_for_config_change(job, old_cfg, new_cfg, recompute=incomplete),
+            reason="settings",
+        )
+    return {
+        "status": "ok",
+        "updated": list(updates.keys()),
+        "version": config_version(),
+        "job": job.to_dict() if job else None,
+    }
+
+
+@router.post("/recalculate")
+async def recalculate_points(
+    season: Optional[int] = Query(None, description="Only rescore visits of this year"),
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(get_admin_user),
+):
+    """Rescore all visits (or one season) and rewrite point_logs in bulk."""
+    stats = await recalculate_season(db, season=season)
+    return {"status": "ok", **stats}
+
+
+@router.get("/jobs")
+async def list_jobs(
+    admin: User = Depends(get_admin_user),
+):
+    return [job.to_dict() for job in jobs.list_jobs()]
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    admin: User = Depends(get_admin_user),
+):
+    job = jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return job.to_dict()
+
+
+@router.get("/sheets-cache")
+async def sheets_cache_stats(
+    admin: User = Depends(get_admin_user),
+):
+    """Google Sheets cache counters of this worker."""
+    return sheets_svc.cache_stats()
+
+
+class SimulationRequest(BaseModel):
+    variants: list[SettingsUpdate]
+    season: Optional[int] = None
+    limit: int = Field(20, ge=1, le=500)
+
+
+@router.post("/simulate")
+async def simulate_settings(
+    data: SimulationRequest,
+    db: AsyncSession = Depends(get_db),
+    admin: User = Depends(get_admin_user),
+):
+    """Leaderboards for candidate weights; unset keys keep their current value."""
+    current = await get_config(db)
+    variants = [{**current, **v.model_dump(exclude_none=True)} for v in data.variants] or [current]
+    return await simulate(db, variants, season=data.season, limit=data.limit)
@@ -5,27 +5,27 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
 from app.db.session import get_db
-from app.db.models import User, PointLog, VisitParticipant, Visit
+from app.db.models import User, UserTotal, UserSeasonTotal
 from app.api.deps import get_current_user, get_admin_user
+from app.services import search as search_svc
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 async def user_stats(user: User, db: AsyncSession) -> dict:
-    pts_q = await db.execute(
-        select(func.sum(PointLog.points)).where(PointLog.user_id == user.id)
+    """Points and visit_count (confirmed and pending participations) from
+    user_totals; a season's visit_count counts scored visits (drafts
+    included, visits without a bath not)."""
+    totals_q = await db.execute(
+        select(UserTotal.points, UserTotal.visit_count).where(UserTotal.user_id == user.id)
     )
-    points = pts_q.scalar() or 0.0
-
-    visits_q = await db.execute(
-        select(func.count(VisitParticipant.visit_id))
-        .join(Visit, Visit.id == VisitParticipant.visit_id)
-        .where(
-            VisitParticipant.user_id == user.id,
-            Visit.status.in_(["confirmed", "pending"]),
-        )
+    points, visit_count = totals_q.one_or_none() or (0.0, 0)
+
+    seasons_q = await db.execute(
+        select(UserSeasonTotal.season, UserSeasonTotal.points, UserSeasonTotal.visit_count)
+        .where(UserSeasonTotal.user_id == user.id)
+        .order_by(UserSeasonTotal.season.desc())
     )
-    visit_count = visits_q.scalar() or 0
 
     return {
         "id": user.id,
@@ -34,6 +34,10 @@ async def user_stats(user: User, db: AsyncSession) -> dict:
         "is_admin": user.is_admin,
         "points": float(points),
         "visit_count": visit_count,
+        "seasons": [
+            {"season": season, "points": float(pts), "visit_count": visits}
+            for season, pts, visits in seasons_q.all()
+        ],
     }
 
 
@@ -48,20 +52,17 @@ async def get_me(
 @router.get("/search")
 async def search_users(
     q: str = Query(..., min_length=1),
+    mode: str = Query("contains", pattern="^(contains|similar)$"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    result = await db.execute(
-        select(User)
-        .where(
-            User.is_active == True,
-            (User.full_name.ilike(f"%{q}%")) | (User.username.ilike(f"%{q}%"))
-        )
-        .order_by(User.full_name)
-        .limit(10)
-    )
-    users = result.scalars().all()
-    return [{"id": u.id, "full_name": u.full_name, "username": u.username} for u in users]
+    """Active users whose name or username matches *q* (see GET /baths for modes)."""
+    found = await search_svc.search_users(db, q, mode)
+    return [
+        {"id": u.id, "full_name": u.full_name, "username": u.username}
+        | ({"similarity": score} if score is not None else {})
+        for u, score in found
+    ]
 
 
 @router.get("/{user_id}")
@@ -83,9 +84,8 @@ async def list_users(
     admin: User = Depends(get_admin_user),
 ):
     result = await db.execute(
-        select(User, func.coalesce(func.sum(PointLog.points), 0).label("pts"))
-        .outerjoin(PointLog, PointLog.user_id == User.id)
-        .group_by(User.id)
+        select(User, func.coalesce(UserTotal.points, 0).label("pts"))
+        .outerjoin(UserTotal, UserTotal.user_id == User.id)
         .order_by(User.full_name)
     )
     rows = result.all()
@@ -5,13 +5,15 @@ from pydantic import BaseModel
 from sqlalchemy import select, and_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 
 from app.db.session import get_db
 from app.db.models import User, Visit, VisitParticipant, Bath, PointLog
 from app.api.deps import get_current_user, get_admin_user
 from app.services.visit import set_visit_status, update_participants, set_flag_long, update_visit_bath
 from app.services import sheets as sheets_svc
+from app.services import leaderboard as leaderboard_svc
 from app.config import settings
 
 router = APIRouter(prefix="/visits", tags=["visits"])
@@ -71,27 +73,44 @@ async def visit_to_dict(visit: Visit, db: AsyncSession) -> dict:
 
 @router.get("/weekly")
 async def weekly_stats(
-    week: Optional[int] = None,
+    week: Optional[int] = Query(None, ge=1, le=53),
+    year: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Per-person visit counts for a given week from Google Sheets 'Недельный зачет'."""
-    now = datetime.now(timezone.utc)
+    """Per-person visits and points for an ISO week (in settings.TIMEZONE).
+
+    Read from the weekly_totals rollup with LEADERBOARD_SOURCE=db, otherwise
+    from Google Sheets 'Недельный зачет' (current season only).
+    """
+    now = datetime.now(ZoneInfo(settings.TIMEZONE)).isocalendar()
+    if year is None:
+        year = now.year
     if week is None:
-        week = now.isocalendar()[1]
+        week = now.week
 
-    week_start = datetime.fromisocalendar(now.year, week, 1).replace(tzinfo=timezone.utc)
+    try:
+        week_start = datetime.fromisocalendar(year, week, 1)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     week_end = week_start + timedelta(days=6)
     date_range = f"{week_start.strftime('%-d %b')} – {week_end.strftime('%-d %b')}"
 
-    try:
-        report = await sheets_svc.get_weekly_stats(
-            _creds(), settings.GOOGLE_SPREADSHEET_ID, week
-        )
-    except Exception as e:
-        raise HTTPException(500, f"Sheets error: {e}")
+    if settings.LEADERBOARD_SOURCE == "db":
+        weekly = await leaderboard_svc.get_weekly(db, year, week)
+    else:
+        if year != now.year:
+            raise HTTPException(400, "Past seasons require LEADERBOARD_SOURCE=db")
+        try:
+            report = await sheets_svc.get_weekly_stats(
+                _creds(), settings.GOOGLE_SPREADSHEET_ID, week
+            )
+        except Exception as e:
+            raise HTTPException(500, f"Sheets error: {e}")
+        weekly = report["weekly"]
 
-    weekly = report["weekly"]
     return {
+        "year": year,
         "week": week,
         "date_range": date_range,
         "rows": [
@@ -99,6 +118,7 @@ async def weekly_stats(
                 "rank": i + 1,
                 "name": row["name"],
                 "visit_count": row["visit_count"],
+                "points": row["points"],
                 "total_visits": row.get("total_visits", 0),
             }
             for i, row in enumerate(weekly)
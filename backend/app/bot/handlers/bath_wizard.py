@@ -149,7 +149,7 @@ async def wizard_got_geo(message: Message, state: FSMContext):
             lat=lat,
             lng=lng,
         )
-        visit = await update_visit_bath(db, visit_id, bath.id)
+        visit = await update_visit_bath(db, visit_id, bath.id, learn=True)
         q = await db.execute(select(Visit).where(Visit.id == visit_id))
         visit = q.scalar_one()
 
@@ -228,7 +228,7 @@ async def cb_bath_select(callback: CallbackQuery):
     visit_id = int(parts[2])
     bath_id = int(parts[3])
     async with AsyncSessionLocal() as db:
-        visit = await update_visit_bath(db, visit_id, bath_id)
+        visit = await update_visit_bath(db, visit_id, bath_id, learn=True)
         card_text = await build_card_text(visit, db)
         keyboard = visit_card_keyboard(
             visit_id=visit.id, flag_long=visit.flag_long, bath_id=visit.bath_id
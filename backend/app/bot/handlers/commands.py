@@ -1,15 +1,17 @@
 from aiogram import Router
 from aiogram.filters import Command
 from aiogram.types import Message
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 import os
 
 from app.db.session import AsyncSessionLocal
-from app.db.models import User, PointLog, Visit, VisitParticipant, Bath
+from app.db.models import User, UserTotal, Bath
 from app.services.visit import get_or_create_user
 from app.services import sheets as sheets_svc
+from app.services import leaderboard as leaderboard_svc
 from app.config import settings
 
 router = Router()
@@ -42,20 +44,10 @@ async def cmd_me(message: Message):
     async with AsyncSessionLocal() as db:
         user = await get_or_create_user(db, message.from_user)
 
-        pts_q = await db.execute(
-            select(func.sum(PointLog.points)).where(PointLog.user_id == user.id)
+        totals_q = await db.execute(
+            select(UserTotal.points, UserTotal.visit_count).where(UserTotal.user_id == user.id)
         )
-        points = pts_q.scalar() or 0.0
-
-        visits_q = await db.execute(
-            select(func.count(VisitParticipant.visit_id))
-            .join(Visit, Visit.id == VisitParticipant.visit_id)
-            .where(
-                VisitParticipant.user_id == user.id,
-                Visit.status.in_(["confirmed", "draft", "pending"]),
-            )
-        )
-        visit_count = visits_q.scalar() or 0
+        points, visit_count = totals_q.one_or_none() or (0.0, 0)
 
     await message.answer(
         f"🙋 <b>{message.from_user.full_name}</b>\n\n"
@@ -71,12 +63,11 @@ async def cmd_top(message: Message):
             select(
                 User.full_name,
                 User.username,
-                func.sum(PointLog.points).label("pts"),
+                UserTotal.points,
             )
-            .join(PointLog, PointLog.user_id == User.id)
+            .join(UserTotal, UserTotal.user_id == User.id)
             .where(User.is_active == True)
-            .group_by(User.id, User.full_name, User.username)
-            .order_by(func.sum(PointLog.points).desc())
+            .order_by(UserTotal.points.desc())
             .limit(10)
         )
         rows = q.all()
@@ -109,27 +100,32 @@ def _pts_str(pts: float) -> str:
 
 @router.message(Command("week"))
 async def cmd_week(message: Message):
-    now = datetime.now(timezone.utc)
+    now = datetime.now(ZoneInfo(settings.TIMEZONE))
     week_start = (now - timedelta(days=now.weekday())).replace(
         hour=0, minute=0, second=0, microsecond=0
     )
-    week_num = now.isocalendar()[1]
+    iso_year, week_num = now.isocalendar()[:2]
     date_range = (
         f"{week_start.strftime('%-d %b')} – "
         f"{(week_start + timedelta(days=6)).strftime('%-d %b')}"
     )
 
-    creds = _creds()
-    try:
-        report = await sheets_svc.get_weekly_stats(
-            creds, settings.GOOGLE_SPREADSHEET_ID, week_num
-        )
-    except Exception as e:
-        await message.answer(f"⚠️ Не удалось прочитать таблицу: {e}")
-        return
+    if settings.LEADERBOARD_SOURCE == "db":
+        async with AsyncSessionLocal() as db:
+            weekly = await leaderboard_svc.get_weekly(db, iso_year, week_num)
+            year_top = await leaderboard_svc.get_season_top(db, now.year)
+    else:
+        creds = _creds()
+        try:
+            report = await sheets_svc.get_weekly_stats(
+                creds, settings.GOOGLE_SPREADSHEET_ID, week_num
+            )
+        except Exception as e:
+            await message.answer(f"⚠️ Не удалось прочитать таблицу: {e}")
+            return
 
-    weekly = report["weekly"]
-    year_top = report["year_top"]
+        weekly = report["weekly"]
+        year_top = report["year_top"]
 
     if not weekly:
         await message.answer(
@@ -7,7 +7,7 @@ from app.db.session import AsyncSessionLocal
 from app.db.models import User
 from app.services.visit import get_or_create_user, create_visit
 from app.services.bath import find_best_bath
-from app.bot.utils.parser import parse_message
+from app.bot.utils.parser import ParsedMessage, parse_message
 from app.bot.keyboards.inline import visit_card_keyboard, bath_search_keyboard
 
 router = Router()
@@ -49,6 +49,19 @@ def format_visit_card(
     return "\n".join(lines)
 
 
+def mention_location(message: Message, parsed: ParsedMessage) -> tuple[float, float] | None:
+    """(lat, lng) of the mention: coordinates in its text, or the location
+    or venue of the message it replies to."""
+    if parsed.location:
+        return parsed.location
+    reply = message.reply_to_message
+    if reply is not None:
+        location = reply.location or (reply.venue.location if reply.venue else None)
+        if location is not None:
+            return location.latitude, location.longitude
+    return None
+
+
 @router.message(BotMentionFilter())
 async def handle_mention(message: Message, bot: Bot):
     text = message.text or message.caption or ""
@@ -83,7 +96,7 @@ async def handle_mention(message: Message, bot: Bot):
         uncertain = False
 
         if parsed.bath_name:
-            best_bath, candidates = await find_best_bath(db, parsed.bath_name)
+            best_bath, candidates = await find_best_bath(db, parsed.bath_name, mention_location(message, parsed))
             if best_bath:
                 bath_id = best_bath.id
                 bath_name = best_bath.name
@@ -98,6 +111,7 @@ async def handle_mention(message: Message, bot: Bot):
             chat_id=message.chat.id,
             participant_ids=participant_ids,
             flag_long=parsed.flag_long,
+            bath_query=parsed.bath_name,
         )
 
         # Calculate total points
@@ -11,6 +11,7 @@ class ParsedMessage:
     flag_long: bool = False
     flag_ultraunique: bool = False
     visited_at: datetime | None = None
+    location: tuple[float, float] | None = None  # (lat, lng) given in the text
 
 
 LONG_KEYWORDS = [
@@ -25,6 +26,11 @@ LONG_KEYWORDS = [
     r"длительно",
 ]
 
+# Bare pairs need 4+ decimals (~10 m) so "1.5, 2.5 часа" is not a location;
+# a geo: URI is taken at any precision
+COORDS_RE = re.compile(r"(?<![\d.])(-?\d{1,2}\.\d{4,})\s*,\s*(-?\d{1,3}\.\d{4,})(?!\.?\d)")
+GEO_URI_RE = re.compile(r"\bgeo:\s*(-?\d{1,2}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)(?!\.?\d)", re.IGNORECASE)
+
 ULTRA_KEYWORDS = [
     r"ультрауникально",
     r"ультра\s*уникально",
@@ -52,6 +58,22 @@ def parse_message(text: str, bot_username: str | None = None) -> ParsedMessage:
     clean = re.sub(r"@\w+", "", text)
     clean = re.sub(r"tg://user\?id=\d+", "", clean).strip()
 
+    # Coordinates, e.g. "55.7558, 37.6173" or "geo:55.75,37.62"
+    m = GEO_URI_RE.search(clean) or COORDS_RE.search(clean)
+    if m:
+        lat, lng = float(m.group(1)), float(m.group(2))
+        if -90 <= lat <= 90 and -180 <= lng <= 180:
+            result.location = (lat, lng)
+            start, end = m.start(), m.end()
+            # A maps link or geo: URI goes as a whole, not just its numbers
+            head = re.search(r"\S*$", clean[:start]).group()
+            tail = re.match(r"\S*", clean[end:]).group()
+            if "://" in head or (head + clean[start:]).lower().startswith("geo:"):
+                start, end = start - len(head), end + len(tail)
+            # Join what was around it with a single space
+            left, right = clean[:start].rstrip(" \t"), clean[end:].lstrip(" \t")
+            clean = (left + " " + right if left and right else left + right).strip()
+
     text_lower = text.lower()
 
     # Detect flags
@@ -0,0 +1,111 @@
+"""Maintenance commands.
+
+Usage:
+    python -m app.cli recalculate [--season 2026]
+    python -m app.cli import-xlsx ЕБЛ.xlsx [--year 2026] [--force]
+    python -m app.cli find-duplicates [--top 20] [--apply-min-score 95]
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.db.session import AsyncSessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+
+async def _recalculate(args: argparse.Namespace) -> None:
+    from app.config import settings
+    from app.services.leaderboard import refresh_view
+    from app.services.points import recalculate_season
+
+    async with AsyncSessionLocal() as db:
+        stats = await recalculate_season(db, season=args.season)
+    if settings.LEADERBOARD_SOURCE == "db":
+        await refresh_view()
+    scope = f"season {args.season}" if args.season else "all seasons"
+    print(f"Rescored {stats['visits']} visits ({scope}), wrote {stats['point_logs']} point logs")
+
+
+async def _import_xlsx(args: argparse.Namespace) -> None:
+    from app.config import settings
+    from app.services.importer import import_workbook
+    from app.services.leaderboard import refresh_view
+
+    async with AsyncSessionLocal() as db:
+        stats = await import_workbook(db, args.path, current_year=args.year, force=args.force)
+    if stats["imported"] and settings.LEADERBOARD_SOURCE == "db":
+        await refresh_view()
+    for sheet, visits in stats["imported"].items():
+        print(f"{sheet}: {visits} visits")
+    if stats["skipped"]:
+        print(f"Already imported, skipped: {', '.join(stats['skipped'])} (use --force to re-import)")
+    created = stats["created"]
+    print(
+        f"Created {created['baths']} baths, {created['users']} users, "
+        f"{created['countries']} countries, {created['regions']} regions"
+    )
+
+
+async def _find_duplicates(args: argparse.Namespace) -> None:
+    from app.db.models import Bath
+    from app.services import duplicates
+    from sqlalchemy import select
+
+    async with AsyncSessionLocal() as db:
+        count = await duplicates.scan(db)
+        if count is None:
+            print("Another duplicate scan is running")
+            return
+        report = await duplicates.get_report(db, limit=args.top)
+        ids = {s.source_id for s in report} | {s.target_id for s in report}
+        names = dict((await db.execute(select(Bath.id, Bath.name).where(Bath.id.in_(ids)))).all())
+        print(f"{count} merge suggestions")
+        for s in report:
+            km = f"{s.distance_km:.1f} km" if s.distance_km is not None else "-"
+            print(
+                f"{s.score:6.1f}  {names[s.source_id]} (#{s.source_id}) -> "
+                f"{names[s.target_id]} (#{s.target_id})  name {s.name_score:.0f}, {km}"
+            )
+        if args.apply_min_score is not None:
+            merged = await duplicates.apply_suggestions(db, min_score=args.apply_min_score)
+            print(f"Merged {len(merged)} baths")
+
+
+async def _run(args: argparse.Namespace) -> None:
+    try:
+        await args.func(args)
+    finally:
+        await engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> None:
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    recalc = commands.add_parser("recalculate", help="Rescore visits and rewrite point_logs")
+    recalc.add_argument("--season", type=int, default=None, help="Only rescore visits of this year")
+    recalc.set_defaults(func=_recalculate)
+
+    imp = commands.add_parser("import-xlsx", help="Import league history from the ЕБЛ.xlsx workbook")
+    imp.add_argument("path", help="Path to the workbook")
+    imp.add_argument("--year", type=int, default=None, help="Season of the unprefixed sheets (default SEASON_START_YEAR)")
+    imp.add_argument("--force", action="store_true", help="Re-import sheets that were imported before")
+    imp.set_defaults(func=_import_xlsx)
+
+    dup = commands.add_parser("find-duplicates", help="Rebuild the duplicate bath report")
+    dup.add_argument("--top", type=int, default=20, help="Suggestions to print")
+    dup.add_argument(
+        "--apply-min-score", type=float, default=None, help="Merge every suggestion scoring at least this"
+    )
+    dup.set_defaults(func=_find_duplicates)
+
+    args = parser.parse_args(argv)
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
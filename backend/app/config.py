@@ -22,6 +22,16 @@ class Settings(BaseSettings):
     GOOGLE_SPREADSHEET_ID: str = "1lo91bPkR0T4j1Pk3Edp9YtQjrwHt5t8zWWSVq9nNLkY"
     GOOGLE_CREDENTIALS_FILE: str = "google_credentials.json"
     GOOGLE_CREDENTIALS_JSON: str = ""  # JSON content as string (Railway env var)
+    GOOGLE_SHEETS_API_URL: str = "https://sheets.googleapis.com/v4"
+    GOOGLE_SHEETS_AUTH: bool = True  # False for a local fake Sheets server (scripts/fake_sheets.py)
+
+    # DB-to-Sheets export of visits and weekly points (disabled when empty)
+    SHEETS_EXPORT_SPREADSHEET_ID: str = ""
+    SHEETS_EXPORT_DEBOUNCE: float = 15  # seconds
+
+    # Where standings (/api/leaderboard, weekly results) are read from:
+    # "sheets" or "db"
+    LEADERBOARD_SOURCE: str = "sheets"
 
     @field_validator("DATABASE_URL", mode="before")
     @classmethod
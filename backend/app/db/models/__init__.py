@@ -1,9 +1,13 @@
 from .user import User
-from .bath import Bath, Country, Region
+from .bath import Bath, BathAlias, BathMergeSuggestion, Country, Region
 from .visit import Visit, VisitParticipant, PointLog
 from .config import PointConfig
+from .sheets import SheetSnapshot, SheetExportState, SheetExportRow, ImportedSheet
+from .scoring import UserFirst, BathFirst, UserTotal, UserSeasonTotal, WeeklyTotal
 
 __all__ = [
-    "User", "Bath", "Country", "Region",
-    "Visit", "VisitParticipant", "PointLog", "PointConfig"
+    "User", "Bath", "BathAlias", "BathMergeSuggestion", "Country", "Region",
+    "Visit", "VisitParticipant", "PointLog", "PointConfig",
+    "SheetSnapshot", "SheetExportState", "SheetExportRow", "ImportedSheet",
+    "UserFirst", "BathFirst", "UserTotal", "UserSeasonTotal", "WeeklyTotal",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, String, Float, Boolean, DateTime, ForeignKey, ARRAY
+from sqlalchemy import Integer, String, Float, Boolean, DateTime, ForeignKey, ARRAY, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime, timezone
 from app.db.base import Base
@@ -49,3 +49,37 @@ class Bath(Base):
     region = relationship("Region", back_populates="baths")
     visits = relationship("Visit", back_populates="bath")
     canonical = relationship("Bath", remote_side="Bath.id", foreign_keys=[canonical_id])
+
+
+class BathAlias(Base):
+    """Mention text users confirmed for a bath (see services.bath.learn_alias)."""
+    __tablename__ = "bath_aliases"
+
+    alias: Mapped[str] = mapped_column(String(512), primary_key=True)  # normalize()d
+    bath_id: Mapped[int] = mapped_column(Integer, ForeignKey("baths.id"), index=True)
+    hits: Mapped[int] = mapped_column(Integer, default=1)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    last_used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class BathMergeSuggestion(Base):
+    """A pair of baths the duplicate job (services.duplicates) thinks are one."""
+    __tablename__ = "bath_merge_suggestions"
+    __table_args__ = (Index("ix_bath_merge_suggestions_status_score", "status", "score"),)
+
+    source_id: Mapped[int] = mapped_column(Integer, ForeignKey("baths.id", ondelete="CASCADE"), primary_key=True)
+    target_id: Mapped[int] = mapped_column(Integer, ForeignKey("baths.id", ondelete="CASCADE"), primary_key=True)
+    score: Mapped[float] = mapped_column(Float)
+    name_score: Mapped[float] = mapped_column(Float)
+    distance_km: Mapped[float | None] = mapped_column(Float)
+    same_region: Mapped[bool | None] = mapped_column(Boolean)
+    same_country: Mapped[bool | None] = mapped_column(Boolean)
+    # pending | applied | dismissed
+    status: Mapped[str] = mapped_column(String(16), default="pending")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
@@ -0,0 +1,68 @@
+from sqlalchemy import Integer, BigInteger, String, Float, DateTime, ForeignKey, Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from app.db.base import Base
+
+
+class UserFirst(Base):
+    """Earliest active visit of a user to a region/country within a season.
+
+    Maintained by app.services.points; the new_region / new_country bonus goes
+    to the visit stored here.
+    """
+    __tablename__ = "user_firsts"
+
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    season: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(16), primary_key=True)  # region | country
+    ref_id: Mapped[int] = mapped_column(Integer, primary_key=True)  # regions.id / countries.id
+    visit_id: Mapped[int] = mapped_column(Integer, ForeignKey("visits.id"))
+
+
+class BathFirst(Base):
+    """First qualifying visit to a bath since ULTRAUNIQUE_START_DATE.
+
+    Maintained by app.services.points; the ultraunique bonus goes to the visit
+    stored here.
+    """
+    __tablename__ = "bath_firsts"
+
+    bath_id: Mapped[int] = mapped_column(Integer, ForeignKey("baths.id"), primary_key=True)
+    visit_id: Mapped[int] = mapped_column(Integer, ForeignKey("visits.id"))
+
+
+class UserTotal(Base):
+    """All-time points of a user (sum of point_logs) and visit count
+    (participations in confirmed and pending visits)."""
+    __tablename__ = "user_totals"
+
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    points: Mapped[float] = mapped_column(Float, default=0.0)
+    visit_count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class UserSeasonTotal(Base):
+    """Points and scored visit count of a user within one calendar-year season."""
+    __tablename__ = "user_season_totals"
+
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    season: Mapped[int] = mapped_column(Integer, primary_key=True)
+    points: Mapped[float] = mapped_column(Float, default=0.0)
+    visit_count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class WeeklyTotal(Base):
+    """Points and scored visit count of a user per ISO week in settings.TIMEZONE."""
+    __tablename__ = "weekly_totals"
+    __table_args__ = (
+        Index("ix_weekly_totals_updated_at", "updated_at"),
+        Index("ix_weekly_totals_unstamped", "iso_year", postgresql_where=text("updated_at IS NULL")),
+    )
+
+    iso_year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    iso_week: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("users.id"), primary_key=True)
+    points: Mapped[float] = mapped_column(Float, default=0.0)
+    visit_count: Mapped[int] = mapped_column(Integer, default=0)
+    # NULL until stamped at commit by app.services.points
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -0,0 +1,40 @@
+from sqlalchemy import Integer, String, LargeBinary, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from app.db.base import Base
+
+
+class SheetSnapshot(Base):
+    """Last fetched values of the league worksheets (zlib-compressed JSON)."""
+    __tablename__ = "sheet_snapshots"
+
+    spreadsheet_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    data: Mapped[bytes] = mapped_column(LargeBinary)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+class SheetExportState(Base):
+    """High-water mark of a DB-to-Sheets export stream (max exported updated_at)."""
+    __tablename__ = "sheet_export_state"
+
+    stream: Mapped[str] = mapped_column(String(32), primary_key=True)
+    high_water: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+class SheetExportRow(Base):
+    """Spreadsheet row that an exported record (visit, user-week) was written to."""
+    __tablename__ = "sheet_export_rows"
+
+    sheet: Mapped[str] = mapped_column(String(128), primary_key=True)
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    row: Mapped[int] = mapped_column(Integer)
+
+
+class ImportedSheet(Base):
+    """A workbook sheet whose visits were imported (lets imports resume)."""
+    __tablename__ = "imported_sheets"
+
+    source: Mapped[str] = mapped_column(String(255), primary_key=True)
+    sheet: Mapped[str] = mapped_column(String(128), primary_key=True)
+    visits: Mapped[int] = mapped_column(Integer, default=0)
+    finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Float
+from sqlalchemy import Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Float, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime, timezone
 from app.db.base import Base
@@ -6,6 +6,8 @@ from app.db.base import Base
 
 class Visit(Base):
     __tablename__ = "visits"
+    # The Sheets export reads visits by updated_at past its mark
+    __table_args__ = (Index("ix_visits_updated_at", "updated_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     bath_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("baths.id"))
@@ -17,6 +19,10 @@ class Visit(Base):
     visited_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
     flag_long: Mapped[bool] = mapped_column(Boolean, default=False)
     flag_ultraunique: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Set for visits created by an importer, e.g. "ЕБЛ.xlsx:2024 все бани"
+    source: Mapped[str | None] = mapped_column(String(255), index=True)
+    # Bath text of the mention, learned as an alias once the bath is picked
+    bath_query: Mapped[str | None] = mapped_column(String(512))
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
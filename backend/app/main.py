@@ -21,6 +21,13 @@ from app.db.session import engine
 from app.db.base import Base
 from app.db.models.config import PointConfig, DEFAULT_CONFIG
 from app.db.session import AsyncSessionLocal
+from app.services import notify
+from app.services import bath_index
+from app.services import leaderboard as leaderboard_svc
+from app.services import search as search_svc
+from app.services import sheets as sheets_svc
+from app.services import sheets_export
+from app.services.points import invalidate_config, CONFIG_CHANNEL
 from sqlalchemy import select
 
 logging.basicConfig(level=logging.INFO)
@@ -36,6 +43,7 @@ async def lifespan(app: FastAPI):
     try:
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await leaderboard_svc.ensure_view(conn)
 
         # Seed default point config
         async with AsyncSessionLocal() as db:
@@ -47,6 +55,41 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"DB init failed (will retry on first request): {e}")
 
+    # pg_trgm may be unavailable (no extension, no privilege); keep it out
+    # of the transactions above so the rest of the bootstrap still happens,
+    # and the search functions do not depend on it
+    try:
+        async with engine.begin() as conn:
+            await search_svc.ensure_search_functions(conn)
+    except Exception as e:
+        logger.warning(f"Search function setup failed, GET /baths?q= and /users/search will fail: {e}")
+    try:
+        async with engine.begin() as conn:
+            await search_svc.ensure_trigram(conn)
+    except Exception as e:
+        logger.warning(
+            f"pg_trgm setup failed: mode=similar searches will fail, "
+            f"contains searches run without the trigram index: {e}"
+        )
+
+    # Serve the last stored spreadsheet snapshot until Google answers
+    try:
+        await sheets_svc.load_snapshots()
+    except Exception as e:
+        logger.warning(f"Loading stored Sheets snapshots failed: {e}")
+
+    # Cross-worker cache invalidation
+    notify.subscribe(CONFIG_CHANNEL, invalidate_config)
+    notify.subscribe(sheets_svc.SNAPSHOT_CHANNEL, sheets_svc.on_snapshot_notify)
+    notify.subscribe(bath_index.BATH_CHANNEL, bath_index.index.mark_stale)
+    try:
+        await notify.start_listener()
+    except Exception as e:
+        logger.warning(f"LISTEN setup failed, caches are process-local only: {e}")
+
+    # Catch up on changes made while no worker was exporting
+    sheets_export.schedule_export()
+
     # Set webhook (skip if WEBHOOK_HOST not configured yet)
     if settings.WEBHOOK_HOST:
         webhook_url = f"{settings.WEBHOOK_HOST}/webhook/{settings.WEBHOOK_SECRET}"
@@ -64,6 +107,9 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    await notify.stop_listener()
+    await sheets_svc.close_clients()
+    await sheets_export.close_client()
     await bot.delete_webhook()
     await bot.session.close()
 
@@ -1,54 +1,117 @@
-from sqlalchemy import select, update
+from datetime import datetime, timezone
+from sqlalchemy import case, delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from rapidfuzz import fuzz
-from app.db.models.bath import Bath, Country, Region
-
-
-def normalize(s: str) -> str:
-    s = s.lower().strip()
-    for word in ["баня", "сауна", "banya", "sauna", "бани", "сауны", "банный", "комплекс"]:
-        s = s.replace(word, "")
-    return " ".join(s.split())
+from app.db.models.bath import Bath, BathAlias, BathMergeSuggestion, Country, Region
+from app.services import bath_index
+from app.services.bath_index import normalize  # re-exported for importers
+
+MATCH_SCORE = 80  # confident match
+SUGGEST_SCORE = 40  # worth offering as a candidate
+# A mention's location adds up to GEO_WEIGHT points to the score of a bath,
+# falling linearly from the same spot to nothing at GEO_RADIUS_KM
+GEO_RADIUS_KM = 25.0
+GEO_WEIGHT = 20.0
+GEO_CANDIDATES = 10  # nearest baths scored in addition to the fuzzy matches
+
+
+async def _load(db: AsyncSession, hits: list[tuple[int, float]]) -> list[tuple]:
+    """(bath id, value) pairs -> (Bath, value) pairs, in the same order."""
+    if not hits:
+        return []
+    result = await db.execute(select(Bath).where(Bath.id.in_([bath_id for bath_id, _ in hits])))
+    baths = {bath.id: bath for bath in result.scalars().all()}
+    return [(baths[bath_id], value) for bath_id, value in hits if bath_id in baths]
 
 
 async def search_baths(db: AsyncSession, query: str, limit: int = 5) -> list[tuple]:
     """Return list of (Bath, score) sorted by score desc."""
-    q = normalize(query)
-    result = await db.execute(
-        select(Bath).where(Bath.is_archived == False, Bath.canonical_id.is_(None))
-    )
-    baths = result.scalars().all()
-    if not baths:
-        return []
-
-    candidates = []
-    for bath in baths:
-        names = [bath.name] + (bath.aliases or [])
-        best = max(fuzz.token_sort_ratio(q, normalize(n)) for n in names)
-        candidates.append((bath, best))
-
-    candidates.sort(key=lambda x: x[1], reverse=True)
-    return candidates[:limit]
-
-
-async def find_best_bath(db: AsyncSession, query: str) -> tuple:
+    await bath_index.index.sync(db)
+    return await _load(db, bath_index.index.search(query, limit))
+
+
+async def search_baths_near(
+    db: AsyncSession, query: str, lat: float, lng: float, limit: int = 5
+) -> list[tuple]:
+    """Like search_baths, with the score of baths near (lat, lng) raised
+    by up to GEO_WEIGHT; the baths nearest to it are candidates too."""
+    index = bath_index.index
+    await index.sync(db)
+    scores = dict(index.search(query, max(limit, 20)))
+    near = dict(index.geo.nearest(lat, lng, GEO_CANDIDATES, GEO_RADIUS_KM))
+    scores |= index.score(query, near.keys() - scores.keys())
+    for bath_id, km in near.items():
+        scores[bath_id] = min(100.0, round(scores[bath_id] + GEO_WEIGHT * (1 - km / GEO_RADIUS_KM), 1))
+    ranked = sorted(scores.items(), key=lambda hit: -hit[1])[:limit]
+    return await _load(db, ranked)
+
+
+async def nearby_baths(
+    db: AsyncSession, lat: float, lng: float, radius_km: float, limit: int = 20
+) -> list[tuple]:
+    """(Bath, distance km) pairs of active baths within *radius_km*, nearest first."""
+    await bath_index.index.sync(db)
+    return await _load(db, bath_index.index.geo.nearest(lat, lng, limit, radius_km))
+
+
+async def find_best_bath(
+    db: AsyncSession, query: str, location: tuple[float, float] | None = None
+) -> tuple:
     """
+    With *location* (lat, lng) of the mention, nearby baths score higher
+    (see search_baths_near).
+
     Returns:
-        (bath, []) if confident match (score >= 80)
+        (bath, []) if a learned alias or confident match (score >= 80)
         (None, top5) if partial matches (40-79)
         (None, []) if no matches
     """
-    results = await search_baths(db, query, limit=5)
+    await bath_index.index.sync(db)
+    bath_id = bath_index.index.lookup(query)
+    if bath_id is not None:
+        bath = await db.get(Bath, bath_id)
+        if bath is not None:
+            return bath, []
+    if location is not None:
+        results = await search_baths_near(db, query, *location)
+    else:
+        results = await search_baths(db, query, limit=5)
     if not results:
         return None, []
     best_bath, best_score = results[0]
-    if best_score >= 80:
+    if best_score >= MATCH_SCORE:
         return best_bath, []
-    elif best_score >= 40:
+    elif best_score >= SUGGEST_SCORE:
         return None, results
     return None, []
 
 
+async def learn_alias(db: AsyncSession, query: str, bath_id: int) -> None:
+    """Record that mention text *query* means bath *bath_id*.
+
+    Called when a user confirms the bath of a mention, inside the caller's
+    transaction. A repeated confirmation counts a hit; a confirmation of
+    another bath takes a hit away and moves the alias once none are left.
+    """
+    alias = normalize(query)
+    if not alias:
+        return
+    now = datetime.now(timezone.utc)
+    stmt = insert(BathAlias).values(alias=alias, bath_id=bath_id, hits=1, created_at=now, last_used_at=now)
+    same = BathAlias.bath_id == stmt.excluded.bath_id
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[BathAlias.alias],
+        set_={
+            "bath_id": case((same, BathAlias.bath_id), (BathAlias.hits <= 1, stmt.excluded.bath_id),
+                            else_=BathAlias.bath_id),
+            "hits": case((same, BathAlias.hits + 1), (BathAlias.hits <= 1, 1), else_=BathAlias.hits - 1),
+            "last_used_at": now,
+        },
+    )
+    await db.execute(stmt)
+    await bath_index.changed(db, bath_id)
+
+
 async def create_bath(
     db: AsyncSession,
     name: str,
@@ -72,28 +135,61 @@ async def create_bath(
         description=description,
     )
     db.add(bath)
+    await db.flush()
+    await bath_index.changed(db, bath.id)
     await db.commit()
     await db.refresh(bath)
+    from app.services.duplicates import schedule_scan
+    schedule_scan()
     return bath
 
 
 async def merge_baths(db: AsyncSession, source_id: int, target_id: int) -> Bath:
-    """Move all visits from source to target, archive source."""
+    """Move all visits from source to target, archive source.
+
+    The bath/user firsts indexes and the scores of affected visits are
+    updated in the same transaction.
+    """
     from app.db.models.visit import Visit
+    from app.services.points import visit_dependencies, recalculate_cascade, Dependencies
+    from app.services.sheets_export import touch_visits
+
+    moved_q = await db.execute(select(Visit.id).where(Visit.bath_id == source_id))
+    moved_ids = list(moved_q.scalars().all())
+    before = await visit_dependencies(db, moved_ids) | Dependencies(bath_ids={source_id, target_id})
 
     await db.execute(
         update(Visit).where(Visit.bath_id == source_id).values(bath_id=target_id)
     )
+    touch_visits(db, moved_ids)
     source_q = await db.execute(select(Bath).where(Bath.id == source_id))
     source = source_q.scalar_one()
     source.canonical_id = target_id
     source.is_archived = True
-    await db.commit()
+    await db.execute(
+        update(BathAlias).where(BathAlias.bath_id == source_id).values(bath_id=target_id)
+    )
+    await drop_merge_suggestions(db, source_id)
+    await db.flush()
+    await bath_index.changed(db, source_id)
+    await bath_index.changed(db, target_id)
+    await recalculate_cascade(db, moved_ids, before)
 
     target_q = await db.execute(select(Bath).where(Bath.id == target_id))
     return target_q.scalar_one()
 
 
+async def drop_merge_suggestions(db: AsyncSession, bath_id: int) -> None:
+    """Delete pending duplicate suggestions involving a bath that was merged
+    away or archived (no commit)."""
+    await db.execute(
+        delete(BathMergeSuggestion).where(
+            BathMergeSuggestion.status == "pending",
+            or_(BathMergeSuggestion.source_id == bath_id, BathMergeSuggestion.target_id == bath_id),
+        )
+    )
+
+
 async def get_all_countries(db: AsyncSession) -> list[Country]:
     result = await db.execute(select(Country).order_by(Country.name))
     return result.scalars().all()
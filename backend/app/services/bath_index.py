@@ -0,0 +1,178 @@
+"""Process-wide index of bath names for fuzzy matching.
+
+Holds the normalized name and aliases of every active bath (not archived,
+not merged), so a mention is matched without querying Postgres and
+normalizing the catalogue again. The candidates are scored in one
+rapidfuzz ``process.cdist`` call and reduced to the best score per bath with
+NumPy. Aliases users confirmed (bath_aliases) are kept in a dict, so a
+mention repeating one is resolved by ``lookup()`` without fuzzy scoring.
+Baths with coordinates are also kept in a GeoGrid (``geo``) for nearby
+and nearest-k queries.
+
+The index is loaded on first use and kept up to date per bath: writers
+call ``changed()`` inside their transaction, which marks the bath stale
+here and in the other workers (NOTIFY on BATH_CHANNEL), and each of them
+reloads just the announced baths before its next search. An empty payload
+(or a lost LISTEN connection) reloads everything.
+"""
+
+import logging
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Bath, BathAlias
+from app.services import notify
+from app.services.geo import GeoGrid
+
+logger = logging.getLogger(__name__)
+
+BATH_CHANNEL = "bath_index"
+
+NOISE_WORDS = ["баня", "сауна", "banya", "sauna", "бани", "сауны", "банный", "комплекс"]
+
+
+def normalize(s: str) -> str:
+    s = s.lower().strip()
+    for word in NOISE_WORDS:
+        s = s.replace(word, "")
+    return " ".join(s.split())
+
+
+def _is_active(bath: Bath) -> bool:
+    return not bath.is_archived and bath.canonical_id is None
+
+
+class BathIndex:
+    def __init__(self) -> None:
+        self.loaded = False
+        self._names: dict[int, list[str]] = {}  # bath id -> normalized name and aliases
+        self.geo = GeoGrid()  # active baths with coordinates
+        self._learned: dict[str, int] = {}  # normalized learned alias -> bath id
+        self._stale: set[int] = set()
+        # Flattened form of _names, rebuilt lazily after changes:
+        # every name, the start offset of each bath's names, the bath ids
+        self._flat: tuple[list[str], np.ndarray, np.ndarray] | None = None
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def put(
+        self,
+        bath_id: int,
+        name: str,
+        aliases: list[str] | None,
+        lat: float | None = None,
+        lng: float | None = None,
+    ) -> None:
+        names = [normalize(name)]
+        names += [n for n in dict.fromkeys(normalize(a) for a in aliases or []) if n not in names]
+        self._names[bath_id] = names
+        self._flat = None
+        if lat is not None and lng is not None:
+            self.geo.put(bath_id, lat, lng)
+        else:
+            self.geo.discard(bath_id)
+
+    def discard(self, bath_id: int) -> None:
+        self.geo.discard(bath_id)
+        if self._names.pop(bath_id, None) is not None:
+            self._flat = None
+
+    def update(self, bath: Bath) -> None:
+        if _is_active(bath):
+            self.put(bath.id, bath.name, bath.aliases, bath.lat, bath.lng)
+        else:
+            self.discard(bath.id)
+
+    def mark_stale(self, payload: str = "") -> None:
+        """NOTIFY handler: reload the announced bath, or everything."""
+        if payload.isdigit():
+            self._stale.add(int(payload))
+        else:
+            self.loaded = False
+
+    async def sync(self, db: AsyncSession) -> None:
+        """Load the index, or reload the baths announced since the last call."""
+        if not self.loaded:
+            self._stale.clear()
+            q = await db.execute(
+                select(Bath.id, Bath.name, Bath.aliases, Bath.lat, Bath.lng)
+                .where(Bath.is_archived == False, Bath.canonical_id.is_(None))
+            )
+            self._names.clear()
+            self.geo = GeoGrid()
+            for bath_id, name, aliases, lat, lng in q.all():
+                self.put(bath_id, name, aliases, lat, lng)
+            self._flat = None
+            q = await db.execute(select(BathAlias.alias, BathAlias.bath_id))
+            self._learned = dict(q.all())
+            self.loaded = True
+            logger.info(f"Bath index loaded: {len(self._names)} baths")
+            return
+        if self._stale:
+            ids, self._stale = self._stale, set()
+            q = await db.execute(select(Bath).where(Bath.id.in_(ids)))
+            found = {bath.id: bath for bath in q.scalars().all()}
+            for bath_id in ids:
+                if bath_id in found:
+                    self.update(found[bath_id])
+                else:
+                    self.discard(bath_id)
+            self._learned = {a: b for a, b in self._learned.items() if b not in ids}
+            q = await db.execute(
+                select(BathAlias.alias, BathAlias.bath_id).where(BathAlias.bath_id.in_(ids))
+            )
+            self._learned.update(q.all())
+
+    def lookup(self, query: str) -> int | None:
+        """Id of the active bath *query* is a learned alias of, if any."""
+        bath_id = self._learned.get(normalize(query))
+        return bath_id if bath_id in self._names else None
+
+    def _arrays(self) -> tuple[list[str], np.ndarray, np.ndarray]:
+        if self._flat is None:
+            keys: list[str] = []
+            starts = np.empty(len(self._names), dtype=np.intp)
+            for i, names in enumerate(self._names.values()):
+                starts[i] = len(keys)
+                keys += names
+            self._flat = (keys, starts, np.fromiter(self._names, dtype=np.int64, count=len(self._names)))
+        return self._flat
+
+    def search(self, query: str, limit: int = 5) -> list[tuple[int, float]]:
+        """Best *limit* (bath id, score) pairs; a bath scores its best name."""
+        keys, starts, ids = self._arrays()
+        if not keys:
+            return []
+        scores = process.cdist([normalize(query)], keys, scorer=fuzz.token_sort_ratio)[0]
+        best = np.maximum.reduceat(scores, starts)
+        k = min(limit, len(best))
+        top = np.argpartition(-best, k - 1)[:k]
+        top = top[np.argsort(-best[top], kind="stable")]
+        return [(int(ids[i]), round(float(best[i]), 1)) for i in top]
+
+    def score(self, query: str, bath_ids) -> dict[int, float]:
+        """Fuzzy score of *query* against each of *bath_ids*, as in search()."""
+        query = normalize(query)
+        return {
+            bath_id: round(max(fuzz.token_sort_ratio(query, n) for n in self._names[bath_id]), 1)
+            for bath_id in bath_ids if bath_id in self._names
+        }
+
+
+index = BathIndex()
+
+
+async def changed(db: AsyncSession, bath_id: int | None = None) -> None:
+    """Announce a change of bath *bath_id* (of every bath when None).
+
+    Call inside the writing transaction. Every worker, this one included,
+    reloads the bath before its next search; the others once the
+    transaction has committed.
+    """
+    payload = str(bath_id) if bath_id is not None else ""
+    index.mark_stale(payload)
+    await notify.notify(db, BATH_CHANNEL, payload)
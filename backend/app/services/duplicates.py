@@ -0,0 +1,332 @@
+"""Duplicate bath detection.
+
+The bath wizard creates a new bath whenever a mention matches nothing, so
+the same place ends up in the catalogue under several spellings. This job
+compares the normalized name and aliases of every active bath with every
+other one (rapidfuzz ``process.cdist``, DUPLICATE_CHUNK names at a time
+against the rest, so memory stays bounded) and also pairs baths standing
+at practically the same coordinates. Each candidate pair is ranked by
+
+    name similarity (best pair of names, 0-100)
+    + up to GEO_WEIGHT when both have coordinates within GEO_RADIUS_KM,
+      - FAR_PENALTY when they are more than FAR_KM apart
+    + REGION_BONUS / - REGION_PENALTY for the same / another region,
+      or COUNTRY_BONUS / - COUNTRY_PENALTY for the same / another country
+
+and pairs scoring REPORT_SCORE or more are stored in bath_merge_suggestions,
+the bath with fewer visits as the source of the merge. An admin reviews
+the report and applies (merge_baths) or dismisses suggestions in bulk;
+dismissed pairs are not suggested again.
+
+Runs are debounced like the Sheets export: schedule_scan() after baths are
+created, one run DUPLICATE_SCAN_DELAY seconds later, and an advisory lock
+keeps workers from scanning at the same time.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+from rapidfuzz import fuzz, process
+from sqlalchemy import and_, delete, func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Bath, BathMergeSuggestion, Visit
+from app.db.session import AsyncSessionLocal
+from app.services.bath import GEO_RADIUS_KM, GEO_WEIGHT, merge_baths
+from app.services.bath_index import normalize
+from app.services.geo import GeoGrid, haversine_km
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_CHUNK = 512  # names per cdist call
+NAME_CUTOFF = 70  # name similarity for a pair to be considered at all
+SAME_PLACE_KM = 0.2  # baths this close are considered whatever their names
+FAR_KM = 100.0
+FAR_PENALTY = 30.0
+REGION_BONUS = 5.0
+REGION_PENALTY = 10.0
+COUNTRY_BONUS = 3.0
+COUNTRY_PENALTY = 30.0
+REPORT_SCORE = 75.0  # lowest score that makes the report
+DUPLICATE_SCAN_DELAY = 300  # seconds to wait for more new baths before scanning
+SCAN_LOCK_ID = 0x45424C02  # pg advisory lock key
+
+_scan_task: asyncio.Task | None = None
+
+
+@dataclass
+class BathInfo:
+    id: int
+    names: list[str]  # normalized name and aliases
+    lat: float | None
+    lng: float | None
+    region_id: int | None
+    country_id: int | None
+    visits: int
+
+
+@dataclass
+class Suggestion:
+    source_id: int
+    target_id: int
+    score: float
+    name_score: float
+    distance_km: float | None
+    same_region: bool | None
+    same_country: bool | None
+
+
+def _name_pairs(baths: list[BathInfo]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Positions (i, j), i < j, of bath pairs scoring at least NAME_CUTOFF
+    on some pair of their names, with their best name similarity."""
+    keys = [name for bath in baths for name in bath.names]
+    owner = np.repeat(np.arange(len(baths)), [len(bath.names) for bath in baths])
+    lo_parts, hi_parts, score_parts = [np.zeros(0, np.intp)], [np.zeros(0, np.intp)], [np.zeros(0, np.float32)]
+    for start in range(0, len(keys), DUPLICATE_CHUNK):
+        end = min(start + DUPLICATE_CHUNK, len(keys))
+        # Only names from start on: earlier ones were compared to this chunk already
+        scores = process.cdist(
+            keys[start:end], keys[start:], scorer=fuzz.token_sort_ratio,
+            score_cutoff=NAME_CUTOFF, dtype=np.float32, workers=-1,
+        )
+        rows, cols = np.nonzero(scores)
+        a, b = owner[start + rows], owner[start + cols]
+        other = a != b
+        lo_parts.append(np.minimum(a, b)[other])
+        hi_parts.append(np.maximum(a, b)[other])
+        score_parts.append(scores[rows[other], cols[other]])
+    lo, hi, score = np.concatenate(lo_parts), np.concatenate(hi_parts), np.concatenate(score_parts)
+    # Best score per bath pair: sort by pair, then score descending, keep the first
+    order = np.lexsort((-score, hi, lo))
+    lo, hi, score = lo[order], hi[order], score[order]
+    first = np.ones(len(lo), dtype=bool)
+    first[1:] = (lo[1:] != lo[:-1]) | (hi[1:] != hi[:-1])
+    return lo[first], hi[first], score[first].astype(np.float64)
+
+
+def _place_pairs(baths: list[BathInfo]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Positions (i, j), i < j, of baths within SAME_PLACE_KM of each other,
+    with their best name similarity."""
+    grid = GeoGrid()
+    for i, bath in enumerate(baths):
+        if bath.lat is not None and bath.lng is not None:
+            grid.put(i, bath.lat, bath.lng)
+    pairs = [
+        (i, j, max(fuzz.token_sort_ratio(x, y) for x in bath.names for y in baths[j].names))
+        for i, bath in enumerate(baths) if bath.lat is not None and bath.lng is not None
+        for j, _ in grid.within(bath.lat, bath.lng, SAME_PLACE_KM) if i < j
+    ]
+    lo, hi, score = zip(*pairs) if pairs else ((), (), ())
+    return np.array(lo, dtype=np.intp), np.array(hi, dtype=np.intp), np.array(score, dtype=np.float64)
+
+
+def find_duplicates(baths: list[BathInfo]) -> list[Suggestion]:
+    """Merge suggestions among *baths*, best first (CPU-bound, no I/O)."""
+    baths = [bath for bath in baths if bath.names]
+    lo, hi, name_score = _name_pairs(baths)
+    near_lo, near_hi, near_score = _place_pairs(baths)
+    new = ~np.isin(near_lo * len(baths) + near_hi, lo * len(baths) + hi)
+    lo = np.concatenate([lo, near_lo[new]])
+    hi = np.concatenate([hi, near_hi[new]])
+    name_score = np.round(np.concatenate([name_score, near_score[new]]), 1)
+
+    lat = np.array([np.nan if b.lat is None else b.lat for b in baths], dtype=np.float64)
+    lng = np.array([np.nan if b.lng is None else b.lng for b in baths], dtype=np.float64)
+    region = np.array([b.region_id or 0 for b in baths])
+    country = np.array([b.country_id or 0 for b in baths])
+    visits = np.array([b.visits for b in baths])
+    ids = np.array([b.id for b in baths])
+
+    km = haversine_km(lat[lo], lng[lo], lat[hi], lng[hi])  # NaN without coordinates
+    score = name_score.copy()
+    score += np.where(km < GEO_RADIUS_KM, GEO_WEIGHT * (1 - km / GEO_RADIUS_KM), 0)
+    score -= np.where(km > FAR_KM, FAR_PENALTY, 0)
+    has_region = (region[lo] > 0) & (region[hi] > 0)
+    same_region = region[lo] == region[hi]
+    has_country = (country[lo] > 0) & (country[hi] > 0)
+    same_country = country[lo] == country[hi]
+    score += np.where(has_region, np.where(same_region, REGION_BONUS, -REGION_PENALTY), 0)
+    score += np.where(
+        ~has_region & has_country, np.where(same_country, COUNTRY_BONUS, -COUNTRY_PENALTY), 0
+    )
+
+    suggestions = []
+    for k in np.flatnonzero(score >= REPORT_SCORE):
+        a, b = lo[k], hi[k]
+        # Keep the bath with more visits (the older one on a tie)
+        source, target = (a, b) if (visits[a], -ids[a]) < (visits[b], -ids[b]) else (b, a)
+        suggestions.append(Suggestion(
+            int(ids[source]), int(ids[target]), round(float(score[k]), 1), float(name_score[k]),
+            None if np.isnan(km[k]) else round(float(km[k]), 3),
+            bool(same_region[k]) if has_region[k] else None,
+            bool(same_country[k]) if has_country[k] else None,
+        ))
+    suggestions.sort(key=lambda s: (-s.score, s.target_id, s.source_id))
+    return suggestions
+
+
+async def _load_baths(db: AsyncSession) -> list[BathInfo]:
+    visits = (
+        select(Visit.bath_id, func.count().label("n"))
+        .where(Visit.bath_id.is_not(None)).group_by(Visit.bath_id).subquery()
+    )
+    q = await db.execute(
+        select(
+            Bath.id, Bath.name, Bath.aliases, Bath.lat, Bath.lng, Bath.region_id, Bath.country_id,
+            func.coalesce(visits.c.n, 0),
+        )
+        .outerjoin(visits, visits.c.bath_id == Bath.id)
+        .where(Bath.is_archived == False, Bath.canonical_id.is_(None))
+    )
+    baths = []
+    for bath_id, name, aliases, lat, lng, region_id, country_id, visits_n in q.all():
+        names = [x for x in dict.fromkeys(normalize(x) for x in [name, *(aliases or [])]) if x]
+        baths.append(BathInfo(bath_id, names, lat, lng, region_id, country_id, visits_n))
+    return baths
+
+
+async def scan(db: AsyncSession) -> int | None:
+    """Rebuild the pending part of the report.
+
+    Returns the number of suggestions, or None when another worker is
+    scanning. Applied and dismissed suggestions are kept; a dismissed pair
+    is not suggested again, in either direction.
+    """
+    locked = await db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": SCAN_LOCK_ID})
+    if not locked.scalar():
+        return None
+    baths = await _load_baths(db)
+    suggestions = await asyncio.to_thread(find_duplicates, baths)
+
+    q = await db.execute(
+        select(BathMergeSuggestion.source_id, BathMergeSuggestion.target_id)
+        .where(BathMergeSuggestion.status != "pending")
+    )
+    decided = {frozenset(pair) for pair in q.all()}
+    suggestions = [s for s in suggestions if frozenset((s.source_id, s.target_id)) not in decided]
+
+    await db.execute(delete(BathMergeSuggestion).where(BathMergeSuggestion.status == "pending"))
+    now = datetime.now(timezone.utc)
+    db.add_all(
+        BathMergeSuggestion(**vars(s), status="pending", created_at=now) for s in suggestions
+    )
+    await db.commit()
+    logger.info(f"Duplicate scan: {len(baths)} baths, {len(suggestions)} merge suggestions")
+    return len(suggestions)
+
+
+async def get_report(db: AsyncSession, min_score: float = 0, limit: int = 100) -> list[BathMergeSuggestion]:
+    """Pending suggestions, best first."""
+    q = await db.execute(
+        select(BathMergeSuggestion)
+        .where(BathMergeSuggestion.status == "pending", BathMergeSuggestion.score >= min_score)
+        .order_by(BathMergeSuggestion.score.desc(), BathMergeSuggestion.target_id)
+        .limit(limit)
+    )
+    return q.scalars().all()
+
+
+async def _pending(db: AsyncSession, pairs: list[tuple[int, int]] | None, min_score: float | None):
+    query = select(BathMergeSuggestion).where(BathMergeSuggestion.status == "pending")
+    if pairs is not None:
+        keys = {tuple(pair) for pair in pairs}
+        q = await db.execute(query.where(BathMergeSuggestion.source_id.in_([s for s, _ in keys])))
+        return [s for s in q.scalars().all() if (s.source_id, s.target_id) in keys]
+    q = await db.execute(
+        query.where(BathMergeSuggestion.score >= (min_score or 0))
+        .order_by(BathMergeSuggestion.score.desc(), BathMergeSuggestion.target_id)
+    )
+    return q.scalars().all()
+
+
+async def apply_suggestions(
+    db: AsyncSession,
+    pairs: list[tuple[int, int]] | None = None,
+    min_score: float | None = None,
+) -> list[tuple[int, int]]:
+    """Merge the given pending (source, target) pairs, or every pending
+    suggestion scoring at least *min_score*, best first.
+
+    Both sides are followed through Bath.canonical_id to the bath they were
+    merged into, so chains (a -> b, b -> c) end up in one bath. Suggestions
+    dropped since they were read (a side merged away or archived) are
+    skipped, and ones that reach an archived bath are deleted. Returns the
+    merges made as (source, target).
+    """
+    suggestions = [(s.source_id, s.target_id) for s in await _pending(db, pairs, min_score)]
+    applied = []
+    for source_id, target_id in suggestions:
+        this = and_(
+            BathMergeSuggestion.source_id == source_id,
+            BathMergeSuggestion.target_id == target_id,
+            BathMergeSuggestion.status == "pending",
+        )
+        source, target = await _canonical(db, source_id), await _canonical(db, target_id)
+        if source is None or target is None:
+            await db.execute(delete(BathMergeSuggestion).where(this))
+            await db.commit()
+            continue
+        # Marked before merging: merge_baths drops the source's pending rows
+        marked = await db.execute(
+            update(BathMergeSuggestion)
+            .where(this)
+            .values(status="applied")
+        )
+        if not marked.rowcount:
+            continue
+        if source != target:
+            await merge_baths(db, source_id=source, target_id=target)
+            applied.append((source, target))
+        await db.commit()
+    return applied
+
+
+async def _canonical(db: AsyncSession, bath_id: int) -> int | None:
+    """The bath *bath_id* was merged into (itself if it was not), or None
+    if that bath is archived or gone."""
+    seen = set()
+    while bath_id not in seen:
+        seen.add(bath_id)
+        q = await db.execute(select(Bath.canonical_id, Bath.is_archived).where(Bath.id == bath_id))
+        row = q.first()
+        if row is None:
+            return None
+        if row.canonical_id is None:
+            return None if row.is_archived else bath_id
+        bath_id = row.canonical_id
+    return None  # a canonical_id cycle
+
+
+async def dismiss_suggestions(db: AsyncSession, pairs: list[tuple[int, int]]) -> int:
+    """Mark pending (source, target) pairs as not duplicates."""
+    suggestions = await _pending(db, pairs, None)
+    for s in suggestions:
+        s.status = "dismissed"
+    await db.commit()
+    return len(suggestions)
+
+
+async def _delayed_scan() -> None:
+    global _scan_task
+    await asyncio.sleep(DUPLICATE_SCAN_DELAY)
+    _scan_task = None
+    try:
+        async with AsyncSessionLocal() as db:
+            await scan(db)
+    except Exception as e:
+        logger.warning(f"Duplicate scan failed: {e}")
+
+
+def schedule_scan() -> None:
+    """Scan soon; calls made while a scan is pending are merged into it."""
+    global _scan_task
+    if _scan_task is not None:
+        return
+    try:
+        _scan_task = asyncio.get_running_loop().create_task(_delayed_scan())
+    except RuntimeError:
+        # No running loop (e.g. CLI): run ``python -m app.cli find-duplicates``
+        pass
@@ -0,0 +1,150 @@
+"""In-memory spatial index of points on the globe.
+
+Points are bucketed into grids of square cells, one grid per size in
+CELL_SIZES, keyed by (floor(lat / size), floor(lng / size)); adding, moving
+or removing a point touches one bucket per grid. A radius query reads the
+cells covering the bounding box of the circle from the finest grid that
+needs at most MAX_CELLS of them and filters their points by great-circle
+distance; a nearest-k query repeats it with a growing radius until k
+points are found.
+"""
+
+import math
+from itertools import chain
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG = math.pi * EARTH_RADIUS_KM / 180  # along a meridian
+HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM  # no two points are farther apart
+CELL_SIZES = (0.1, 1.0, 10.0)  # degrees; 0.1 is ~11 km along a meridian
+MAX_CELLS = 256  # cells read per query before a coarser grid is used
+
+
+def haversine_km(lat, lng, lats, lngs):
+    """Great-circle distance from (lat, lng) to each of (lats, lngs), km;
+    any of them may be arrays (element-wise)."""
+    lat1, lng1 = np.radians(lat), np.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class _Grid:
+    def __init__(self, size: float) -> None:
+        self.size = size
+        self.columns = round(360 / size)
+        self.cells: dict[tuple[int, int], set[int]] = {}
+
+    def key(self, lat: float, lng: float) -> tuple[int, int]:
+        return math.floor(lat / self.size), self.wrap(math.floor(lng / self.size))
+
+    def wrap(self, col: int) -> int:
+        half = self.columns // 2
+        return (col + half) % self.columns - half
+
+    def box(self, lat0: float, lat1: float, lng0: float | None, lng1: float | None) -> list[tuple[int, int]]:
+        rows = range(math.floor(lat0 / self.size), math.floor(lat1 / self.size) + 1)
+        if lng0 is None:
+            cols = range(-(self.columns // 2), self.columns - self.columns // 2)
+        else:
+            cols = {self.wrap(c) for c in range(math.floor(lng0 / self.size), math.floor(lng1 / self.size) + 1)}
+        return [(row, col) for row in rows for col in cols]
+
+    def box_size(self, lat0: float, lat1: float, lng0: float | None, lng1: float | None) -> int:
+        rows = math.floor(lat1 / self.size) - math.floor(lat0 / self.size) + 1
+        if lng0 is None:
+            return rows * self.columns
+        return rows * min(self.columns, math.floor(lng1 / self.size) - math.floor(lng0 / self.size) + 1)
+
+
+class GeoGrid:
+    """Points by id. Coordinates live in arrays indexed by slot; the grid
+    buckets hold slots, so a query gathers candidates without touching
+    the points one by one in Python."""
+
+    def __init__(self, cell_sizes: tuple[float, ...] = CELL_SIZES) -> None:
+        self._grids = [_Grid(size) for size in cell_sizes]
+        self._slots: dict[int, int] = {}  # point id -> slot
+        self._free: list[int] = []
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._coords = np.zeros((0, 2), dtype=np.float64)  # (lat, lng) per slot
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def put(self, point_id: int, lat: float, lng: float) -> None:
+        lng = (lng + 180) % 360 - 180
+        slot = self._slots.get(point_id)
+        if slot is not None and tuple(self._coords[slot]) == (lat, lng):
+            return
+        self.discard(point_id)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._slots)
+            if slot == len(self._ids):
+                size = max(16, 2 * slot)
+                self._ids = np.resize(self._ids, size)
+                self._coords = np.resize(self._coords, (size, 2))
+        self._slots[point_id] = slot
+        self._ids[slot] = point_id
+        self._coords[slot] = lat, lng
+        for grid in self._grids:
+            grid.cells.setdefault(grid.key(lat, lng), set()).add(slot)
+
+    def discard(self, point_id: int) -> None:
+        slot = self._slots.pop(point_id, None)
+        if slot is None:
+            return
+        lat, lng = self._coords[slot]
+        for grid in self._grids:
+            key = grid.key(lat, lng)
+            bucket = grid.cells[key]
+            bucket.discard(slot)
+            if not bucket:
+                del grid.cells[key]
+        self._free.append(slot)
+
+    def _candidates(self, lat: float, lng: float, radius_km: float) -> np.ndarray | None:
+        """Slots of the cells covering the bounding box of the circle (a
+        superset of the points inside), or None for every point."""
+        dlat = radius_km / KM_PER_DEG
+        lat0, lat1 = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+        # Meridians converge: the box is widest at its edge nearest a pole
+        cos = math.cos(math.radians(max(abs(lat0), abs(lat1))))
+        dlng = radius_km / (KM_PER_DEG * cos) if cos > 1e-9 else 360.0
+        lng0, lng1 = (lng - dlng, lng + dlng) if dlng < 180 else (None, None)
+        for grid in self._grids:
+            if grid.box_size(lat0, lat1, lng0, lng1) <= min(MAX_CELLS, len(grid.cells)):
+                cells = grid.cells
+                buckets = [cells[key] for key in grid.box(lat0, lat1, lng0, lng1) if key in cells]
+                return np.fromiter(chain.from_iterable(buckets), dtype=np.intp)
+        return None
+
+    def within(self, lat: float, lng: float, radius_km: float, limit: int | None = None) -> list[tuple[int, float]]:
+        """(point id, distance km) pairs within *radius_km*, nearest first."""
+        if not self._slots:
+            return []
+        slots = self._candidates(lat, lng, radius_km)
+        if slots is None:
+            slots = np.fromiter(self._slots.values(), dtype=np.intp, count=len(self._slots))
+        coords = self._coords[slots]
+        dist = haversine_km(lat, lng, coords[:, 0], coords[:, 1])
+        inside = np.flatnonzero(dist <= radius_km)
+        if limit is not None and len(inside) > limit:
+            inside = inside[np.argpartition(dist[inside], limit - 1)[:limit]]
+        inside = inside[np.argsort(dist[inside], kind="stable")]
+        ids = self._ids[slots[inside]]
+        return [(int(i), float(d)) for i, d in zip(ids, dist[inside])]
+
+    def nearest(self, lat: float, lng: float, k: int, max_km: float | None = None) -> list[tuple[int, float]]:
+        """The *k* points nearest to (lat, lng), at most *max_km* away."""
+        limit = min(max_km or HALF_CIRCUMFERENCE_KM, HALF_CIRCUMFERENCE_KM)
+        radius = self._grids[0].size * KM_PER_DEG
+        while True:
+            radius = min(radius, limit)
+            found = self.within(lat, lng, radius, k)
+            if len(found) >= k or radius >= limit:
+                return found
+            radius *= 4
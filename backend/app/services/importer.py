@@ -0,0 +1,389 @@
+"""Import league history from the ЕБЛ.xlsx workbook.
+
+For every season the workbook has a "все бани" sheet (visits per bath and
+person) and a "недельный зачет" sheet (visits per person and ISO week);
+sheets of past seasons carry a "2024 " style prefix, the unprefixed ones are
+the current season. Individual visits are not recorded, so every counted
+visit becomes a one-person visit. Its date is the next free slot of that
+person's weekly counts of the season (Monday noon of the week), which keeps
+weekly and season totals in line with the workbook.
+
+The workbook is streamed in read-only mode and visits are written with
+bulk inserts. Baths are resolved like bot mentions, with find_best_bath
+of app/services/bath.py (learned aliases, then the bath index); people who are not
+users yet get synthetic negative ids (Telegram ids are positive) and are
+created inactive, so they stay out of leaderboards, /top and user search
+until an admin activates them. Every
+season is imported in its own transaction and recorded in imported_sheets,
+so an interrupted import resumes with the first unfinished season. A single
+recalculate_season() rescores everything at the end.
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import openpyxl
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db.models import (
+    Bath, BathFirst, Country, ImportedSheet, Region, User, UserFirst,
+    Visit, VisitParticipant,
+)
+from app.services import bath_index
+from app.services.bath import find_best_bath
+from app.services.points import drop_visit_logs, recalculate_season, refresh_visit_counts
+from app.services.sheets_export import touch_visits
+
+logger = logging.getLogger(__name__)
+
+BATHS_SHEET = "все бани"
+WEEKLY_SHEET = "недельный зачет"
+# Per-category summary rows of the "все бани" sheets
+SUMMARY_LABELS = {
+    "Компания", "Региональная", "Общественная", "Долгая (>2,5ч)",
+    "Ультра Уникальные", "Уникальные",
+}
+INSERT_BATCH_SIZE = 1000  # visits per bulk insert
+HEADER_SCAN_ROWS = 15
+
+
+def _text(raw) -> str:
+    return " ".join(str(raw).split()) if raw is not None else ""
+
+
+def _count(raw) -> int:
+    if isinstance(raw, (int, float)):
+        return max(int(raw), 0)
+    try:
+        return max(int(float(str(raw).replace(",", "."))), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+@dataclass
+class Season:
+    year: int
+    baths_sheet: str
+    weekly_sheet: str | None
+
+
+def find_seasons(sheet_names: list[str], current_year: int) -> list[Season]:
+    """Seasons in the workbook, current season first, then newest to oldest."""
+    lowered = {name.lower(): name for name in sheet_names}
+    seasons = []
+    for name in sheet_names:
+        m = re.fullmatch(r"(?:(\d{4}) )?" + BATHS_SHEET, name.strip().lower())
+        if not m:
+            continue
+        year = int(m.group(1)) if m.group(1) else current_year
+        prefix = f"{m.group(1)} " if m.group(1) else ""
+        seasons.append(Season(year, name, lowered.get(prefix + WEEKLY_SHEET)))
+    return sorted(seasons, key=lambda s: (s.baths_sheet.lower() != BATHS_SHEET, -s.year))
+
+
+def find_header(rows) -> tuple[list[tuple[int, str]], int, bool] | None:
+    """Consume *rows* up to the header of a "все бани" sheet.
+
+    Returns ([(column, person)], bath name column, whether the first two
+    columns are country and region), or None without a header.
+    """
+    for _, row in zip(range(HEADER_SCAN_ROWS), rows):
+        people = [(i, _text(c)) for i, c in enumerate(row) if i >= 2 and isinstance(c, str) and _text(c)]
+        if len(people) < 3 or _text(row[people[0][0] - 1]) in SUMMARY_LABELS:
+            continue
+        # Bath names are in the column left of the people (the header has
+        # the season total or "Название" there)
+        return people, people[0][0] - 1, _text(row[0]) == "Страна"
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Visit dates from the weekly sheet
+# ---------------------------------------------------------------------------
+
+def week_slots(rows, year: int) -> dict[str, list[datetime]]:
+    """{person: visit datetimes} from a "недельный зачет" sheet, oldest first."""
+    tz = ZoneInfo(settings.TIMEZONE)
+    year_start = datetime(year, 1, 1, 12, tzinfo=tz)
+    year_end = datetime(year, 12, 31, 12, tzinfo=tz)
+    week_cols: dict[int, int] | None = None
+    slots: dict[str, list[datetime]] = {}
+    for row in rows:
+        if week_cols is None:
+            if "Всего" in row:
+                week_cols = {
+                    i: int(_text(h)[1:]) for i, h in enumerate(row)
+                    if re.fullmatch(r"W\d+", _text(h))
+                }
+            continue
+        name = _text(row[0]) if row else ""
+        if not name:
+            continue
+        dates = []
+        for col, week in week_cols.items():
+            count = _count(row[col]) if col < len(row) else 0
+            if not count:
+                continue
+            try:
+                day = datetime.combine(datetime.fromisocalendar(year, week, 1), time(12), tz)
+            except ValueError:
+                day = year_end
+            day = min(max(day, year_start), year_end)
+            dates += [day + timedelta(minutes=i) for i in range(count)]
+        slots[name] = sorted(dates)
+    return slots
+
+
+def _person_slots(slots: dict[str, list[datetime]], person: str) -> list[datetime]:
+    """Slots of *person*; the weekly sheet may spell the name out ("Жан" / "Жанат")."""
+    if person in slots:
+        return slots[person]
+    longer = [name for name in slots if name.startswith(person)]
+    return slots[longer[0]] if len(longer) == 1 else []
+
+
+# ---------------------------------------------------------------------------
+# Reference data resolution
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _Context:
+    countries: dict[str, int] = field(default_factory=dict)
+    regions: dict[tuple[int | None, str], int] = field(default_factory=dict)
+    region_country: dict[str, tuple[int | None, int]] = field(default_factory=dict)
+    users: dict[str, int] = field(default_factory=dict)  # lowercased name -> id
+    next_user_id: int = -1
+    created: dict[str, int] = field(default_factory=lambda: {"countries": 0, "regions": 0, "baths": 0, "users": 0})
+
+
+async def _load_context(db: AsyncSession) -> _Context:
+    ctx = _Context()
+    for cid, name in (await db.execute(select(Country.id, Country.name))).all():
+        ctx.countries[name.lower()] = cid
+    for rid, cid, name in (await db.execute(select(Region.id, Region.country_id, Region.name))).all():
+        ctx.regions[(cid, name.lower())] = rid
+        ctx.region_country[name.lower()] = (cid, rid)
+    for uid, name in (await db.execute(select(User.id, User.full_name))).all():
+        ctx.users.setdefault(_text(name).lower(), uid)
+    lowest = (await db.execute(select(func.min(User.id)))).scalar()
+    ctx.next_user_id = min(lowest or 0, 0) - 1
+    return ctx
+
+
+async def _country_id(db: AsyncSession, ctx: _Context, name: str) -> int | None:
+    if not name:
+        return None
+    if name.lower() not in ctx.countries:
+        await db.execute(pg_insert(Country).values(name=name).on_conflict_do_nothing())
+        ctx.countries[name.lower()] = (
+            await db.execute(select(Country.id).where(Country.name == name))
+        ).scalar_one()
+        ctx.created["countries"] += 1
+    return ctx.countries[name.lower()]
+
+
+async def _region_id(db: AsyncSession, ctx: _Context, country_id: int | None, name: str) -> int | None:
+    if not name:
+        return None
+    key = (country_id, name.lower())
+    if key not in ctx.regions:
+        rid = (await db.execute(
+            insert(Region).values(country_id=country_id, name=name).returning(Region.id)
+        )).scalar_one()
+        ctx.regions[key] = rid
+        ctx.region_country.setdefault(name.lower(), (country_id, rid))
+        ctx.created["regions"] += 1
+    return ctx.regions[key]
+
+
+async def _match_bath(db: AsyncSession, queries: list[str]) -> int | None:
+    """The bath the bot would pick for the first of *queries* it is sure of."""
+    for query in queries:
+        bath, _ = await find_best_bath(db, query)
+        if bath is not None:
+            return bath.id
+    return None
+
+
+async def _bath_id(
+    db: AsyncSession, ctx: _Context, name: str, country: str = "", region: str = ""
+) -> int:
+    """Existing bath matching *name*, or a new one.
+
+    Past seasons name baths "Place, bath"; both the full name and the part
+    after the comma are tried, and a new bath gets the country or region
+    the place names, if it is a known one.
+    """
+    place, _, rest = name.partition(",")
+    queries = [name] + ([rest.strip()] if rest.strip() else [])
+    bath_id = await _match_bath(db, queries)
+    if bath_id is not None:
+        return bath_id
+
+    country_id = await _country_id(db, ctx, country)
+    region_id = await _region_id(db, ctx, country_id, region)
+    if not country and not region and rest:
+        place = place.strip().lower()
+        if place in ctx.countries:
+            country_id = ctx.countries[place]
+        elif place in ctx.region_country:
+            country_id, region_id = ctx.region_country[place]
+    bath_id = (await db.execute(
+        insert(Bath).values(
+            name=name, aliases=[], country_id=country_id, region_id=region_id,
+            city=region or None,
+        ).returning(Bath.id)
+    )).scalar_one()
+    await bath_index.changed(db, bath_id)  # found by the rows that follow
+    ctx.created["baths"] += 1
+    return bath_id
+
+
+async def _user_ids(db: AsyncSession, ctx: _Context, names: list[str]) -> list[int]:
+    new = []
+    for name in names:
+        if name.lower() not in ctx.users:
+            ctx.users[name.lower()] = ctx.next_user_id
+            new.append({"id": ctx.next_user_id, "full_name": name, "is_active": False, "is_admin": False})
+            ctx.next_user_id -= 1
+    if new:
+        await db.execute(insert(User), new)
+        ctx.created["users"] += len(new)
+    return [ctx.users[name.lower()] for name in names]
+
+
+# ---------------------------------------------------------------------------
+# Season import
+# ---------------------------------------------------------------------------
+
+async def _flush_visits(db: AsyncSession, batch: list[tuple[int, int, datetime]], source: str) -> None:
+    if not batch:
+        return
+    now = datetime.now(timezone.utc)
+    ids = (await db.execute(
+        insert(Visit).returning(Visit.id, sort_by_parameter_order=True),
+        [
+            {"bath_id": bath_id, "status": "confirmed", "visited_at": visited_at,
+             "flag_long": False, "flag_ultraunique": False, "source": source,
+             "created_at": now, "updated_at": now}
+            for bath_id, _, visited_at in batch
+        ],
+    )).scalars().all()
+    await db.execute(insert(VisitParticipant), [
+        {"visit_id": visit_id, "user_id": user_id}
+        for visit_id, (_, user_id, _) in zip(ids, batch)
+    ])
+    batch.clear()
+
+
+async def _delete_imported(db: AsyncSession, source: str) -> None:
+    visit_ids = select(Visit.id).where(Visit.source == source)
+    await drop_visit_logs(db, visit_ids)
+    for model in (UserFirst, BathFirst, VisitParticipant):
+        await db.execute(delete(model).where(model.visit_id.in_(visit_ids)))
+    await db.execute(delete(Visit).where(Visit.source == source))
+
+
+async def _import_season(db: AsyncSession, ctx: _Context, wb, season: Season, source: str) -> int:
+    slots = week_slots(wb[season.weekly_sheet].iter_rows(values_only=True), season.year) if season.weekly_sheet else {}
+    used: dict[str, int] = {}
+    tz = ZoneInfo(settings.TIMEZONE)
+    fallback = min(datetime(season.year, 12, 31, 12, tzinfo=tz), datetime.now(tz))
+
+    rows = wb[season.baths_sheet].iter_rows(values_only=True)
+    layout = find_header(rows)
+    if layout is None:
+        raise ValueError(f"No header row in '{season.baths_sheet}'")
+    users, name_col, with_place = layout
+    people = dict(users)
+    user_ids = dict(zip(people, await _user_ids(db, ctx, list(people.values()))))
+
+    batch: list[tuple[int, int, datetime]] = []
+    total = 0
+    for row in rows:
+        name = _text(row[name_col]) if name_col < len(row) else ""
+        if not name or name in SUMMARY_LABELS:
+            continue
+        if with_place and not _text(row[0]):
+            continue
+        counts = [(col, _count(row[col])) for col, _ in users if col < len(row)]
+        counts = [(col, n) for col, n in counts if n]
+        if not counts and not with_place:
+            continue  # past seasons: only baths that were visited
+        if with_place:
+            bath_id = await _bath_id(db, ctx, name, _text(row[0]), _text(row[1]))
+        else:
+            bath_id = await _bath_id(db, ctx, name)
+
+        for col, n in counts:
+            person = people[col]
+            person_slots = _person_slots(slots, person)
+            for _ in range(n):
+                i = used.get(person, 0)
+                used[person] = i + 1
+                visited_at = person_slots[i] if i < len(person_slots) else (
+                    person_slots[-1] if person_slots else fallback
+                )
+                batch.append((bath_id, user_ids[col], visited_at))
+            total += n
+        if len(batch) >= INSERT_BATCH_SIZE:
+            await _flush_visits(db, batch, source)
+    await _flush_visits(db, batch, source)
+    return total
+
+
+async def import_workbook(
+    db: AsyncSession,
+    path: str,
+    current_year: int | None = None,
+    force: bool = False,
+    rescore: bool = True,
+) -> dict:
+    """Import every season of the workbook at *path* not imported yet.
+
+    With *force*, seasons imported before are deleted and imported again.
+    """
+    source = os.path.basename(path)
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        seasons = find_seasons(wb.sheetnames, current_year or settings.SEASON_START_YEAR)
+        ctx = await _load_context(db)
+        done_q = await db.execute(select(ImportedSheet.sheet).where(ImportedSheet.source == source))
+        done = set(done_q.scalars().all())
+
+        imported: dict[str, int] = {}
+        skipped: list[str] = []
+        for season in seasons:
+            if season.baths_sheet in done and not force:
+                skipped.append(season.baths_sheet)
+                continue
+            visit_source = f"{source}:{season.baths_sheet}"
+            await _delete_imported(db, visit_source)
+            visits = await _import_season(db, ctx, wb, season, visit_source)
+            await refresh_visit_counts(db)
+            touch_visits(db, select(Visit.id).where(Visit.source == visit_source))
+            stmt = pg_insert(ImportedSheet).values(
+                source=source, sheet=season.baths_sheet, visits=visits,
+                finished_at=datetime.now(timezone.utc),
+            )
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=["source", "sheet"],
+                set_={"visits": stmt.excluded.visits, "finished_at": stmt.excluded.finished_at},
+            ))
+            await db.commit()
+            imported[season.baths_sheet] = visits
+            logger.info(f"Imported {visits} visits from '{season.baths_sheet}' ({season.year})")
+    finally:
+        wb.close()
+
+    stats = {"imported": imported, "skipped": skipped, "created": ctx.created}
+    if rescore and imported:
+        stats["rescore"] = await recalculate_season(db)
+    return stats
@@ -0,0 +1,98 @@
+"""In-process background jobs with progress reporting.
+
+A job is an ``async def func(job)`` coroutine run as an asyncio task; it
+reports progress by updating ``job.total`` / ``job.done`` / ``job.detail``.
+Starting a job of a kind that is already running cancels the older one, so
+only the latest request of each kind is carried out.
+"""
+
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+MAX_FINISHED_JOBS = 50
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    total: int = 0
+    done: int = 0
+    detail: dict = field(default_factory=dict)
+    error: str | None = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "total": self.total,
+            "done": self.done,
+            "progress": round(self.done / self.total, 4) if self.total else None,
+            "detail": self.detail,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+_jobs: dict[str, Job] = {}
+_tasks: dict[str, asyncio.Task] = {}
+
+
+async def _run(job: Job, func: Callable[[Job], Awaitable[None]]) -> None:
+    job.status = "running"
+    job.started_at = datetime.now(timezone.utc)
+    try:
+        await func(job)
+        job.status = "done"
+    except asyncio.CancelledError:
+        job.status = "cancelled"
+        raise
+    except Exception as e:
+        logger.exception(f"Job {job.kind} {job.id} failed")
+        job.status = "failed"
+        job.error = str(e)
+    finally:
+        job.finished_at = datetime.now(timezone.utc)
+        _tasks.pop(job.id, None)
+
+
+def _prune() -> None:
+    finished = [j for j in _jobs.values() if j.finished_at is not None]
+    finished.sort(key=lambda j: j.finished_at)
+    for job in finished[:-MAX_FINISHED_JOBS]:
+        _jobs.pop(job.id, None)
+
+
+def start_job(kind: str, func: Callable[[Job], Awaitable[None]], **detail) -> Job:
+    """Schedule *func* in the background, superseding a running job of the same kind."""
+    for job_id, task in list(_tasks.items()):
+        if _jobs[job_id].kind == kind:
+            task.cancel()
+
+    _prune()
+    job = Job(id=uuid.uuid4().hex[:12], kind=kind, detail=dict(detail))
+    _jobs[job.id] = job
+    _tasks[job.id] = asyncio.get_running_loop().create_task(_run(job, func))
+    return job
+
+
+def get_job(job_id: str) -> Job | None:
+    return _jobs.get(job_id)
+
+
+def list_jobs(kind: str | None = None) -> list[Job]:
+    jobs = [j for j in _jobs.values() if kind is None or j.kind == kind]
+    return sorted(jobs, key=lambda j: j.created_at, reverse=True)
@@ -0,0 +1,198 @@
+"""DB-native standings: the leaderboard and weekly results.
+
+The leaderboard is served from the ``leaderboard_mv`` materialized view,
+which pre-aggregates point_logs per (user, season, region); rankings are
+computed over it with RANK(), so tied users share a place. It is refreshed
+CONCURRENTLY (reads are never blocked) shortly after point_logs change,
+with bursts of recalculations coalesced into one refresh.
+
+Weekly results come from the weekly_totals rollup that points.py keeps up
+to date, so any week is a single primary-key range read.
+"""
+
+import asyncio
+import logging
+from datetime import date
+
+from sqlalchemy import column, func, select, table, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.config import settings
+from app.db.models import User, UserSeasonTotal, WeeklyTotal
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+REFRESH_DELAY = 2  # seconds to wait for more changes before refreshing
+
+# region_id is 0 for visits without a bath or with a bath outside any region,
+# so the unique index required by REFRESH ... CONCURRENTLY can cover it.
+CREATE_VIEW_SQL = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS leaderboard_mv AS
+    SELECT pl.user_id,
+           EXTRACT(YEAR FROM v.visited_at AT TIME ZONE 'UTC')::int AS season,
+           COALESCE(b.region_id, 0) AS region_id,
+           SUM(pl.points) AS points,
+           COUNT(*) FILTER (WHERE pl.reason = 'base') AS visit_count
+    FROM point_logs pl
+    JOIN visits v ON v.id = pl.visit_id
+    LEFT JOIN baths b ON b.id = v.bath_id
+    GROUP BY 1, 2, 3
+"""
+CREATE_INDEX_SQL = """
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_leaderboard_mv
+    ON leaderboard_mv (user_id, season, region_id)
+"""
+
+leaderboard_mv = table(
+    "leaderboard_mv",
+    column("user_id"),
+    column("season"),
+    column("region_id"),
+    column("points"),
+    column("visit_count"),
+)
+
+_refresh_task: asyncio.Task | None = None
+
+
+async def ensure_view(conn: AsyncConnection) -> None:
+    """Create the view and its unique index when missing."""
+    await conn.execute(text(CREATE_VIEW_SQL))
+    await conn.execute(text(CREATE_INDEX_SQL))
+
+
+async def refresh_view() -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY leaderboard_mv"))
+
+
+async def _delayed_refresh() -> None:
+    global _refresh_task
+    await asyncio.sleep(REFRESH_DELAY)
+    _refresh_task = None
+    try:
+        await refresh_view()
+    except Exception as e:
+        logger.warning(f"Leaderboard refresh failed: {e}")
+
+
+def schedule_refresh() -> None:
+    """Refresh the view soon; calls made while one is pending are merged."""
+    global _refresh_task
+    if settings.LEADERBOARD_SOURCE != "db" or _refresh_task is not None:
+        return
+    try:
+        _refresh_task = asyncio.get_running_loop().create_task(_delayed_refresh())
+    except RuntimeError:
+        # No running loop (e.g. CLI): the caller refreshes explicitly if needed
+        pass
+
+
+async def get_leaderboard(
+    db: AsyncSession,
+    season: int | None = None,
+    region_id: int | None = None,
+    limit: int = 100,
+    offset: int = 0,
+) -> list[dict]:
+    """One page of standings; ties share a rank (1, 1, 3, ...)."""
+    mv = leaderboard_mv.c
+    totals = select(
+        mv.user_id,
+        func.sum(mv.points).label("points"),
+        func.sum(mv.visit_count).label("visit_count"),
+    ).group_by(mv.user_id)
+    if season is not None:
+        totals = totals.where(mv.season == season)
+    if region_id is not None:
+        totals = totals.where(mv.region_id == region_id)
+    totals = totals.subquery()
+
+    ranked = (
+        select(
+            User.id,
+            User.full_name,
+            User.username,
+            totals.c.points,
+            totals.c.visit_count,
+            func.rank().over(order_by=totals.c.points.desc()).label("rank"),
+        )
+        .join(totals, totals.c.user_id == User.id)
+        .where(User.is_active == True)
+        .order_by(totals.c.points.desc(), User.full_name, User.id)
+        .limit(limit)
+        .offset(offset)
+    )
+    rows = (await db.execute(ranked)).all()
+
+    return [
+        {
+            "rank": row.rank,
+            "user_id": row.id,
+            "name": row.full_name,
+            "username": row.username,
+            "points": float(row.points),
+            "visit_count": int(row.visit_count),
+        }
+        for row in rows
+    ]
+
+
+async def get_weekly(db: AsyncSession, iso_year: int, iso_week: int) -> list[dict]:
+    """Per-user visits and points of one ISO week, best first.
+
+    ``total_visits`` is the user's scored visit count for the whole season
+    the week ends in. Seasons are calendar years, so that is the year of
+    the week's Sunday rather than *iso_year*: week 53 of 2026 ends on
+    3 January 2027 and shows 2027 totals, like week 1 of 2027 does.
+    """
+    season = date.fromisocalendar(iso_year, iso_week, 7).year
+    q = await db.execute(
+        select(
+            User.id,
+            User.full_name,
+            User.username,
+            WeeklyTotal.points,
+            WeeklyTotal.visit_count,
+            func.coalesce(UserSeasonTotal.visit_count, 0).label("total_visits"),
+        )
+        .join(User, User.id == WeeklyTotal.user_id)
+        .outerjoin(
+            UserSeasonTotal,
+            (UserSeasonTotal.user_id == WeeklyTotal.user_id) & (UserSeasonTotal.season == season),
+        )
+        .where(
+            WeeklyTotal.iso_year == iso_year,
+            WeeklyTotal.iso_week == iso_week,
+            User.is_active == True,
+            (WeeklyTotal.points > 0) | (WeeklyTotal.visit_count > 0),
+        )
+        .order_by(WeeklyTotal.points.desc(), WeeklyTotal.visit_count.desc(), User.full_name)
+    )
+    return [
+        {
+            "user_id": row.id,
+            "name": row.full_name,
+            "username": row.username,
+            "visit_count": row.visit_count,
+            "points": float(row.points),
+            "total_visits": row.total_visits,
+        }
+        for row in q.all()
+    ]
+
+
+async def get_season_top(db: AsyncSession, season: int, limit: int = 3) -> list[dict]:
+    """Best users of a season by points (from user_season_totals)."""
+    q = await db.execute(
+        select(User.full_name, UserSeasonTotal.points, UserSeasonTotal.visit_count)
+        .join(User, User.id == UserSeasonTotal.user_id)
+        .where(UserSeasonTotal.season == season, UserSeasonTotal.points > 0, User.is_active == True)
+        .order_by(UserSeasonTotal.points.desc(), User.full_name)
+        .limit(limit)
+    )
+    return [
+        {"name": name, "points": float(points), "visit_count": visit_count}
+        for name, points, visit_count in q.all()
+    ]
@@ -0,0 +1,93 @@
+"""Cross-worker invalidation over Postgres LISTEN/NOTIFY.
+
+Writers call ``notify()`` inside their transaction; Postgres delivers the
+message on commit to every process that runs ``start_listener()``, where the
+handlers registered with ``subscribe()`` are called with the payload.
+"""
+
+import asyncio
+import logging
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY = 5  # seconds
+
+_handlers: dict[str, list[Callable[[str], None]]] = {}
+_conn: AsyncConnection | None = None
+_reconnect_task: asyncio.Task | None = None
+
+
+def subscribe(channel: str, handler: Callable[[str], None]) -> None:
+    """Call *handler(payload)* for every notification on *channel*."""
+    _handlers.setdefault(channel, []).append(handler)
+
+
+async def notify(db: AsyncSession, channel: str, payload: str = "") -> None:
+    """Queue a notification; it is delivered when *db* commits."""
+    await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+
+
+def _dispatch(channel: str, payload: str) -> None:
+    for handler in _handlers.get(channel, []):
+        try:
+            handler(payload)
+        except Exception:
+            logger.exception(f"Notification handler for '{channel}' failed")
+
+
+def _on_notification(connection, pid, channel, payload) -> None:
+    _dispatch(channel, payload)
+
+
+def _on_termination(connection) -> None:
+    # Notifications may have been missed while disconnected: invalidate everything.
+    global _conn, _reconnect_task
+    logger.warning("LISTEN connection lost, reconnecting")
+    _conn = None
+    for channel in _handlers:
+        _dispatch(channel, "")
+    _reconnect_task = asyncio.get_running_loop().create_task(_reconnect())
+
+
+async def _reconnect() -> None:
+    while _conn is None:
+        await asyncio.sleep(RECONNECT_DELAY)
+        try:
+            await start_listener()
+        except Exception as e:
+            logger.warning(f"LISTEN reconnect failed: {e}")
+
+
+async def start_listener() -> None:
+    """Open a dedicated connection and LISTEN on all subscribed channels."""
+    global _conn
+    if _conn is not None or not _handlers:
+        return
+    conn = await engine.connect()
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection  # asyncpg.Connection
+    for channel in _handlers:
+        await driver.add_listener(channel, _on_notification)
+    driver.add_termination_listener(_on_termination)
+    _conn = conn
+
+
+async def stop_listener() -> None:
+    global _conn
+    if _reconnect_task is not None:
+        _reconnect_task.cancel()
+    if _conn is None:
+        return
+    conn, _conn = _conn, None
+    try:
+        raw = await conn.get_raw_connection()
+        raw.driver_connection.remove_termination_listener(_on_termination)
+        await conn.close()
+    except Exception as e:
+        logger.warning(f"Failed to close LISTEN connection: {e}")
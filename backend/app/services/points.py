@@ -1,11 +1,53 @@
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from sqlalchemy import select, func, delete, and_
+from zoneinfo import ZoneInfo
+from sqlalchemy import Integer, event, exists, literal, select, func, delete, insert, update, case, and_, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.models import Visit, VisitParticipant, PointLog, PointConfig, Bath
+from sqlalchemy.orm import Session
+from app.db.models import (
+    Visit, VisitParticipant, PointLog, PointConfig, Bath,
+    UserFirst, BathFirst, UserTotal, UserSeasonTotal, WeeklyTotal,
+)
+from app.db.session import AsyncSessionLocal
+from app.services.jobs import Job
+from app.services.leaderboard import schedule_refresh
+from app.services.sheets_export import schedule_export
 from app.config import settings
 
+# Visits in these statuses count as "earlier visits" for bonus checks
+ACTIVE_STATUSES = ("confirmed", "draft", "pending")
+# Visits in these statuses earn no points at all
+UNSCORED_STATUSES = ("cancelled", "disputed")
+# Visits in these statuses count towards a user's visit_count
+COUNTED_STATUSES = ("confirmed", "pending")
+
+
+# Process-local PointConfig cache, valid while its version matches
+# _config_version. invalidate_config() bumps the version: update_settings
+# calls it directly and other workers via NOTIFY on CONFIG_CHANNEL.
+CONFIG_CHANNEL = "point_config"
+_config_version = 0
+_config_cache: tuple[int, dict] | None = None
+
+
+def config_version() -> int:
+    return _config_version
+
+
+def invalidate_config(payload: str = "") -> None:
+    global _config_version
+    _config_version += 1
+
 
 async def get_config(db: AsyncSession) -> dict:
+    global _config_cache
+    if _config_cache is not None and _config_cache[0] == _config_version:
+        return dict(_config_cache[1])
+
+    version = _config_version
     result = await db.execute(select(PointConfig))
     rows = result.scalars().all()
     cfg = {row.key: row.value for row in rows}
@@ -16,135 +58,770 @@ async def get_config(db: AsyncSession) -> dict:
         "country_bonus": 1.0,
         "ultraunique_bonus": 1.0,
     }
-    return {**defaults, **cfg}
+    cfg = {**defaults, **cfg}
+    # An invalidation during the SELECT leaves the entry stale on purpose
+    _config_cache = (version, cfg)
+    return dict(cfg)
+
+
+def _participant_logs(
+    visit_id: int,
+    user_id: int,
+    cfg: dict,
+    flag_long: bool,
+    is_ultraunique: bool,
+    new_region: bool,
+    new_country: bool,
+) -> list[dict]:
+    """Point log rows earned by one participant of a visit, in canonical order."""
+    rows = [{"user_id": user_id, "visit_id": visit_id, "points": cfg["base_points"], "reason": "base"}]
+    if flag_long and cfg.get("long_bonus", 0) > 0:
+        rows.append({"user_id": user_id, "visit_id": visit_id, "points": cfg["long_bonus"], "reason": "long"})
+    if is_ultraunique and cfg.get("ultraunique_bonus", 0) > 0:
+        rows.append({"user_id": user_id, "visit_id": visit_id, "points": cfg["ultraunique_bonus"], "reason": "ultraunique"})
+    if new_region and cfg.get("region_bonus", 0) > 0:
+        rows.append({"user_id": user_id, "visit_id": visit_id, "points": cfg["region_bonus"], "reason": "new_region"})
+    if new_country and cfg.get("country_bonus", 0) > 0:
+        rows.append({"user_id": user_id, "visit_id": visit_id, "points": cfg["country_bonus"], "reason": "new_country"})
+    return rows
+
+
+def _scores_changed() -> None:
+    """Run after committing point_logs changes: refresh derived read models."""
+    schedule_refresh()
+    schedule_export()
 
 
 async def recalculate_visit(visit_id: int, db: AsyncSession) -> None:
     """Idempotent: delete old logs for this visit, then recalculate."""
+    cfg = await get_config(db)
+    await _rescore_visit(visit_id, db, cfg)
+    await db.commit()
+    _scores_changed()
+
+
+async def _rescore_visit(visit_id: int, db: AsyncSession, cfg: dict) -> None:
+    """Rewrite point logs of one visit inside the caller's transaction."""
     visit_q = await db.execute(select(Visit).where(Visit.id == visit_id))
     visit = visit_q.scalar_one_or_none()
-    if not visit or visit.status in ("cancelled", "disputed"):
-        await db.execute(delete(PointLog).where(PointLog.visit_id == visit_id))
-        await db.commit()
+    if not visit:
+        await drop_visit_logs(db, [visit_id])
+        return
+    if visit.status in UNSCORED_STATUSES:
+        await _replace_visit_logs(db, visit, [])
         return
-
-    cfg = await get_config(db)
 
     parts_q = await db.execute(
         select(VisitParticipant.user_id).where(VisitParticipant.visit_id == visit_id)
     )
     participant_ids = list(parts_q.scalars().all())
     if not participant_ids:
+        await _replace_visit_logs(db, visit, [])
         return
 
-    await db.execute(delete(PointLog).where(PointLog.visit_id == visit_id))
-
     new_logs = []
-    ultraunique_start = datetime.fromisoformat(settings.ULTRAUNIQUE_START_DATE).replace(tzinfo=timezone.utc)
 
     bath = None
     if visit.bath_id:
         bath_q = await db.execute(select(Bath).where(Bath.id == visit.bath_id))
         bath = bath_q.scalar_one_or_none()
 
-    # Check ultraunique: no other visits to this bath before current visit since 2023
+    # Ultraunique: this visit is the bath's first qualifying visit (see bath_firsts)
     is_ultraunique = False
     if bath and cfg.get("ultraunique_bonus", 0) > 0:
-        ultra_q = await db.execute(
-            select(func.count(Visit.id)).where(
+        first_q = await db.execute(
+            select(BathFirst.visit_id).where(BathFirst.bath_id == visit.bath_id)
+        )
+        is_ultraunique = first_q.scalar() == visit_id
+
+    # Region / country bonus: this visit is the user's first to the
+    # region/country in its season (see user_firsts)
+    firsts: set[tuple[int, str]] = set()
+    if bath and (bath.region_id or bath.country_id):
+        refs = []
+        if bath.region_id and cfg.get("region_bonus", 0) > 0:
+            refs.append(and_(UserFirst.kind == "region", UserFirst.ref_id == bath.region_id))
+        if bath.country_id and cfg.get("country_bonus", 0) > 0:
+            refs.append(and_(UserFirst.kind == "country", UserFirst.ref_id == bath.country_id))
+        if refs:
+            firsts_q = await db.execute(
+                select(UserFirst.user_id, UserFirst.kind).where(
+                    UserFirst.user_id.in_(participant_ids),
+                    UserFirst.season == _season_of(visit.visited_at),
+                    or_(*refs),
+                    UserFirst.visit_id == visit_id,
+                )
+            )
+            firsts = set(firsts_q.all())
+
+    for uid in participant_ids:
+        new_region = (uid, "region") in firsts
+        new_country = (uid, "country") in firsts
+        for row in _participant_logs(
+            visit_id, uid, cfg, visit.flag_long, is_ultraunique, new_region, new_country
+        ):
+            new_logs.append(row)
+
+    await _replace_visit_logs(db, visit, new_logs)
+
+
+async def _replace_visit_logs(db: AsyncSession, visit: Visit, rows: list[dict]) -> None:
+    """Swap a visit's point logs for *rows* and apply the difference to user totals."""
+    old_q = await db.execute(
+        select(PointLog.user_id, PointLog.points, PointLog.reason)
+        .where(PointLog.visit_id == visit.id)
+    )
+    deltas: dict[int, list] = defaultdict(lambda: [0.0, 0])
+    for user_id, points, reason in old_q.all():
+        deltas[user_id][0] -= points
+        deltas[user_id][1] -= reason == "base"
+    for row in rows:
+        deltas[row["user_id"]][0] += row["points"]
+        deltas[row["user_id"]][1] += row["reason"] == "base"
+
+    await db.execute(delete(PointLog).where(PointLog.visit_id == visit.id))
+    if rows:
+        await db.execute(insert(PointLog), rows)
+    await apply_total_deltas(db, visit.visited_at, deltas)
+
+
+async def drop_visit_logs(db: AsyncSession, visit_ids) -> None:
+    """Delete the point logs of *visit_ids* (a list or a select of ids) and
+    take them off user totals, like _replace_visit_logs with no rows."""
+    old_q = await db.execute(
+        select(Visit.visited_at, PointLog.user_id, PointLog.points, PointLog.reason)
+        .join(Visit, Visit.id == PointLog.visit_id)
+        .where(PointLog.visit_id.in_(visit_ids))
+    )
+    # One delta set per (season, week) bucket; any visited_at in it will do
+    buckets: dict[tuple, tuple[datetime, dict]] = {}
+    dated = 0
+    for visited_at, user_id, points, reason in old_q.all():
+        key = (_season_of(visited_at), _iso_week(visited_at))
+        _, deltas = buckets.setdefault(key, (visited_at, defaultdict(lambda: [0.0, 0])))
+        deltas[user_id][0] -= points
+        deltas[user_id][1] -= reason == "base"
+        dated += 1
+
+    dropped = await db.execute(delete(PointLog).where(PointLog.visit_id.in_(visit_ids)))
+    if dropped.rowcount > dated:
+        # Logs that outlived their visit have no date to find their week
+        # and season by: recount everything instead
+        await rebuild_user_totals(db)
+        return
+    for visited_at, deltas in buckets.values():
+        await apply_total_deltas(db, visited_at, deltas)
+
+
+# ---------------------------------------------------------------------------
+# Materialized per-user totals (user_totals / user_season_totals /
+# weekly_totals)
+# ---------------------------------------------------------------------------
+
+# weekly_totals rows are written with updated_at NULL and stamped right
+# before their transaction commits, so the Sheets export (which reads rows
+# by updated_at past a high-water mark) sees them in commit order even when
+# the transaction ran for minutes.
+_WEEKLY_UNSTAMPED = "weekly_totals_unstamped"  # Session.info flag
+
+
+def _weekly_written(db: AsyncSession) -> None:
+    db.info[_WEEKLY_UNSTAMPED] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _stamp_weekly_totals(session: Session) -> None:
+    if session.info.pop(_WEEKLY_UNSTAMPED, False):
+        session.execute(
+            update(WeeklyTotal)
+            .where(WeeklyTotal.updated_at.is_(None))
+            .values(updated_at=func.clock_timestamp())
+            .execution_options(synchronize_session=False)
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_weekly_totals(session: Session) -> None:
+    session.info.pop(_WEEKLY_UNSTAMPED, None)
+
+
+def _iso_week(visited_at: datetime) -> tuple[int, int]:
+    """(ISO year, ISO week) of a visit in the league's timezone."""
+    dt = _utc(visited_at).replace(tzinfo=timezone.utc)
+    iso = dt.astimezone(ZoneInfo(settings.TIMEZONE)).isocalendar()
+    return iso.year, iso.week
+
+
+async def apply_total_deltas(db: AsyncSession, visited_at: datetime, deltas: dict[int, list]) -> None:
+    """Add {user_id: [points, visit_count]} of one visit to every totals table.
+
+    user_totals.visit_count is not a scored count (see refresh_visit_counts)
+    and only gets the points.
+    """
+    values = [
+        {"user_id": uid, "points": points, "visit_count": visits}
+        for uid, (points, visits) in deltas.items()
+        if points or visits
+    ]
+    if not values:
+        return
+    iso_year, iso_week = _iso_week(visited_at)
+    for model, keys, extra in (
+        (UserTotal, ["user_id"], {}),
+        (UserSeasonTotal, ["user_id", "season"], {"season": _season_of(visited_at)}),
+        (WeeklyTotal, ["iso_year", "iso_week", "user_id"], {"iso_year": iso_year, "iso_week": iso_week}),
+    ):
+        if model is UserTotal:
+            stmt = pg_insert(model).values([{"user_id": v["user_id"], "points": v["points"]} for v in values])
+            set_ = {"points": model.points + stmt.excluded.points}
+        else:
+            stmt = pg_insert(model).values([{**v, **extra} for v in values])
+            set_ = {
+                "points": model.points + stmt.excluded.points,
+                "visit_count": model.visit_count + stmt.excluded.visit_count,
+            }
+        if model is WeeklyTotal:
+            set_["updated_at"] = None
+        await db.execute(stmt.on_conflict_do_update(index_elements=keys, set_=set_))
+    _weekly_written(db)
+
+
+async def rebuild_user_totals(db: AsyncSession) -> None:
+    """Recompute every totals table from point_logs (no commit).
+
+    Weekly rows are updated in place rather than replaced, and only when
+    their numbers change; a week a user no longer has points in is kept
+    with zeros, so the Sheets export overwrites its row instead of leaving
+    the old numbers behind.
+    """
+    await db.execute(delete(UserSeasonTotal))
+    await db.execute(delete(UserTotal))
+    local = func.timezone(settings.TIMEZONE, Visit.visited_at)
+    iso_year = func.extract("isoyear", local).cast(Integer)
+    iso_week = func.extract("week", local).cast(Integer)
+    weeks = (
+        select(
+            PointLog.user_id.label("user_id"),
+            iso_year.label("iso_year"),
+            iso_week.label("iso_week"),
+            func.sum(PointLog.points).label("points"),
+            func.count().filter(PointLog.reason == "base").label("visit_count"),
+        )
+        .join(Visit, Visit.id == PointLog.visit_id)
+        .group_by(PointLog.user_id, iso_year, iso_week)
+        .subquery()
+    )
+    await db.execute(
+        update(WeeklyTotal)
+        .where(
+            (WeeklyTotal.points != 0) | (WeeklyTotal.visit_count != 0),
+            ~exists().where(
+                weeks.c.user_id == WeeklyTotal.user_id,
+                weeks.c.iso_year == WeeklyTotal.iso_year,
+                weeks.c.iso_week == WeeklyTotal.iso_week,
+            ),
+        )
+        .values(points=0, visit_count=0, updated_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    stmt = pg_insert(WeeklyTotal).from_select(
+        ["user_id", "iso_year", "iso_week", "points", "visit_count"],
+        select(weeks),
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["iso_year", "iso_week", "user_id"],
+        set_={"points": stmt.excluded.points, "visit_count": stmt.excluded.visit_count, "updated_at": None},
+        where=(WeeklyTotal.points != stmt.excluded.points) | (WeeklyTotal.visit_count != stmt.excluded.visit_count),
+    ))
+    _weekly_written(db)
+    season = season_expr(Visit.visited_at)
+    await db.execute(
+        insert(UserSeasonTotal).from_select(
+            ["user_id", "season", "points", "visit_count"],
+            select(
+                PointLog.user_id,
+                season,
+                func.sum(PointLog.points),
+                func.count().filter(PointLog.reason == "base"),
+            )
+            .join(Visit, Visit.id == PointLog.visit_id)
+            .group_by(PointLog.user_id, season),
+        )
+    )
+    await db.execute(
+        insert(UserTotal).from_select(
+            ["user_id", "points", "visit_count"],
+            select(
+                UserSeasonTotal.user_id,
+                func.sum(UserSeasonTotal.points),
+                literal(0),
+            ).group_by(UserSeasonTotal.user_id),
+        )
+    )
+    await refresh_visit_counts(db)
+
+
+async def refresh_visit_counts(db: AsyncSession, user_ids=None) -> None:
+    """Recount user_totals.visit_count of *user_ids* (everyone when None), no commit.
+
+    Unlike the season and weekly counts it is not derived from point_logs:
+    it counts the user's participations in confirmed and pending visits,
+    with or without a bath. Callers that add or remove participants or
+    change a visit's status run it for the users involved.
+    """
+    if user_ids is not None:
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+    reset = update(UserTotal).values(visit_count=0).execution_options(synchronize_session=False)
+    counted = (
+        select(VisitParticipant.user_id, literal(0.0), func.count())
+        .join(Visit, Visit.id == VisitParticipant.visit_id)
+        .where(Visit.status.in_(COUNTED_STATUSES))
+        .group_by(VisitParticipant.user_id)
+    )
+    if user_ids is not None:
+        reset = reset.where(UserTotal.user_id.in_(user_ids))
+        counted = counted.where(VisitParticipant.user_id.in_(user_ids))
+    await db.execute(reset)
+    stmt = pg_insert(UserTotal).from_select(["user_id", "points", "visit_count"], counted)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["user_id"], set_={"visit_count": stmt.excluded.visit_count},
+    ))
+
+
+# ---------------------------------------------------------------------------
+# Per-user "firsts" index (new_region / new_country)
+# ---------------------------------------------------------------------------
+
+def _utc(dt: datetime) -> datetime:
+    return dt if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def _season_of(visited_at: datetime) -> int:
+    """Season of a visit: its calendar year in UTC (see season_expr)."""
+    return _utc(visited_at).year
+
+
+def season_expr(visited_at=Visit.visited_at):
+    """SQL for _season_of. UTC is explicit, so it does not depend on the
+    session TimeZone."""
+    return func.extract("year", func.timezone("UTC", visited_at)).cast(Integer)
+
+
+async def _first_keys(db: AsyncSession, visit_id: int) -> set[tuple]:
+    """user_firsts keys (user_id, season, kind, ref_id) a visit can occupy."""
+    q = await db.execute(
+        select(VisitParticipant.user_id, Visit.visited_at, Bath.region_id, Bath.country_id)
+        .join(Visit, Visit.id == VisitParticipant.visit_id)
+        .join(Bath, Bath.id == Visit.bath_id)
+        .where(VisitParticipant.visit_id == visit_id)
+    )
+    keys = set()
+    for user_id, visited_at, region_id, country_id in q.all():
+        season = _season_of(visited_at)
+        if region_id:
+            keys.add((user_id, season, "region", region_id))
+        if country_id:
+            keys.add((user_id, season, "country", country_id))
+    return keys
+
+
+async def refresh_user_firsts(db: AsyncSession, keys: set[tuple]) -> set[int]:
+    """Recompute the earliest active visit for each key; return the visits now holding them."""
+    holders: set[int] = set()
+    for user_id, season, kind, ref_id in keys:
+        ref_column = Bath.region_id if kind == "region" else Bath.country_id
+        first_q = await db.execute(
+            select(Visit.id)
+            .join(VisitParticipant, VisitParticipant.visit_id == Visit.id)
+            .join(Bath, Bath.id == Visit.bath_id)
+            .where(
                 and_(
-                    Visit.bath_id == visit.bath_id,
-                    Visit.id != visit_id,
-                    Visit.status.in_(["confirmed", "draft", "pending"]),
-                    Visit.visited_at >= ultraunique_start,
-                    Visit.visited_at < visit.visited_at,
+                    VisitParticipant.user_id == user_id,
+                    ref_column == ref_id,
+                    Visit.status.in_(ACTIVE_STATUSES),
+                    season_expr(Visit.visited_at) == season,
                 )
             )
+            .order_by(Visit.visited_at, Visit.created_at, Visit.id)
+            .limit(1)
+        )
+        first_id = first_q.scalar()
+        pk = and_(
+            UserFirst.user_id == user_id,
+            UserFirst.season == season,
+            UserFirst.kind == kind,
+            UserFirst.ref_id == ref_id,
+        )
+        if first_id is None:
+            await db.execute(delete(UserFirst).where(pk))
+            continue
+        holders.add(first_id)
+        await db.execute(
+            pg_insert(UserFirst)
+            .values(user_id=user_id, season=season, kind=kind, ref_id=ref_id, visit_id=first_id)
+            .on_conflict_do_update(
+                index_elements=["user_id", "season", "kind", "ref_id"],
+                set_={"visit_id": first_id},
+            )
         )
-        count = ultra_q.scalar() or 0
-        if count == 0:
-            # Same-day rule: must be first visit today to this bath
-            day_start = visit.visited_at.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = visit.visited_at.replace(hour=23, minute=59, second=59, microsecond=999999)
-            earlier_today_q = await db.execute(
-                select(func.count(Visit.id)).where(
-                    and_(
-                        Visit.bath_id == visit.bath_id,
-                        Visit.id != visit_id,
-                        Visit.status.in_(["confirmed", "draft", "pending"]),
-                        Visit.visited_at >= day_start,
-                        Visit.visited_at <= day_end,
-                        Visit.created_at < visit.created_at,
-                    )
+    return holders
+
+
+# ---------------------------------------------------------------------------
+# Bath first-visit index (ultraunique)
+# ---------------------------------------------------------------------------
+
+def _ultraunique_start() -> datetime:
+    return datetime.fromisoformat(settings.ULTRAUNIQUE_START_DATE).replace(tzinfo=timezone.utc)
+
+
+async def refresh_bath_firsts(db: AsyncSession, bath_ids: set[int]) -> set[int]:
+    """Recompute the first qualifying visit of each bath; return the visits now holding them.
+
+    Qualifying visits are active and not older than ULTRAUNIQUE_START_DATE.
+    They are ordered by day (UTC, like _bath_first_visits), and visits on
+    the same day by created_at.
+    """
+    holders: set[int] = set()
+    for bath_id in bath_ids:
+        first_q = await db.execute(
+            select(Visit.id)
+            .where(
+                and_(
+                    Visit.bath_id == bath_id,
+                    Visit.status.in_(ACTIVE_STATUSES),
+                    Visit.visited_at >= _ultraunique_start(),
                 )
             )
-            earlier_today = earlier_today_q.scalar() or 0
-            is_ultraunique = earlier_today == 0
+            .order_by(func.date(func.timezone("UTC", Visit.visited_at)), Visit.created_at, Visit.id)
+            .limit(1)
+        )
+        first_id = first_q.scalar()
+        if first_id is None:
+            await db.execute(delete(BathFirst).where(BathFirst.bath_id == bath_id))
+            continue
+        holders.add(first_id)
+        await db.execute(
+            pg_insert(BathFirst)
+            .values(bath_id=bath_id, visit_id=first_id)
+            .on_conflict_do_update(index_elements=["bath_id"], set_={"visit_id": first_id})
+        )
+    return holders
 
-    for uid in participant_ids:
-        # Base points
-        new_logs.append(PointLog(
-            user_id=uid, visit_id=visit_id,
-            points=cfg["base_points"], reason="base",
-        ))
-
-        # Long bonus
-        if visit.flag_long and cfg.get("long_bonus", 0) > 0:
-            new_logs.append(PointLog(
-                user_id=uid, visit_id=visit_id,
-                points=cfg["long_bonus"], reason="long",
-            ))
 
-        # Ultraunique bonus
-        if is_ultraunique and cfg.get("ultraunique_bonus", 0) > 0:
-            new_logs.append(PointLog(
-                user_id=uid, visit_id=visit_id,
-                points=cfg["ultraunique_bonus"], reason="ultraunique",
+# ---------------------------------------------------------------------------
+# Incremental cascading rescoring
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Dependencies:
+    """Index keys a visit occupies: its bonuses depend on their current holders."""
+    bath_ids: set[int] = field(default_factory=set)
+    first_keys: set[tuple] = field(default_factory=set)
+
+    def __or__(self, other: "Dependencies") -> "Dependencies":
+        return Dependencies(self.bath_ids | other.bath_ids, self.first_keys | other.first_keys)
+
+
+async def visit_dependencies(db: AsyncSession, visit_ids: int | list[int]) -> Dependencies:
+    """Collect the bath_firsts and user_firsts keys of the current state of visits.
+
+    Callers run it before a change and pass the result to recalculate_cascade,
+    which looks up the keys of the new state itself.
+    """
+    if isinstance(visit_ids, int):
+        visit_ids = [visit_ids]
+    deps = Dependencies()
+    for visit_id in visit_ids:
+        bath_q = await db.execute(select(Visit.bath_id).where(Visit.id == visit_id))
+        bath_id = bath_q.scalar()
+        if bath_id:
+            deps.bath_ids.add(bath_id)
+            deps.first_keys |= await _first_keys(db, visit_id)
+    return deps
+
+
+async def _index_holders(db: AsyncSession, deps: Dependencies) -> set[int]:
+    holders: set[int] = set()
+    if deps.bath_ids:
+        q = await db.execute(select(BathFirst.visit_id).where(BathFirst.bath_id.in_(deps.bath_ids)))
+        holders.update(q.scalars().all())
+    if deps.first_keys:
+        q = await db.execute(
+            select(UserFirst.visit_id).where(
+                tuple_(UserFirst.user_id, UserFirst.season, UserFirst.kind, UserFirst.ref_id)
+                .in_(list(deps.first_keys))
+            )
+        )
+        holders.update(q.scalars().all())
+    return holders
+
+
+async def recalculate_cascade(
+    db: AsyncSession, visit_ids: int | list[int], before: Dependencies | None = None
+) -> set[int]:
+    """Rescore changed visits plus every visit whose bonuses they can flip.
+
+    *before* comes from visit_dependencies() run before the change. The
+    bath_firsts and user_firsts entries for the keys of the old and new state
+    are refreshed, and the visits that held or now hold them are rescored
+    together with the changed visits in one transaction. Returns the rescored
+    visit ids.
+    """
+    if isinstance(visit_ids, int):
+        visit_ids = [visit_ids]
+    deps = (before or Dependencies()) | await visit_dependencies(db, visit_ids)
+
+    affected = set(visit_ids) | await _index_holders(db, deps)
+    affected |= await refresh_bath_firsts(db, deps.bath_ids)
+    affected |= await refresh_user_firsts(db, deps.first_keys)
+
+    cfg = await get_config(db)
+    for vid in sorted(affected):
+        await _rescore_visit(vid, db, cfg)
+    await db.commit()
+    _scores_changed()
+    return affected
+
+
+# ---------------------------------------------------------------------------
+# Set-based season rescoring
+# ---------------------------------------------------------------------------
+
+def _chronological(v) -> tuple:
+    # Same order as ORDER BY visited_at, created_at, id (NULLs last)
+    return (v.visited_at, v.created_at is None, v.created_at or v.visited_at, v.id)
+
+
+def _first_visits(visits: list, participants: dict[int, list[int]], baths: dict[int, tuple]) -> dict:
+    """Build the user_firsts index in memory from preloaded rows."""
+    firsts: dict[tuple, int] = {}
+    for v in sorted(visits, key=_chronological):
+        if v.status not in ACTIVE_STATUSES or v.bath_id not in baths:
+            continue
+        region_id, country_id = baths[v.bath_id]
+        season = _season_of(v.visited_at)
+        for uid in participants.get(v.id, ()):
+            if region_id:
+                firsts.setdefault((uid, season, "region", region_id), v.id)
+            if country_id:
+                firsts.setdefault((uid, season, "country", country_id), v.id)
+    return firsts
+
+
+def _bath_first_visits(visits: list, baths: dict[int, tuple]) -> dict[int, int]:
+    """Build the bath_firsts index in memory from preloaded rows."""
+    start = _ultraunique_start()
+    qualifying = [
+        v for v in visits
+        if v.status in ACTIVE_STATUSES and v.bath_id in baths and v.visited_at >= start
+    ]
+    # Same order as ORDER BY date(visited_at AT TIME ZONE 'UTC'), created_at, id
+    qualifying.sort(
+        key=lambda v: (_utc(v.visited_at).date(), v.created_at is None, v.created_at or v.visited_at, v.id)
+    )
+    bath_firsts: dict[int, int] = {}
+    for v in qualifying:
+        bath_firsts.setdefault(v.bath_id, v.id)
+    return bath_firsts
+
+
+def _score_visits(
+    visits: list,
+    participants: dict[int, list[int]],
+    baths: dict[int, tuple],
+    cfg: dict,
+    season: int | None = None,
+) -> list[dict]:
+    """Apply the recalculate_visit rules to preloaded rows, entirely in memory.
+
+    *visits* are rows of (id, bath_id, status, visited_at, created_at, flag_long),
+    *participants* maps visit id to user ids and *baths* maps bath id to
+    (region_id, country_id). Only visits in *season* (all when None) are scored,
+    but every visit is taken into account for the bonus checks.
+    """
+    visits = sorted(visits, key=_chronological)
+    bath_firsts = _bath_first_visits(visits, baths)
+    firsts = _first_visits(visits, participants, baths)
+
+    rows: list[dict] = []
+    for v in visits:
+        if season is not None and _season_of(v.visited_at) != season:
+            continue
+        if v.status in UNSCORED_STATUSES:
+            continue
+        uids = participants.get(v.id)
+        if not uids:
+            continue
+
+        bath = baths.get(v.bath_id) if v.bath_id else None
+
+        is_ultraunique = bool(bath) and bath_firsts.get(v.bath_id) == v.id
+        season_of_visit = _season_of(v.visited_at)
+        for uid in uids:
+            new_region = bool(
+                bath and bath[0] and firsts.get((uid, season_of_visit, "region", bath[0])) == v.id
+            )
+            new_country = bool(
+                bath and bath[1] and firsts.get((uid, season_of_visit, "country", bath[1])) == v.id
+            )
+            rows.extend(_participant_logs(
+                v.id, uid, cfg, v.flag_long, is_ultraunique, new_region, new_country
             ))
+    return rows
+
+
+async def _load_scoring_data(db: AsyncSession) -> tuple[list, dict, dict]:
+    visits_q = await db.execute(
+        select(
+            Visit.id, Visit.bath_id, Visit.status,
+            Visit.visited_at, Visit.created_at, Visit.flag_long,
+        )
+    )
+    visits = visits_q.all()
+
+    participants: dict[int, list[int]] = defaultdict(list)
+    parts_q = await db.execute(select(VisitParticipant.visit_id, VisitParticipant.user_id))
+    for visit_id, user_id in parts_q.all():
+        participants[visit_id].append(user_id)
+
+    baths_q = await db.execute(select(Bath.id, Bath.region_id, Bath.country_id))
+    baths = {bath_id: (region_id, country_id) for bath_id, region_id, country_id in baths_q.all()}
+    return visits, participants, baths
+
+
+async def recalculate_season(db: AsyncSession, season: int | None = None) -> dict:
+    """Rescore every visit of *season* (all visits when None) in one pass.
+
+    Loads visits, participants and baths once, scores them in memory with the
+    same rules as recalculate_visit and rewrites point_logs with a single bulk
+    insert. The bath_firsts and user_firsts indexes and the user totals are
+    rebuilt from scratch along the way.
+    """
+    cfg = await get_config(db)
+    visits, participants, baths = await _load_scoring_data(db)
+    rows = _score_visits(visits, participants, baths, cfg, season)
+
+    bath_firsts = _bath_first_visits(visits, baths)
+    await db.execute(delete(BathFirst))
+    if bath_firsts:
+        await db.execute(insert(BathFirst), [
+            {"bath_id": bath_id, "visit_id": visit_id} for bath_id, visit_id in bath_firsts.items()
+        ])
+
+    firsts = _first_visits(visits, participants, baths)
+    await db.execute(delete(UserFirst))
+    if firsts:
+        await db.execute(insert(UserFirst), [
+            {"user_id": uid, "season": season_, "kind": kind, "ref_id": ref_id, "visit_id": visit_id}
+            for (uid, season_, kind, ref_id), visit_id in firsts.items()
+        ])
 
-        # Region bonus: new region for this user in current season year
-        if bath and bath.region_id and cfg.get("region_bonus", 0) > 0:
-            prev_region_q = await db.execute(
-                select(func.count(Visit.id))
-                .join(VisitParticipant, VisitParticipant.visit_id == Visit.id)
-                .join(Bath, Bath.id == Visit.bath_id)
-                .where(
-                    and_(
-                        VisitParticipant.user_id == uid,
-                        Visit.id != visit_id,
-                        Bath.region_id == bath.region_id,
-                        Visit.status.in_(["confirmed", "draft", "pending"]),
-                        func.extract("year", Visit.visited_at) == settings.SEASON_START_YEAR,
-                    )
+    if season is None:
+        await db.execute(delete(PointLog))
+    else:
+        await db.execute(
+            delete(PointLog).where(
+                PointLog.visit_id.in_(
+                    select(Visit.id).where(season_expr(Visit.visited_at) == season)
                 )
             )
-            if (prev_region_q.scalar() or 0) == 0:
-                new_logs.append(PointLog(
-                    user_id=uid, visit_id=visit_id,
-                    points=cfg["region_bonus"], reason="new_region",
-                ))
-
-        # Country bonus: new country for this user in current season year
-        if bath and bath.country_id and cfg.get("country_bonus", 0) > 0:
-            prev_country_q = await db.execute(
-                select(func.count(Visit.id))
-                .join(VisitParticipant, VisitParticipant.visit_id == Visit.id)
-                .join(Bath, Bath.id == Visit.bath_id)
-                .where(
-                    and_(
-                        VisitParticipant.user_id == uid,
-                        Visit.id != visit_id,
-                        Bath.country_id == bath.country_id,
-                        Visit.status.in_(["confirmed", "draft", "pending"]),
-                        func.extract("year", Visit.visited_at) == settings.SEASON_START_YEAR,
-                    )
-                )
+        )
+    if rows:
+        await db.execute(insert(PointLog), rows)
+    await rebuild_user_totals(db)
+    await db.commit()
+    _scores_changed()
+
+    return {
+        "season": season,
+        "visits": len({row["visit_id"] for row in rows}),
+        "point_logs": len(rows),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Background rescoring after a settings change
+# ---------------------------------------------------------------------------
+
+RESCORE_BATCH_SIZE = 200  # visits per transaction when recomputing
+UPDATE_BATCH_SIZE = 5000  # point_logs ids per UPDATE when rescaling
+
+CONFIG_REASONS = {
+    "base_points": "base",
+    "long_bonus": "long",
+    "ultraunique_bonus": "ultraunique",
+    "region_bonus": "new_region",
+    "country_bonus": "new_country",
+}
+
+
+async def rescore_for_config_change(
+    job: Job, old_cfg: dict, new_cfg: dict, recompute: bool = False
+) -> None:
+    """Bring existing point_logs in line with changed point settings.
+
+    When every weight keeps its enabled (> 0) state, only point values change
+    and they are rewritten with set-based UPDATEs over point_logs id ranges.
+    When a bonus is switched on or off (or *recompute* is set, e.g. because
+    an unfinished job was superseded), rows appear or disappear, so every
+    visit is recomputed, one batch of visits per transaction. Either way
+    reads keep being served from the already committed batches.
+    """
+    changed = {key for key in CONFIG_REASONS if old_cfg.get(key) != new_cfg.get(key)}
+    toggled = {
+        key for key in changed
+        if key != "base_points" and (old_cfg.get(key, 0) > 0) != (new_cfg.get(key, 0) > 0)
+    }
+    job.detail["changed"] = sorted(changed)
+    if not changed and not recompute:
+        return
+
+    if toggled or recompute:
+        job.detail["mode"] = "recompute"
+        async with AsyncSessionLocal() as db:
+            ids_q = await db.execute(select(Visit.id).order_by(Visit.id))
+            visit_ids = list(ids_q.scalars().all())
+            job.total = len(visit_ids)
+            for i in range(0, len(visit_ids), RESCORE_BATCH_SIZE):
+                cfg = await get_config(db)
+                batch = visit_ids[i:i + RESCORE_BATCH_SIZE]
+                for vid in batch:
+                    await _rescore_visit(vid, db, cfg)
+                await db.commit()
+                _scores_changed()
+                job.done += len(batch)
+                await asyncio.sleep(0)
+        return
+
+    # Every reason is rewritten, so the result does not depend on which
+    # values the rows had before.
+    job.detail["mode"] = "update"
+    points = case(
+        *((PointLog.reason == reason, new_cfg[key]) for key, reason in CONFIG_REASONS.items()),
+        else_=PointLog.points,
+    )
+    async with AsyncSessionLocal() as db:
+        bounds_q = await db.execute(select(func.min(PointLog.id), func.max(PointLog.id)))
+        lo, hi = bounds_q.one()
+        if lo is None:
+            return
+        job.total = hi - lo + 1
+        for start in range(lo, hi + 1, UPDATE_BATCH_SIZE):
+            end = min(start + UPDATE_BATCH_SIZE, hi + 1)
+            await db.execute(
+                update(PointLog)
+                .where(PointLog.id >= start, PointLog.id < end)
+                .values(points=points)
+                .execution_options(synchronize_session=False)
             )
-            if (prev_country_q.scalar() or 0) == 0:
-                new_logs.append(PointLog(
-                    user_id=uid, visit_id=visit_id,
-                    points=cfg["country_bonus"], reason="new_country",
-                ))
+            await db.commit()
+            job.done += end - start
+            await asyncio.sleep(0)
 
-    db.add_all(new_logs)
-    await db.commit()
+        # Totals are derived from the rewritten points in one go at the end
+        await rebuild_user_totals(db)
+        await db.commit()
+        _scores_changed()
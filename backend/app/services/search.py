@@ -0,0 +1,106 @@
+"""Server-side text search over baths and users, backed by pg_trgm.
+
+Both tables have a trigram GIN index on a search text expression:
+``bath_search_text(name, aliases)`` (the name followed by every alias) and
+``user_search_text(full_name, username)``. The expressions are IMMUTABLE
+SQL functions, so queries that call them use the indexes.
+
+Two modes:
+    contains  case-insensitive substring match (ILIKE), alphabetical
+    similar   typo-tolerant: word similarity of the query to any part of
+              the text of at least SIMILARITY_THRESHOLD, best first
+"""
+
+from sqlalchemy import Select, func, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.db.models import Bath, User
+
+SIMILARITY_THRESHOLD = 0.3  # pg_trgm.word_similarity_threshold for "similar"
+
+SEARCH_FUNCTIONS_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION bath_search_text(name varchar, aliases varchar[])
+    RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE AS
+    $$ SELECT coalesce(name, '') || ' ' || coalesce(array_to_string(aliases, ' '), '') $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION user_search_text(full_name varchar, username varchar)
+    RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE AS
+    $$ SELECT coalesce(full_name, '') || ' ' || coalesce(username, '') $$
+    """,
+]
+SEARCH_INDEXES_SQL = [
+    """
+    CREATE INDEX IF NOT EXISTS ix_baths_search_trgm
+    ON baths USING gin (bath_search_text(name, aliases) gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_users_search_trgm
+    ON users USING gin (user_search_text(full_name, username) gin_trgm_ops)
+    """,
+]
+
+
+async def ensure_search_functions(conn: AsyncConnection) -> None:
+    """Create the search text functions; both modes need them."""
+    for sql in SEARCH_FUNCTIONS_SQL:
+        await conn.execute(text(sql))
+
+
+async def ensure_trigram(conn: AsyncConnection) -> None:
+    """Create pg_trgm and the trigram indexes when missing.
+
+    Run after ensure_search_functions, in a transaction of its own: without
+    pg_trgm "similar" searches fail and "contains" ones run unindexed.
+    """
+    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for sql in SEARCH_INDEXES_SQL:
+        await conn.execute(text(sql))
+
+
+def _escape_like(q: str) -> str:
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def _search(db: AsyncSession, query: Select, search_text, q: str, mode: str, order_by) -> list:
+    if mode == "similar":
+        await db.execute(
+            text("SELECT set_config('pg_trgm.word_similarity_threshold', :t, true)"),
+            {"t": str(SIMILARITY_THRESHOLD)},
+        )
+        score = func.word_similarity(q, search_text)
+        query = (
+            query.add_columns(score.label("score"))
+            .where(literal(q).op("<%")(search_text))
+            .order_by(score.desc(), order_by)
+        )
+        return [(row[0], float(row.score)) for row in (await db.execute(query)).all()]
+    query = query.where(search_text.ilike(f"%{_escape_like(q)}%")).order_by(order_by)
+    return [(obj, None) for obj in (await db.execute(query)).scalars().all()]
+
+
+async def search_baths(
+    db: AsyncSession,
+    q: str,
+    mode: str = "contains",
+    include_archived: bool = False,
+    limit: int = 50,
+    offset: int = 0,
+) -> list[tuple[Bath, float | None]]:
+    """(bath, similarity) pairs matching *q* by name or alias; similarity
+    is None in "contains" mode."""
+    query = select(Bath).limit(limit).offset(offset)
+    if not include_archived:
+        query = query.where(Bath.is_archived == False)
+    return await _search(db, query, func.bath_search_text(Bath.name, Bath.aliases), q, mode, Bath.name)
+
+
+async def search_users(
+    db: AsyncSession, q: str, mode: str = "contains", limit: int = 10
+) -> list[tuple[User, float | None]]:
+    """(user, similarity) pairs of active users matching *q* by name or username."""
+    query = select(User).where(User.is_active == True).limit(limit)
+    return await _search(
+        db, query, func.user_search_text(User.full_name, User.username), q, mode, User.full_name
+    )
@@ -17,40 +17,112 @@ Actual sheet layout (confirmed from file):
 """
 
 import asyncio
+import hashlib
+import itertools
 import json
+import logging
 import time
-import gspread
-from google.oauth2.service_account import Credentials
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, TypeVar
 
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.db.models import SheetSnapshot
+from app.db.session import AsyncSessionLocal
+from app.services import notify
+from app.services.sheets_api import SheetsAPIError, SheetsClient
+
+logger = logging.getLogger(__name__)
+T = TypeVar("T")
 
 # ---------------------------------------------------------------------------
-# Simple in-memory TTL cache (single process, shared across all requests)
+# In-memory stale-while-revalidate cache (single process, shared across all
+# requests)
+#
+#   age < CACHE_TTL - REFRESH_AHEAD   fresh, served as is
+#   age < CACHE_MAX_STALE             served as is, one background refresh
+#   older / missing                   callers wait for the (single) fetch
+#
+# Concurrent fetches of the same key share one in-flight task.
 # ---------------------------------------------------------------------------
 _cache: dict[str, tuple[float, object]] = {}
+_inflight: dict[str, asyncio.Task] = {}
 CACHE_TTL = 300  # 5 minutes
+REFRESH_AHEAD = 60  # start refreshing this long before CACHE_TTL runs out
+CACHE_MAX_STALE = 3600  # never serve anything older than this
+
+# hits/stale/misses: cache lookups; changed/unchanged: worksheets seen on
+# refetch; parses: views parsed from worksheet values
+_stats = {"hits": 0, "stale": 0, "misses": 0, "changed": 0, "unchanged": 0, "parses": 0}
+
+
+def cache_stats() -> dict:
+    return dict(_stats)
+
+
+def clear_cache() -> None:
+    """Forget every cached snapshot, so the next read fetches (benchmarks)."""
+    _cache.clear()
+
+
+def _refresh(key: str, fetch: Callable[[], Awaitable[T]]) -> "asyncio.Task[T]":
+    task = _inflight.get(key)
+    if task is not None:
+        return task
 
+    async def run() -> T:
+        try:
+            value = await fetch()
+            _cache[key] = (time.monotonic(), value)
+            return value
+        finally:
+            _inflight.pop(key, None)
 
-def _cache_get(key: str):
+    task = _inflight[key] = asyncio.get_running_loop().create_task(run())
+    return task
+
+
+def _log_refresh_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Background Sheets refresh failed: {task.exception()}")
+
+
+async def _cached(key: str, fetch: Callable[[], Awaitable[T]]) -> T:
     entry = _cache.get(key)
-    if entry and time.monotonic() - entry[0] < CACHE_TTL:
-        return entry[1]
-    _cache.pop(key, None)
-    return None
+    if entry is not None:
+        age = time.monotonic() - entry[0]
+        if age < CACHE_TTL - REFRESH_AHEAD:
+            _stats["hits"] += 1
+            return entry[1]  # type: ignore[return-value]
+        if age < CACHE_MAX_STALE:
+            _stats["stale"] += 1
+            if key not in _inflight:
+                _refresh(key, fetch).add_done_callback(_log_refresh_error)
+            return entry[1]  # type: ignore[return-value]
+    _stats["misses"] += 1
+    # A cancelled request must not cancel the fetch other callers wait on
+    return await asyncio.shield(_refresh(key, fetch))
 
 
-def _cache_set(key: str, value: object) -> None:
-    _cache[key] = (time.monotonic(), value)
+# One pooled API client per credentials, shared by every fetch
+_clients: dict[str, SheetsClient] = {}
 
 
-def _make_client(credentials: str) -> gspread.Client:
-    """Accept either a JSON string (from env var) or a file path."""
-    if credentials.strip().startswith("{"):
-        info = json.loads(credentials)
-        creds = Credentials.from_service_account_info(info, scopes=SCOPES)
-    else:
-        creds = Credentials.from_service_account_file(credentials, scopes=SCOPES)
-    return gspread.authorize(creds)
+def _client(credentials: str) -> SheetsClient:
+    if credentials not in _clients:
+        _clients[credentials] = SheetsClient(credentials)
+    return _clients[credentials]
+
+
+async def close_clients() -> None:
+    for client in _clients.values():
+        await client.close()
+    _clients.clear()
 
 
 def _to_int(raw) -> int:
@@ -86,21 +158,249 @@ def _str(raw) -> str:
     return str(raw).strip()
 
 
-def _open_sheet(sh, name: str):
+# ---------------------------------------------------------------------------
+# Snapshot of all league worksheets (one values:batchGet)
+# ---------------------------------------------------------------------------
+
+WEEKLY_SHEET = "недельный зачет"
+OVERALL_SHEET = "Общий зачет"
+BATHS_SHEET = "все бани"
+SHEET_NAMES = (WEEKLY_SHEET, OVERALL_SHEET, BATHS_SHEET)
+
+
+def _content_hash(values: list[list[str]]) -> str:
+    return hashlib.sha1(json.dumps(values, ensure_ascii=False).encode()).hexdigest()
+
+
+@dataclass
+class Snapshot:
+    """Raw values of every league worksheet plus the views derived from them."""
+    values: dict[str, list[list[str]]]
+    fetched_at: float = field(default_factory=time.time)
+    hashes: dict[str, str] = field(default_factory=dict)
+    # key -> (worksheets the view was parsed from, parsed value)
+    _views: dict[str, tuple[tuple[str, ...], object]] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self.hashes:
+            self.hashes = {name: _content_hash(v) for name, v in self.values.items()}
+
+    def view(self, key: str, sheets: tuple[str, ...], parse: Callable[[], T]) -> T:
+        """Parse a view of *sheets* once per worksheet content."""
+        if key not in self._views:
+            _stats["parses"] += 1
+            self._views[key] = (sheets, parse())
+        return self._views[key][1]  # type: ignore[return-value]
+
+
+def _merge_snapshot(previous: Snapshot | None, snap: Snapshot) -> Snapshot:
+    """Reuse what did not change since *previous*.
+
+    When no worksheet changed, *previous* itself is kept (with all its parsed
+    views) and only its fetch time moves forward. Otherwise views built
+    solely from unchanged worksheets are carried over to *snap*.
+    """
+    if previous is None:
+        return snap
+    changed = {name for name in snap.hashes if previous.hashes.get(name) != snap.hashes[name]}
+    _stats["changed"] += len(changed)
+    _stats["unchanged"] += len(snap.hashes) - len(changed)
+    if not changed:
+        previous.fetched_at = max(previous.fetched_at, snap.fetched_at)
+        return previous
+    for key, (sheets, value) in previous._views.items():
+        if not changed.intersection(sheets):
+            snap._views[key] = (sheets, value)
+    return snap
+
+
+def _current_snapshot(spreadsheet_id: str) -> Snapshot | None:
+    entry = _cache.get(_snapshot_key(spreadsheet_id))
+    return entry[1] if entry is not None else None  # type: ignore[return-value]
+
+
+async def _download_snapshot(credentials: str, spreadsheet_id: str) -> Snapshot:
+    client = _client(credentials)
     try:
-        return sh.worksheet(name)
-    except gspread.WorksheetNotFound:
-        titles = [w.title for w in sh.worksheets()]
-        raise ValueError(f"Лист '{name}' не найден. Доступные листы: {titles}")
+        values = await client.batch_get(spreadsheet_id, [f"'{name}'" for name in SHEET_NAMES])
+    except SheetsAPIError as e:
+        if e.status != 400:
+            raise
+        # An unknown sheet name makes the whole batchGet fail to parse its range
+        titles = await client.sheet_titles(spreadsheet_id)
+        missing = [name for name in SHEET_NAMES if name not in titles]
+        if not missing:
+            raise
+        raise ValueError(f"Лист '{missing[0]}' не найден. Доступные листы: {titles}")
+    return Snapshot(values=dict(zip(SHEET_NAMES, values)))
 
 
 # ---------------------------------------------------------------------------
-# Sync helpers (run in thread pool via asyncio.to_thread)
+# Persistence: snapshots are stored in sheet_snapshots so that a restarted
+# worker serves the last known data at once, and announced on
+# SNAPSHOT_CHANNEL so that other workers pick them up without calling Google.
 # ---------------------------------------------------------------------------
 
-def _sync_weekly_stats(credentials: str, spreadsheet_id: str, week_num: int) -> dict:
+SNAPSHOT_CHANNEL = "sheet_snapshot"
+_worker_id = uuid.uuid4().hex
+
+
+def _snapshot_key(spreadsheet_id: str) -> str:
+    return f"snapshot:{spreadsheet_id}"
+
+
+def _put_snapshot(spreadsheet_id: str, row: SheetSnapshot) -> None:
+    """Install a stored snapshot in the cache, aged by its fetch time.
+
+    However old it is, it is served (and revalidated in the background)
+    rather than making the first request wait for Google.
+    """
+    snap = Snapshot(values=json.loads(zlib.decompress(row.data)), fetched_at=row.fetched_at.timestamp())
+    current = _current_snapshot(spreadsheet_id)
+    if current is not None and current.fetched_at >= snap.fetched_at:
+        return
+    snap = _merge_snapshot(current, snap)
+    age = min(time.time() - snap.fetched_at, CACHE_TTL)
+    _cache[_snapshot_key(spreadsheet_id)] = (time.monotonic() - age, snap)
+
+
+async def _store_snapshot(spreadsheet_id: str, snap: Snapshot) -> None:
+    data = zlib.compress(json.dumps(snap.values, ensure_ascii=False).encode())
+    fetched_at = datetime.fromtimestamp(snap.fetched_at, timezone.utc)
+    async with AsyncSessionLocal() as db:
+        stmt = pg_insert(SheetSnapshot).values(
+            spreadsheet_id=spreadsheet_id, data=data, fetched_at=fetched_at
+        )
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=["spreadsheet_id"],
+            set_={"data": stmt.excluded.data, "fetched_at": stmt.excluded.fetched_at},
+        ))
+        await notify.notify(db, SNAPSHOT_CHANNEL, f"{_worker_id}:{spreadsheet_id}")
+        await db.commit()
+
+
+async def load_snapshots(spreadsheet_id: str | None = None) -> None:
+    """Fill the cache from sheet_snapshots (all spreadsheets when None)."""
+    async with AsyncSessionLocal() as db:
+        q = select(SheetSnapshot)
+        if spreadsheet_id is not None:
+            q = q.where(SheetSnapshot.spreadsheet_id == spreadsheet_id)
+        for row in (await db.execute(q)).scalars():
+            _put_snapshot(row.spreadsheet_id, row)
+
+
+def _log_load_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Loading shared Sheets snapshot failed: {task.exception()}")
+
+
+def on_snapshot_notify(payload: str) -> None:
+    """SNAPSHOT_CHANNEL handler: another worker stored a fresh snapshot.
+
+    An empty payload (notifications possibly missed) reloads every snapshot.
+    """
+    worker_id, _, spreadsheet_id = payload.partition(":")
+    if worker_id == _worker_id:
+        return
+    task = asyncio.get_running_loop().create_task(load_snapshots(spreadsheet_id or None))
+    task.add_done_callback(_log_load_error)
+
+
+async def _fetch_snapshot(credentials: str, spreadsheet_id: str) -> Snapshot:
+    snap = await _download_snapshot(credentials, spreadsheet_id)
+    snap = _merge_snapshot(_current_snapshot(spreadsheet_id), snap)
+    try:
+        await _store_snapshot(spreadsheet_id, snap)
+    except Exception as e:
+        logger.warning(f"Could not persist Sheets snapshot: {e}")
+    return snap
+
+
+# ---------------------------------------------------------------------------
+# Columnar worksheets
+#
+# A worksheet is turned into a SheetTable once per content: the header is
+# resolved into a {label: column} map, cells are split into per-column
+# arrays, and numbers are converted a whole column at a time. The parsers
+# below work on array slices instead of calling _to_int/_to_float per cell.
+# ---------------------------------------------------------------------------
+
+@dataclass
+class SheetTable:
+    """Rows below a header row, stored column by column.
+
+    Cells are kept as stripped string arrays; numeric values are computed
+    per column on first use, so a view only converts the columns it reads.
+    """
+    header: list[str]
+    columns: dict[str, int]  # header label -> first column with it
+    cells: list[np.ndarray]  # per column, stripped strings
+    rows: int
+    _numbers: dict[int, np.ndarray] = field(default_factory=dict, repr=False)
+
+    def col(self, label: str) -> int | None:
+        return self.columns.get(label)
+
+    def text(self, i: int) -> np.ndarray:
+        return self.cells[i] if i < len(self.cells) else np.full(self.rows, "")
+
+    def numbers(self, i: int) -> np.ndarray:
+        """Column *i* as float64 (_to_float of every cell)."""
+        if i not in self._numbers:
+            if i < len(self.cells):
+                # One conversion per distinct value: a column of counts has a handful
+                distinct, inverse = np.unique(self.cells[i], return_inverse=True)
+                self._numbers[i] = np.array([_to_float(v) for v in distinct.tolist()])[inverse]
+            else:
+                self._numbers[i] = np.zeros(self.rows)
+        return self._numbers[i]
+
+    def number_column(self, label: str) -> np.ndarray:
+        """Numeric column under *label*; zeros when there is no such column."""
+        i = self.columns.get(label)
+        return self.numbers(i) if i is not None else np.zeros(self.rows)
+
+    def number_block(self, cols: list[int]) -> np.ndarray:
+        """(rows, len(cols)) array of the numeric columns *cols*."""
+        if not cols:
+            return np.zeros((self.rows, 0))
+        return np.column_stack([self.numbers(i) for i in cols])
+
+
+def _sheet_table(data: list[list[str]], header_row: int | None = 0) -> SheetTable | None:
+    if header_row is None or header_row >= len(data):
+        return None
+    header = [_str(h) for h in data[header_row]]
+    body = data[header_row + 1:]
+    cells = [
+        np.strings.strip(np.array(column, dtype=str))
+        for column in itertools.zip_longest(*body, fillvalue="")
+    ]
+    columns: dict[str, int] = {}
+    for i, label in enumerate(header):
+        columns.setdefault(label, i)
+    return SheetTable(header, columns, cells, len(body))
+
+
+def _weekly_table(data: list[list[str]]) -> SheetTable | None:
+    """'недельный зачет': the header is the row with "Всего"."""
+    return _sheet_table(data, next((i for i, row in enumerate(data) if "Всего" in row), None))
+
+
+def _as_ints(numbers: np.ndarray) -> np.ndarray:
+    """Truncate like int(float(...)); NaN and inf become 0 as in _to_int."""
+    return np.where(np.isfinite(numbers), numbers, 0).astype(np.int64)
+
+
+# ---------------------------------------------------------------------------
+# Parsers (pure functions over columnar worksheets)
+# ---------------------------------------------------------------------------
+
+def _parse_weekly_stats(weekly_t: SheetTable | None, overall_t: SheetTable | None, week_num: int) -> dict:
     """Return weekly report: per-person visits+points for *week_num*, plus year top-3.
 
+    *weekly_t* and *overall_t* are the tables of 'недельный зачет' and 'Общий зачет'.
+
     Returns:
         {
           "weekly": [{name, visit_count, points}, ...],  # sorted by points desc
@@ -108,182 +408,137 @@ def _sync_weekly_stats(credentials: str, spreadsheet_id: str, week_num: int) ->
         }
     """
     week_key = f"W{week_num}"
-    sh = _make_client(credentials).open_by_key(spreadsheet_id)
 
     # ── 1. Visit counts from 'недельный зачет' ──────────────────────────────
-    ws1 = _open_sheet(sh, "недельный зачет")
-    data1 = ws1.get_all_values()
-
     visits_by_name: dict[str, int] = {}
     total_visits_by_name: dict[str, int] = {}
-    header_row_idx = next((i for i, row in enumerate(data1) if "Всего" in row), None)
-    if header_row_idx is not None:
-        h1 = data1[header_row_idx]
-        week_col1 = next((i for i, h in enumerate(h1) if _str(h) == week_key), None)
-        vsego_col = next((i for i, h in enumerate(h1) if _str(h) == "Всего"), None)
-        if week_col1 is not None:
-            for row in data1[header_row_idx + 1:]:
-                name = _str(row[0]) if row else ""
-                if not name:
-                    continue
-                count = _to_int(row[week_col1] if week_col1 < len(row) else "")
-                if count > 0:
-                    visits_by_name[name] = count
-                if vsego_col is not None and vsego_col < len(row):
-                    total_visits_by_name[name] = _to_int(row[vsego_col])
+    if weekly_t is not None and weekly_t.col(week_key) is not None:
+        names = weekly_t.text(0)
+        named = names != ""
+        counts = _as_ints(weekly_t.number_column(week_key))
+        totals = _as_ints(weekly_t.number_column("Всего"))
+        visited = named & (counts > 0)
+        visits_by_name = dict(zip(names[visited].tolist(), counts[visited].tolist()))
+        total_visits_by_name = dict(zip(names[named].tolist(), totals[named].tolist()))
 
     # ── 2. Points from 'Общий зачет' (weekly + year totals) ─────────────────
-    ws2 = _open_sheet(sh, "Общий зачет")
-    data2 = ws2.get_all_values()
-
     weekly_pts_by_name: dict[str, float] = {}
     year_rows: list[dict] = []
-
-    if data2:
-        h2 = data2[0]
-        week_col2 = next((i for i, h in enumerate(h2) if _str(h) == week_key), None)
-        itogo_col = next((i for i, h in enumerate(h2) if _str(h) == "Итого"), None)
-        kvo_col = next((i for i, h in enumerate(h2) if _str(h) == "К-во"), None)
-
-        for row in data2[1:]:
-            name = _str(row[0]) if row else ""
-            if not name:
-                continue
-            if week_col2 is not None and week_col2 < len(row):
-                pts = _to_float(row[week_col2])
-                if pts > 0:
-                    weekly_pts_by_name[name] = pts
-            if itogo_col is not None and itogo_col < len(row):
-                total_pts = _to_float(row[itogo_col])
-                total_v = _to_int(row[kvo_col] if kvo_col is not None and kvo_col < len(row) else "")
-                if total_pts > 0:
-                    year_rows.append({"name": name, "points": total_pts, "visit_count": total_v})
+    if overall_t is not None:
+        names = overall_t.text(0)
+        named = names != ""
+        if overall_t.col(week_key) is not None:
+            pts = overall_t.number_column(week_key)
+            scored = named & (pts > 0)
+            weekly_pts_by_name = dict(zip(names[scored].tolist(), pts[scored].tolist()))
+        if overall_t.col("Итого") is not None:
+            total_pts = overall_t.number_column("Итого")
+            total_v = _as_ints(overall_t.number_column("К-во"))
+            scored = named & (total_pts > 0)
+            year_rows = [
+                {"name": name, "points": p, "visit_count": v}
+                for name, p, v in zip(names[scored].tolist(), total_pts[scored].tolist(), total_v[scored].tolist())
+            ]
 
     # ── 3. Merge weekly data ────────────────────────────────────────────────
-    all_names = set(visits_by_name) | set(weekly_pts_by_name)
-    weekly = []
-    for name in all_names:
-        v = visits_by_name.get(name, 0)
-        pts = weekly_pts_by_name.get(name, 0.0)
-        if v <= 0 and pts <= 0:
-            continue
-        weekly.append({
+    weekly = [
+        {
             "name": name,
-            "visit_count": v,
-            "points": pts,
+            "visit_count": visits_by_name.get(name, 0),
+            "points": weekly_pts_by_name.get(name, 0.0),
             "total_visits": total_visits_by_name.get(name, 0),
-        })
-
+        }
+        for name in set(visits_by_name) | set(weekly_pts_by_name)
+    ]
     weekly.sort(key=lambda x: (-x["points"], -x["visit_count"]))
     year_top = sorted(year_rows, key=lambda x: -x["points"])[:3]
 
     return {"weekly": weekly, "year_top": year_top}
 
 
-def _sync_overall_stats(credentials: str, spreadsheet_id: str) -> list[dict]:
+def _parse_overall_stats(table: SheetTable | None) -> list[dict]:
     """Return overall standings from 'Общий зачет'."""
-    sh = _make_client(credentials).open_by_key(spreadsheet_id)
-    ws = _open_sheet(sh, "Общий зачет")
-    data = ws.get_all_values()
-
-    if not data:
+    if table is None:
         return []
 
-    header = data[0]
-    itogo_col = next((i for i, h in enumerate(header) if _str(h) == "Итого"), None)
-    kvo_col = next((i for i, h in enumerate(header) if _str(h) == "К-во"), None)
+    names = table.text(0)
+    pts = table.number_column("Итого")
+    kvo = _as_ints(table.number_column("К-во"))
+    keep = (names != "") & ((pts > 0) | (kvo > 0))
+    order = np.argsort(-pts[keep], kind="stable")
+    return [
+        {"name": name, "points": p, "visit_count": v}
+        for name, p, v in zip(names[keep][order].tolist(), pts[keep][order].tolist(), kvo[keep][order].tolist())
+    ]
 
-    results = []
-    for row in data[1:]:
-        name = _str(row[0]) if row else ""
-        if not name:
-            continue
-        pts = _to_float(row[itogo_col] if itogo_col is not None and itogo_col < len(row) else "")
-        kvo = _to_int(row[kvo_col] if kvo_col is not None and kvo_col < len(row) else "")
-        if pts > 0 or kvo > 0:
-            results.append({"name": name, "points": pts, "visit_count": kvo})
 
-    return sorted(results, key=lambda x: -x["points"])
-
-
-def _sync_bath_map(credentials: str, spreadsheet_id: str) -> list[dict]:
+def _parse_bath_map(table: SheetTable | None) -> list[dict]:
     """Return per-bath per-user visit counts from 'все бани'.
 
     Layout: row 0 = headers [Страна, Регион, <total>, user1, user2, ...]
             rows 1-6 = category summaries (country column is empty — skip)
             row 7+   = actual baths [country, region, bath_name, counts...]
     """
-    sh = _make_client(credentials).open_by_key(spreadsheet_id)
-    ws = _open_sheet(sh, "все бани")
-    data = ws.get_all_values()
-
-    if not data:
+    if table is None or len(table.cells) < 3:
         return []
 
-    header = data[0]
     # User names start at column 3 (after Страна, Регион, total)
-    user_names = [_str(h) for h in header[3:] if _str(h)]
+    user_cols = [i for i, h in enumerate(table.header) if i >= 3 and h]
+    user_names = [table.header[i] for i in user_cols]
+
+    # Skip category summary rows (country column is empty)
+    country, region, bath_name = table.text(0), table.text(1), table.text(2)
+    is_bath = (country != "") & (bath_name != "")
+    counts = _as_ints(table.number_block(user_cols))
+    counts[counts < 0] = 0
+    totals = counts.sum(axis=1)
+    rows = np.flatnonzero(is_bath & (totals > 0))
+    rows = rows[np.argsort(-totals[rows], kind="stable")]
 
     baths = []
-    for row in data[1:]:
-        # Skip category summary rows (country column is empty)
-        if len(row) < 3 or not _str(row[0]) or not _str(row[2]):
-            continue
-
-        country = _str(row[0])
-        region = _str(row[1])
-        bath_name = _str(row[2])
-
-        visitors = []
-        total = 0
-        for i, user_name in enumerate(user_names):
-            col_idx = i + 3
-            count = _to_int(row[col_idx] if col_idx < len(row) else "")
-            if count > 0:
-                visitors.append({"name": user_name, "visit_count": count})
-                total += count
-
-        if total > 0:
-            baths.append({
-                "bath_name": bath_name,
-                "city": region,
-                "country": country,
-                "total_visits": total,
-                "visitors": sorted(visitors, key=lambda x: -x["visit_count"]),
-            })
-
-    return sorted(baths, key=lambda x: -x["total_visits"])
+    for r in rows:
+        row_counts = counts[r]
+        visited = np.flatnonzero(row_counts)
+        visited = visited[np.argsort(-row_counts[visited], kind="stable")]
+        baths.append({
+            "bath_name": str(bath_name[r]),
+            "city": str(region[r]),
+            "country": str(country[r]),
+            "total_visits": int(totals[r]),
+            "visitors": [{"name": user_names[i], "visit_count": int(row_counts[i])} for i in visited],
+        })
+    return baths
 
 
 # ---------------------------------------------------------------------------
-# Async public API (with TTL cache)
+# Async public API (cached, see above)
 # ---------------------------------------------------------------------------
 
+async def get_snapshot(credentials: str, spreadsheet_id: str) -> Snapshot:
+    return await _cached(
+        _snapshot_key(spreadsheet_id),
+        lambda: _fetch_snapshot(credentials, spreadsheet_id),
+    )
+
+
+def _table(snap: Snapshot, sheet: str) -> SheetTable | None:
+    """Columnar *sheet* of *snap*, built once per worksheet content."""
+    build = _weekly_table if sheet == WEEKLY_SHEET else _sheet_table
+    return snap.view(f"table:{sheet}", (sheet,), lambda: build(snap.values[sheet]))
+
+
 async def get_weekly_stats(credentials: str, spreadsheet_id: str, week_num: int) -> dict:
-    key = f"weekly:{spreadsheet_id}:{week_num}"
-    cached = _cache_get(key)
-    if cached is not None:
-        return cached  # type: ignore[return-value]
-    result = await asyncio.to_thread(_sync_weekly_stats, credentials, spreadsheet_id, week_num)
-    _cache_set(key, result)
-    return result
+    snap = await get_snapshot(credentials, spreadsheet_id)
+    return snap.view(f"weekly:{week_num}", (WEEKLY_SHEET, OVERALL_SHEET), lambda: _parse_weekly_stats(
+        _table(snap, WEEKLY_SHEET), _table(snap, OVERALL_SHEET), week_num
+    ))
 
 
 async def get_overall_stats(credentials: str, spreadsheet_id: str) -> list[dict]:
-    key = f"overall:{spreadsheet_id}"
-    cached = _cache_get(key)
-    if cached is not None:
-        return cached  # type: ignore[return-value]
-    result = await asyncio.to_thread(_sync_overall_stats, credentials, spreadsheet_id)
-    _cache_set(key, result)
-    return result
+    snap = await get_snapshot(credentials, spreadsheet_id)
+    return snap.view("overall", (OVERALL_SHEET,), lambda: _parse_overall_stats(_table(snap, OVERALL_SHEET)))
 
 
 async def get_bath_map(credentials: str, spreadsheet_id: str) -> list[dict]:
-    key = f"bathmap:{spreadsheet_id}"
-    cached = _cache_get(key)
-    if cached is not None:
-        return cached  # type: ignore[return-value]
-    result = await asyncio.to_thread(_sync_bath_map, credentials, spreadsheet_id)
-    _cache_set(key, result)
-    return result
+    snap = await get_snapshot(credentials, spreadsheet_id)
+    return snap.view("bathmap", (BATHS_SHEET,), lambda: _parse_bath_map(_table(snap, BATHS_SHEET)))
@@ -0,0 +1,168 @@
+"""Minimal asyncio client for the Google Sheets v4 REST API.
+
+Only the calls the league needs are implemented. Requests share one pooled
+aiohttp session per client, have a total timeout and are retried with
+exponential backoff on 429, 5xx and network errors (non-idempotent calls
+only on 429, which the API rejects before applying). The service-account
+access token is refreshed in a worker thread (google-auth is blocking) when
+it expires or the API answers 401. With empty credentials or
+GOOGLE_SHEETS_AUTH=false no token is sent at all, which is what a local
+fake Sheets server (scripts/fake_sheets.py) expects.
+"""
+
+import asyncio
+import json
+import logging
+import random
+from urllib.parse import quote
+
+import aiohttp
+from google.auth.transport.requests import Request
+from google.oauth2.service_account import Credentials
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
+WRITE_SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SheetsAPIError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Sheets API {status}: {message}")
+        self.status = status
+
+
+def _load_credentials(credentials: str, scopes: list[str]) -> Credentials:
+    """Accept either a JSON string (from env var) or a file path."""
+    if credentials.strip().startswith("{"):
+        return Credentials.from_service_account_info(json.loads(credentials), scopes=scopes)
+    return Credentials.from_service_account_file(credentials, scopes=scopes)
+
+
+class SheetsClient:
+    def __init__(
+        self,
+        credentials: str,
+        base_url: str | None = None,
+        timeout: float = 20,
+        retries: int = 4,
+        backoff: float = 0.5,
+        pool_size: int = 10,
+        scopes: list[str] = SCOPES,
+    ):
+        self.credentials = credentials
+        self.scopes = scopes
+        self.base_url = (base_url or settings.GOOGLE_SHEETS_API_URL).rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self._creds: Credentials | None = None
+        self._token_lock = asyncio.Lock()
+        self._session: aiohttp.ClientSession | None = None
+
+    async def _token(self, force: bool = False) -> str | None:
+        if not self.credentials or not settings.GOOGLE_SHEETS_AUTH:
+            return None
+        async with self._token_lock:
+            if self._creds is None:
+                self._creds = await asyncio.to_thread(_load_credentials, self.credentials, self.scopes)
+            if force or not self._creds.valid:
+                await asyncio.to_thread(self._creds.refresh, Request())
+            return self._creds.token
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def request(self, method: str, path: str, retry: bool = True, **kwargs) -> dict:
+        """Send a request, retrying transient failures; return the JSON body.
+
+        With retry=False a timeout, network error or 5xx is raised at once:
+        the request may have been applied even though its answer was lost.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        force_refresh = False
+        for attempt in range(self.retries + 1):
+            token = await self._token(force=force_refresh)
+            force_refresh = False
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+            try:
+                async with self._get_session().request(method, url, headers=headers, **kwargs) as resp:
+                    if resp.status < 400:
+                        return await resp.json(content_type=None)
+                    body = await resp.text()
+                    if resp.status == 401 and token and attempt < self.retries:
+                        force_refresh = True
+                        continue
+                    retriable = resp.status == 429 or (retry and resp.status in RETRY_STATUSES)
+                    if not retriable or attempt == self.retries:
+                        raise SheetsAPIError(resp.status, body[:500])
+                    logger.warning(f"Sheets API {resp.status}, retrying ({attempt + 1}/{self.retries})")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not retry or attempt == self.retries:
+                    raise
+                logger.warning(f"Sheets API request failed, retrying ({attempt + 1}/{self.retries}): {e!r}")
+            await asyncio.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+        raise AssertionError("unreachable")
+
+    async def sheet_titles(self, spreadsheet_id: str) -> list[str]:
+        data = await self.request(
+            "GET", f"spreadsheets/{quote(spreadsheet_id)}",
+            params={"fields": "sheets.properties.title"},
+        )
+        return [s["properties"]["title"] for s in data.get("sheets", [])]
+
+    async def batch_get(self, spreadsheet_id: str, ranges: list[str]) -> list[list[list[str]]]:
+        """Values of *ranges* (formatted, as shown in the UI) in one request."""
+        data = await self.request(
+            "GET", f"spreadsheets/{quote(spreadsheet_id)}/values:batchGet",
+            params=[("ranges", r) for r in ranges],
+        )
+        return [vr.get("values", []) for vr in data.get("valueRanges", [])]
+
+    async def sheet_properties(self, spreadsheet_id: str) -> dict[str, dict]:
+        """{title: {"sheet_id", "row_count"}} of every worksheet."""
+        data = await self.request(
+            "GET", f"spreadsheets/{quote(spreadsheet_id)}",
+            params={"fields": "sheets.properties(sheetId,title,gridProperties.rowCount)"},
+        )
+        return {
+            s["properties"]["title"]: {
+                "sheet_id": s["properties"]["sheetId"],
+                "row_count": s["properties"].get("gridProperties", {}).get("rowCount", 0),
+            }
+            for s in data.get("sheets", [])
+        }
+
+    async def batch_update(self, spreadsheet_id: str, requests: list[dict]) -> dict:
+        """spreadsheets:batchUpdate (structural changes: add sheets, rows...).
+
+        Not retried on lost answers: adding a sheet or rows twice is not
+        harmless. Callers re-read sheet_properties on their next run.
+        """
+        return await self.request(
+            "POST", f"spreadsheets/{quote(spreadsheet_id)}:batchUpdate",
+            retry=False, json={"requests": requests},
+        )
+
+    async def batch_update_values(
+        self, spreadsheet_id: str, data: list[dict], value_input_option: str = "RAW"
+    ) -> dict:
+        """Write several {"range", "values"} blocks with one values:batchUpdate."""
+        return await self.request(
+            "POST", f"spreadsheets/{quote(spreadsheet_id)}/values:batchUpdate",
+            json={"valueInputOption": value_input_option, "data": data},
+        )
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
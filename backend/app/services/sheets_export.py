@@ -0,0 +1,350 @@
+"""Incremental DB-to-Sheets export.
+
+Mirrors visits and per-user weekly points into two bot-owned worksheets of
+SHEETS_EXPORT_SPREADSHEET_ID (the hand-maintained league sheets are never
+touched). Each stream keeps a high-water mark of the last exported
+``updated_at`` in sheet_export_state, and sheet_export_rows remembers which
+row every record was written to. A run only sends records changed since the
+mark: changed ones overwrite their row, new ones get the next free row.
+Weekly totals are never deleted, only zeroed, so a week that loses its
+points is sent as a row of zeros rather than left stale in the sheet.
+Everything goes out in values:batchUpdate calls, so a whole sheet is never
+rewritten.
+
+Runs are debounced: schedule_export() is called after every change and a
+burst of them results in one run EXPORT_DEBOUNCE seconds later. A
+transaction-level advisory lock keeps workers from exporting concurrently.
+"""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import event, func, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models import (
+    Bath, SheetExportRow, SheetExportState, User, Visit, VisitParticipant, WeeklyTotal,
+)
+from app.db.session import AsyncSessionLocal
+from app.services.sheets_api import WRITE_SCOPES, SheetsClient
+
+logger = logging.getLogger(__name__)
+
+VISITS_SHEET = "Бот: визиты"
+WEEKLY_SHEET = "Бот: недели"
+VISITS_HEADER = ["ID", "Дата", "Баня", "Участники", "Статус", "Долгий", "Изменён"]
+WEEKLY_HEADER = ["Год", "Неделя", "Участник", "Визиты", "Очки"]
+
+EXPORT_BATCH_SIZE = 500  # records per values:batchUpdate
+# Re-read records this far behind the mark: two transactions committing at
+# about the same time may become visible in the opposite order of their
+# stamps. Rewriting a row is harmless. weekly_totals rows (see
+# app.services.points) and visits (see touch_visits) are stamped just before
+# commit, so how long the writing transaction ran does not matter.
+HIGH_WATER_OVERLAP = timedelta(seconds=10)
+GRID_HEADROOM = 500  # rows added at once when a sheet runs out of rows
+EXPORT_LOCK_ID = 0x45424C01  # pg advisory lock key
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_export_task: asyncio.Task | None = None
+_client: SheetsClient | None = None
+
+
+def _creds() -> str:
+    """Return JSON string from env var, or fall back to local file path."""
+    if settings.GOOGLE_CREDENTIALS_JSON:
+        return settings.GOOGLE_CREDENTIALS_JSON
+    here = os.path.dirname(__file__)
+    return os.path.join(here, "..", "..", "google_credentials.json")
+
+
+def _default_client() -> SheetsClient:
+    global _client
+    if _client is None:
+        _client = SheetsClient(_creds(), scopes=WRITE_SCOPES)
+    return _client
+
+
+# Visits to stamp at commit: ids (or selects of ids) collected per session
+_VISITS_TOUCHED = "visits_touched"  # Session.info key
+
+
+def touch_visits(db: AsyncSession, visit_ids) -> None:
+    """Mark visits (a list or a select of ids) as changed for the export.
+
+    Their updated_at is set with clock_timestamp() right before the
+    transaction commits, like weekly_totals, so a long transaction cannot
+    commit stamps behind a mark the export has already moved past.
+    """
+    db.info.setdefault(_VISITS_TOUCHED, []).append(visit_ids)
+
+
+@event.listens_for(Session, "before_commit")
+def _stamp_visits(session: Session) -> None:
+    for visit_ids in session.info.pop(_VISITS_TOUCHED, []):
+        session.execute(
+            update(Visit)
+            .where(Visit.id.in_(visit_ids))
+            .values(updated_at=func.clock_timestamp())
+            .execution_options(synchronize_session=False)
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_visits(session: Session) -> None:
+    session.info.pop(_VISITS_TOUCHED, None)
+
+
+class _Busy(Exception):
+    """Another worker holds the export lock."""
+
+
+async def _lock(db: AsyncSession) -> None:
+    """Take the export lock for the current transaction or raise _Busy."""
+    locked = await db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": EXPORT_LOCK_ID})
+    if not locked.scalar():
+        raise _Busy
+
+
+@dataclass
+class _Record:
+    key: str
+    values: list
+    updated_at: datetime
+
+
+# ---------------------------------------------------------------------------
+# Change readers: records of a stream changed after the high-water mark
+# ---------------------------------------------------------------------------
+
+async def _changed_visits(db: AsyncSession, since: datetime, after: tuple | None) -> list[_Record]:
+    q = (
+        select(Visit.id, Visit.visited_at, Visit.status, Visit.flag_long, Visit.updated_at, Bath.name)
+        .outerjoin(Bath, Bath.id == Visit.bath_id)
+        .where(Visit.updated_at > since)
+        .order_by(Visit.updated_at, Visit.id)
+        .limit(EXPORT_BATCH_SIZE)
+    )
+    if after is not None:
+        q = q.where(tuple_(Visit.updated_at, Visit.id) > after)
+    visits = (await db.execute(q)).all()
+    if not visits:
+        return []
+
+    names: dict[int, list[str]] = {}
+    parts_q = await db.execute(
+        select(VisitParticipant.visit_id, User.full_name)
+        .join(User, User.id == VisitParticipant.user_id)
+        .where(VisitParticipant.visit_id.in_([v.id for v in visits]))
+        .order_by(User.full_name)
+    )
+    for visit_id, name in parts_q.all():
+        names.setdefault(visit_id, []).append(name)
+
+    tz = ZoneInfo(settings.TIMEZONE)
+    return [
+        _Record(
+            key=str(v.id),
+            values=[
+                v.id,
+                v.visited_at.astimezone(tz).strftime("%Y-%m-%d %H:%M"),
+                v.name or "",
+                ", ".join(names.get(v.id, [])),
+                v.status,
+                "да" if v.flag_long else "",
+                v.updated_at.astimezone(tz).strftime("%Y-%m-%d %H:%M:%S"),
+            ],
+            updated_at=v.updated_at,
+        )
+        for v in visits
+    ]
+
+
+async def _changed_weeks(db: AsyncSession, since: datetime, after: tuple | None) -> list[_Record]:
+    q = (
+        select(WeeklyTotal, User.full_name)
+        .join(User, User.id == WeeklyTotal.user_id)
+        .where(WeeklyTotal.updated_at > since)
+        .order_by(WeeklyTotal.updated_at, WeeklyTotal.iso_year, WeeklyTotal.iso_week, WeeklyTotal.user_id)
+        .limit(EXPORT_BATCH_SIZE)
+    )
+    if after is not None:
+        q = q.where(
+            tuple_(WeeklyTotal.updated_at, WeeklyTotal.iso_year, WeeklyTotal.iso_week, WeeklyTotal.user_id)
+            > after
+        )
+    return [
+        _Record(
+            key=f"{w.iso_year}:{w.iso_week}:{w.user_id}",
+            values=[w.iso_year, w.iso_week, name, w.visit_count, round(w.points, 4)],
+            updated_at=w.updated_at,
+        )
+        for w, name in (await db.execute(q)).all()
+    ]
+
+
+def _cursor(stream: str, record: _Record) -> tuple:
+    if stream == "visits":
+        return record.updated_at, int(record.key)
+    iso_year, iso_week, user_id = (int(x) for x in record.key.split(":"))
+    return record.updated_at, iso_year, iso_week, user_id
+
+
+STREAMS = {
+    # stream: (worksheet, header, reader)
+    "visits": (VISITS_SHEET, VISITS_HEADER, _changed_visits),
+    "weekly": (WEEKLY_SHEET, WEEKLY_HEADER, _changed_weeks),
+}
+
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+
+def _column(n: int) -> str:
+    """1-based column number to A1 letters."""
+    letters = ""
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _row_range(sheet: str, row: int, width: int) -> str:
+    return f"'{sheet}'!A{row}:{_column(width)}{row}"
+
+
+async def _ensure_rows(
+    client: SheetsClient, spreadsheet_id: str, props: dict, sheet: str, header: list, rows_needed: int
+) -> list[dict]:
+    """Create *sheet* or grow its grid as needed; header write if created."""
+    data = []
+    if sheet not in props:
+        resp = await client.batch_update(spreadsheet_id, [{"addSheet": {"properties": {"title": sheet}}}])
+        added = resp["replies"][0]["addSheet"]["properties"]
+        props[sheet] = {
+            "sheet_id": added["sheetId"],
+            "row_count": added.get("gridProperties", {}).get("rowCount", 1000),
+        }
+        data.append({"range": _row_range(sheet, 1, len(header)), "values": [header]})
+    if rows_needed > props[sheet]["row_count"]:
+        extra = rows_needed - props[sheet]["row_count"] + GRID_HEADROOM
+        await client.batch_update(spreadsheet_id, [{
+            "appendDimension": {"sheetId": props[sheet]["sheet_id"], "dimension": "ROWS", "length": extra}
+        }])
+        props[sheet]["row_count"] += extra
+    return data
+
+
+async def _export_stream(
+    db: AsyncSession, client: SheetsClient, spreadsheet_id: str, props: dict, stream: str
+) -> int:
+    sheet, header, reader = STREAMS[stream]
+    state = await db.get(SheetExportState, stream)
+    high_water = state.high_water if state else _EPOCH
+    since = high_water - HIGH_WATER_OVERLAP
+    exported = 0
+    after = None
+
+    while True:
+        records = await reader(db, since, after)
+        if not records:
+            break
+
+        keys = [r.key for r in records]
+        known_q = await db.execute(
+            select(SheetExportRow.key, SheetExportRow.row)
+            .where(SheetExportRow.sheet == sheet, SheetExportRow.key.in_(keys))
+        )
+        rows = dict(known_q.all())
+        last_q = await db.execute(select(func.max(SheetExportRow.row)).where(SheetExportRow.sheet == sheet))
+        next_row = (last_q.scalar() or 1) + 1
+        new_rows = []
+        for key in keys:
+            if key not in rows:
+                rows[key] = next_row
+                new_rows.append({"sheet": sheet, "key": key, "row": next_row})
+                next_row += 1
+
+        data = await _ensure_rows(client, spreadsheet_id, props, sheet, header, next_row - 1)
+        data += [
+            {"range": _row_range(sheet, rows[r.key], len(header)), "values": [r.values]}
+            for r in records
+        ]
+        await client.batch_update_values(spreadsheet_id, data)
+
+        if new_rows:
+            await db.execute(pg_insert(SheetExportRow).values(new_rows).on_conflict_do_nothing())
+        high_water = max(high_water, max(r.updated_at for r in records))
+        stmt = pg_insert(SheetExportState).values(stream=stream, high_water=high_water)
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=["stream"], set_={"high_water": stmt.excluded.high_water}
+        ))
+        await db.commit()
+        await _lock(db)
+        exported += len(records)
+        after = _cursor(stream, records[-1])
+        if len(records) < EXPORT_BATCH_SIZE:
+            break
+    return exported
+
+
+async def run_export(client: SheetsClient | None = None, spreadsheet_id: str | None = None) -> dict | None:
+    """Export everything changed since the last run.
+
+    Returns {stream: records written}, or None when another worker holds
+    the export lock. Each batch's row mapping and mark are committed right
+    after the batch was written, so a failed run resumes where it stopped.
+    """
+    client = client or _default_client()
+    spreadsheet_id = spreadsheet_id or settings.SHEETS_EXPORT_SPREADSHEET_ID
+    async with AsyncSessionLocal() as db:
+        try:
+            await _lock(db)
+            props = await client.sheet_properties(spreadsheet_id)
+            return {
+                stream: await _export_stream(db, client, spreadsheet_id, props, stream)
+                for stream in STREAMS
+            }
+        except _Busy:
+            return None
+
+
+async def _delayed_export() -> None:
+    global _export_task
+    await asyncio.sleep(settings.SHEETS_EXPORT_DEBOUNCE)
+    _export_task = None
+    try:
+        result = await run_export()
+    except Exception as e:
+        logger.warning(f"Sheets export failed: {e}")
+        return
+    if result is None:
+        schedule_export()  # another worker was exporting; our changes may be newer
+    elif any(result.values()):
+        logger.info(f"Sheets export: {result}")
+
+
+def schedule_export() -> None:
+    """Export soon; calls made while a run is pending are merged into it."""
+    global _export_task
+    if not settings.SHEETS_EXPORT_SPREADSHEET_ID or _export_task is not None:
+        return
+    try:
+        _export_task = asyncio.get_running_loop().create_task(_delayed_export())
+    except RuntimeError:
+        pass
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
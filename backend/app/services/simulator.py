@@ -0,0 +1,94 @@
+"""What-if scoring: leaderboards for candidate point weights, nothing is written.
+
+The season is scored once with every bonus enabled, using the same rules as
+recalculate_visit, and reduced to a per-user matrix of how many times each
+point reason was earned. A leaderboard for any set of weights is then a
+matrix product, so many variants are evaluated in one go.
+"""
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import User
+from app.services.points import CONFIG_REASONS, _load_scoring_data, _score_visits
+
+# Column order of the reason-count matrix
+WEIGHT_KEYS = tuple(CONFIG_REASONS)
+_REASON_COLUMN = {reason: i for i, reason in enumerate(CONFIG_REASONS.values())}
+_ALL_ENABLED = {key: 1.0 for key in WEIGHT_KEYS}
+
+
+async def load_reason_counts(db: AsyncSession, season: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Return (user_ids, counts) where counts[i, j] is how often user i earned reason j."""
+    visits, participants, baths = await _load_scoring_data(db)
+    rows = _score_visits(visits, participants, baths, _ALL_ENABLED, season)
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, len(WEIGHT_KEYS)))
+
+    row_users = np.fromiter((r["user_id"] for r in rows), dtype=np.int64, count=len(rows))
+    row_reasons = np.fromiter((_REASON_COLUMN[r["reason"]] for r in rows), dtype=np.int64, count=len(rows))
+    user_ids, user_index = np.unique(row_users, return_inverse=True)
+
+    counts = np.zeros((len(user_ids), len(WEIGHT_KEYS)))
+    np.add.at(counts, (user_index, row_reasons), 1)
+    return user_ids, counts
+
+
+def weight_matrix(variants: list[dict]) -> np.ndarray:
+    """Stack weight variants into a (len(WEIGHT_KEYS), n_variants) matrix.
+
+    A bonus with a weight <= 0 is never logged by recalculate_visit, so it
+    contributes nothing rather than a negative amount; base points always count.
+    """
+    weights = np.array([[variant[key] for key in WEIGHT_KEYS] for variant in variants], dtype=float).T
+    bonus_rows = np.array([key != "base_points" for key in WEIGHT_KEYS])
+    weights[bonus_rows] = np.where(weights[bonus_rows] > 0, weights[bonus_rows], 0.0)
+    return weights
+
+
+async def simulate(
+    db: AsyncSession,
+    variants: list[dict],
+    season: int | None = None,
+    limit: int = 20,
+) -> list[dict]:
+    """Leaderboard (top *limit*) for each full weight dict in *variants*.
+
+    Like the DB leaderboard, only active users are ranked and equal points
+    share a rank (1, 1, 3, ...); ties are listed by name.
+    """
+    user_ids, counts = await load_reason_counts(db, season)
+    users_q = await db.execute(
+        select(User.id, User.full_name, User.username)
+        .where(User.id.in_(user_ids.tolist()), User.is_active == True)
+    )
+    names = {uid: (full_name, username) for uid, full_name, username in users_q.all()}
+    active = np.fromiter((int(uid) in names for uid in user_ids), dtype=bool, count=len(user_ids))
+    user_ids, counts = user_ids[active], counts[active]
+
+    points = counts @ weight_matrix(variants)  # (n_users, n_variants)
+    visit_counts = counts[:, _REASON_COLUMN["base"]].astype(int)
+    full_names = np.array([names[int(uid)][0] or "" for uid in user_ids], dtype=str)
+
+    results = []
+    for j, variant in enumerate(variants):
+        negated = -points[:, j]
+        order = np.lexsort((user_ids, full_names, negated))[:limit]
+        # RANK(): one plus the number of users with more points
+        ranks = np.searchsorted(np.sort(negated), negated[order], side="left") + 1
+        results.append({
+            "config": variant,
+            "leaderboard": [
+                {
+                    "rank": int(rank),
+                    "user_id": int(user_ids[i]),
+                    "name": names[int(user_ids[i])][0],
+                    "username": names[int(user_ids[i])][1],
+                    "points": float(points[i, j]),
+                    "visit_count": int(visit_counts[i]),
+                }
+                for rank, i in zip(ranks, order)
+            ],
+        })
+    return results
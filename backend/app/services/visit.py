@@ -2,7 +2,11 @@ from datetime import datetime, timezone
 from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models import Visit, VisitParticipant, User
-from app.services.points import recalculate_visit
+from app.services.bath import learn_alias
+from app.services.points import (
+    recalculate_visit, recalculate_cascade, refresh_visit_counts, visit_dependencies,
+)
+from app.services.sheets_export import schedule_export, touch_visits
 
 
 async def get_or_create_user(db: AsyncSession, tg_user) -> User:
@@ -39,6 +43,7 @@ async def create_visit(
     participant_ids: list[int],
     flag_long: bool = False,
     visited_at: datetime | None = None,
+    bath_query: str | None = None,
 ) -> Visit:
     now = datetime.now(timezone.utc)
     visit = Visit(
@@ -49,29 +54,42 @@ async def create_visit(
         status="confirmed",
         visited_at=visited_at or now,
         flag_long=flag_long,
+        bath_query=bath_query,
     )
     db.add(visit)
     await db.flush()
 
     for uid in set(participant_ids):
         db.add(VisitParticipant(visit_id=visit.id, user_id=uid))
+    await db.flush()
+    touch_visits(db, [visit.id])
+    await refresh_visit_counts(db, set(participant_ids))
 
     await db.commit()
     await db.refresh(visit)
 
     if bath_id:
-        await recalculate_visit(visit.id, db)
+        await recalculate_cascade(db, visit.id)
+    else:
+        schedule_export()
 
     return visit
 
 
-async def update_visit_bath(db: AsyncSession, visit_id: int, bath_id: int) -> Visit:
+async def update_visit_bath(
+    db: AsyncSession, visit_id: int, bath_id: int, learn: bool = False
+) -> Visit:
+    """Set the bath of a visit; with *learn*, a user picked it for the
+    mention and its text is recorded as an alias of the bath."""
     q = await db.execute(select(Visit).where(Visit.id == visit_id))
     visit = q.scalar_one()
+    before = await visit_dependencies(db, visit_id)
     visit.bath_id = bath_id
-    visit.updated_at = datetime.now(timezone.utc)
-    await db.commit()
-    await recalculate_visit(visit_id, db)
+    touch_visits(db, [visit_id])
+    if learn and visit.bath_query:
+        await learn_alias(db, visit.bath_query, bath_id)
+    await db.flush()
+    await recalculate_cascade(db, visit_id, before)
     await db.refresh(visit)
     return visit
 
@@ -80,7 +98,7 @@ async def set_flag_long(db: AsyncSession, visit_id: int, value: bool) -> Visit:
     q = await db.execute(select(Visit).where(Visit.id == visit_id))
     visit = q.scalar_one()
     visit.flag_long = value
-    visit.updated_at = datetime.now(timezone.utc)
+    touch_visits(db, [visit_id])
     await db.commit()
     await recalculate_visit(visit_id, db)
     await db.refresh(visit)
@@ -88,13 +106,20 @@ async def set_flag_long(db: AsyncSession, visit_id: int, value: bool) -> Visit:
 
 
 async def update_participants(db: AsyncSession, visit_id: int, user_ids: list[int]) -> Visit:
+    before = await visit_dependencies(db, visit_id)
+    old_q = await db.execute(
+        select(VisitParticipant.user_id).where(VisitParticipant.visit_id == visit_id)
+    )
+    old_ids = set(old_q.scalars().all())
+    touch_visits(db, [visit_id])
     await db.execute(
         delete(VisitParticipant).where(VisitParticipant.visit_id == visit_id)
     )
     for uid in set(user_ids):
         db.add(VisitParticipant(visit_id=visit_id, user_id=uid))
-    await db.commit()
-    await recalculate_visit(visit_id, db)
+    await db.flush()
+    await refresh_visit_counts(db, old_ids ^ set(user_ids))
+    await recalculate_cascade(db, visit_id, before)
     q = await db.execute(select(Visit).where(Visit.id == visit_id))
     return q.scalar_one()
 
@@ -102,9 +127,14 @@ async def update_participants(db: AsyncSession, visit_id: int, user_ids: list[in
 async def set_visit_status(db: AsyncSession, visit_id: int, status: str) -> Visit:
     q = await db.execute(select(Visit).where(Visit.id == visit_id))
     visit = q.scalar_one()
+    before = await visit_dependencies(db, visit_id)
     visit.status = status
-    visit.updated_at = datetime.now(timezone.utc)
-    await db.commit()
-    await recalculate_visit(visit_id, db)
+    touch_visits(db, [visit_id])
+    await db.flush()
+    parts_q = await db.execute(
+        select(VisitParticipant.user_id).where(VisitParticipant.visit_id == visit_id)
+    )
+    await refresh_visit_counts(db, parts_q.scalars().all())
+    await recalculate_cascade(db, visit_id, before)
     await db.refresh(visit)
     return visit
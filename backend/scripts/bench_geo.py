@@ -0,0 +1,90 @@
+"""Benchmark the bath spatial index (app.services.geo.GeoGrid).
+
+Fills a grid with --points synthetic baths, most of them clustered around
+a few cities and the rest spread over the globe, and times per query
+(median over --repeat runs):
+
+    nearest    GeoGrid.nearest(k) at a city, in the countryside and in an
+               empty ocean
+    within     GeoGrid.within(radius)
+    scan       a NumPy haversine pass over every point (the baseline)
+    update     moving one point (put) and removing it (discard)
+
+No database is needed. Usage (from backend/):
+    python scripts/bench_geo.py [--points 100000] [--repeat 200]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.services.geo import GeoGrid, haversine_km  # noqa: E402
+
+CITIES = [(55.7558, 37.6173), (59.9343, 30.3351), (56.8389, 60.6057), (43.5855, 39.7231), (60.1699, 24.9384)]
+PLACES = {
+    "city": (55.7558, 37.6173),
+    "countryside": (57.5, 45.0),
+    "ocean": (-40.0, -120.0),
+}
+
+
+def _timed(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the bath spatial index")
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    grid = GeoGrid()
+    coords = np.empty((args.points, 2))
+    start = time.perf_counter()
+    for i in range(args.points):
+        if i % 10 == 0:
+            lat, lng = rng.uniform(-60, 70), rng.uniform(-180, 180)
+        else:
+            city_lat, city_lng = rng.choice(CITIES)
+            lat, lng = rng.gauss(city_lat, 1.0), rng.gauss(city_lng, 2.0)
+        coords[i] = lat, lng
+        grid.put(i, lat, lng)
+    print(f"Indexed {args.points} points in {time.perf_counter() - start:.2f}s\n")
+
+    print(f"{'query':<28} {'median us':>10} {'found':>6}")
+    for place, (lat, lng) in PLACES.items():
+        for k in (1, 10, 50):
+            us = _timed(lambda: grid.nearest(lat, lng, k), args.repeat)
+            print(f"{f'nearest k={k} {place}':<28} {us:>10.1f} {len(grid.nearest(lat, lng, k)):>6}")
+        for radius in (5, 25):
+            us = _timed(lambda: grid.within(lat, lng, radius), args.repeat)
+            print(f"{f'within {radius}km {place}':<28} {us:>10.1f} {len(grid.within(lat, lng, radius)):>6}")
+        us = _timed(lambda: np.argmin(haversine_km(lat, lng, coords[:, 0], coords[:, 1])), args.repeat)
+        print(f"{f'scan {place}':<28} {us:>10.1f}")
+
+    def move() -> None:
+        point_id = rng.randrange(args.points)
+        grid.put(point_id, rng.uniform(-60, 70), rng.uniform(-180, 180))
+
+    def remove() -> None:
+        grid.discard(rng.randrange(args.points))
+
+    print(f"{'update put':<28} {_timed(move, args.repeat):>10.1f}")
+    print(f"{'update discard':<28} {_timed(remove, args.repeat):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
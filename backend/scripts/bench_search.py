@@ -0,0 +1,161 @@
+"""Benchmark bath and user search on a synthetic catalogue.
+
+Creates a scratch schema (bench_search) in DATABASE_URL with --rows
+synthetic baths and users, builds the pg_trgm indexes of migration 010 on
+them and times, per query:
+
+    ilike      the old unindexed ``name ILIKE '%q%'``
+    contains   app.services.search in "contains" mode (trigram index)
+    similar    app.services.search in "similar" mode (trigram index, ranked)
+
+The service functions run unchanged; search_path points them at the scratch
+tables. The schema is dropped afterwards unless --keep is given.
+
+Usage (from backend/):
+    python scripts/bench_search.py [--rows 100000] [--repeat 20] [--keep]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sqlalchemy import func, select, text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.models import Bath, Country, Region, User  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.services import search as search_svc  # noqa: E402
+
+SCHEMA = "bench_search"
+WORDS = [
+    "сандуны", "кедровая", "берёзка", "хаммам", "финская", "русская", "лесная",
+    "озёрная", "парная", "терма", "вена", "seleny", "riverside", "wellness",
+    "spa", "banya", "mountain", "сибирь", "самовар", "дубовая",
+]
+# (label, query): exact words, a prefix, typos and a transliteration
+QUERIES = [
+    ("word", "сандуны"),
+    ("prefix", "кедр"),
+    ("typo", "сондуны"),
+    ("typo", "хамам"),
+    ("two words", "лесная парная"),
+    ("latin", "riversde"),
+]
+
+FILL_SQL = """
+    WITH words AS (SELECT CAST(:words AS text[]) AS w, cardinality(CAST(:words AS text[])) AS n)
+    INSERT INTO baths (name, aliases, is_archived, created_at)
+    SELECT initcap(w[1 + floor(random() * n)::int]) || ' ' || w[1 + floor(random() * n)::int] || ' ' || i,
+           CASE WHEN i % 3 = 0
+                THEN ARRAY[w[1 + floor(random() * n)::int] || ' ' || w[1 + floor(random() * n)::int]]
+                ELSE '{}'::varchar[] END,
+           false, now()
+    FROM generate_series(1, :rows) AS i, words
+"""
+FILL_USERS_SQL = """
+    WITH words AS (SELECT CAST(:words AS text[]) AS w, cardinality(CAST(:words AS text[])) AS n)
+    INSERT INTO users (id, full_name, username, is_admin, is_active, created_at)
+    SELECT i, initcap(w[1 + floor(random() * n)::int]) || ' ' || initcap(w[1 + floor(random() * n)::int]),
+           'user_' || w[1 + floor(random() * n)::int] || i, false, true, now()
+    FROM generate_series(1, :rows) AS i, words
+"""
+
+
+async def _timed(fn, repeat: int) -> tuple[float, int]:
+    times = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(await fn())
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, rows
+
+
+async def run(args: argparse.Namespace) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[Country.__table__, Region.__table__, User.__table__, Bath.__table__],
+        )
+        start = time.perf_counter()
+        await conn.execute(text(FILL_SQL), {"words": WORDS, "rows": args.rows})
+        await conn.execute(text(FILL_USERS_SQL), {"words": WORDS, "rows": args.rows})
+        await conn.commit()
+        print(f"Inserted {args.rows} baths and {args.rows} users in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        await search_svc.ensure_search_functions(conn)
+        await search_svc.ensure_trigram(conn)
+        await conn.execute(text("ANALYZE baths"))
+        await conn.execute(text("ANALYZE users"))
+        await conn.commit()
+        print(f"Built trigram indexes in {time.perf_counter() - start:.1f}s\n")
+
+        try:
+            async with AsyncSession(bind=conn) as db:
+                await _bench(db, args.repeat)
+        finally:
+            await conn.rollback()
+            if not args.keep:
+                await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+                await conn.commit()
+    await engine.dispose()
+
+
+async def _bench(db: AsyncSession, repeat: int) -> None:
+    async def ilike(q: str) -> list:
+        rows = await db.execute(
+            select(Bath).where(Bath.is_archived == False, Bath.name.ilike(f"%{q}%"))
+            .order_by(Bath.name).limit(50)
+        )
+        return rows.scalars().all()
+
+    print(f"{'table':<6} {'query':<22} {'mode':<9} {'median ms':>10} {'rows':>5}")
+    for label, q in QUERIES:
+        cases = [
+            ("ilike", lambda q=q: ilike(q)),
+            ("contains", lambda q=q: search_svc.search_baths(db, q, "contains")),
+            ("similar", lambda q=q: search_svc.search_baths(db, q, "similar")),
+        ]
+        for mode, fn in cases:
+            ms, rows = await _timed(fn, repeat)
+            print(f"{'baths':<6} {f'{q} ({label})':<22} {mode:<9} {ms:>10.2f} {rows:>5}")
+        top = await search_svc.search_baths(db, q, "similar", limit=3)
+        print(f"{'':<6} {'':<22} best: {', '.join(f'{b.name} ({s:.2f})' for b, s in top)}")
+
+    for q in ["Сандуны", "сондуны", "user_hamam"]:
+        for mode in ("contains", "similar"):
+            ms, rows = await _timed(lambda: search_svc.search_users(db, q, mode), repeat)
+            print(f"{'users':<6} {q:<22} {mode:<9} {ms:>10.2f} {rows:>5}")
+
+    count = (await db.execute(select(func.count()).select_from(Bath))).scalar()
+    plan = await db.execute(
+        text("EXPLAIN SELECT id FROM baths WHERE bath_search_text(name, aliases) ILIKE '%кедр%'")
+    )
+    print(f"\nPlan for 'contains' over {count} baths:")
+    for (line,) in plan.all():
+        print(f"  {line}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark trigram bath/user search")
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic baths and users")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query (median is reported)")
+    parser.add_argument("--keep", action="store_true", help=f"Keep the {SCHEMA} schema")
+    try:
+        asyncio.run(run(parser.parse_args()))
+    except OSError as e:
+        sys.exit(f"Cannot reach PostgreSQL at DATABASE_URL ({e}); the benchmark needs a server with pg_trgm")
+
+
+if __name__ == "__main__":
+    main()
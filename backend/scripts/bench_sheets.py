@@ -0,0 +1,196 @@
+"""Benchmark the Sheets-backed API endpoints against the fake Sheets server.
+
+Runs the FastAPI app in-process (no lifespan, authentication bypassed) with
+LEADERBOARD_SOURCE=sheets, pointed at scripts/fake_sheets.py serving a
+fixture workbook, and measures for /api/leaderboard, /api/visits/weekly and
+/api/baths/map:
+
+    cold        latency with the Sheets cache cleared before every request
+    warm        sequential latency once the cache is primed
+    throughput  warm requests/s from --concurrency parallel clients
+
+Usage (from backend/):
+    python scripts/bench_sheets.py ../ЕБЛ.xlsx [--latency 0.15] [--jitter 0.05]
+        [--cold 10] [--requests 200] [--concurrency 20] [--duration 5]
+        [--json results.json]
+
+With --sheets-url the app talks to an already running fake server (or any
+other Sheets endpoint) instead of starting one. Snapshots are persisted to
+DATABASE_URL as usual; without a database that step only logs a warning.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import sys
+import time
+
+import aiohttp
+import uvicorn
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.config import settings  # noqa: E402
+
+ENDPOINTS = {
+    "leaderboard": "/api/leaderboard",
+    "weekly": "/api/visits/weekly?week={week}",
+    "bath_map": "/api/baths/map",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _summary(latencies: list[float]) -> dict:
+    ordered = sorted(latencies)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        "n": len(ordered),
+        "p50_ms": round(pct(0.50), 2),
+        "p95_ms": round(pct(0.95), 2),
+        "p99_ms": round(pct(0.99), 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+async def _get(session: aiohttp.ClientSession, url: str) -> float:
+    start = time.perf_counter()
+    async with session.get(url) as resp:
+        body = await resp.read()
+        if resp.status != 200:
+            raise RuntimeError(f"GET {url}: {resp.status} {body[:200]!r}")
+    return time.perf_counter() - start
+
+
+async def _bench_endpoint(session: aiohttp.ClientSession, url: str, args: argparse.Namespace) -> dict:
+    from app.services import sheets as sheets_svc
+
+    cold = []
+    for _ in range(args.cold):
+        sheets_svc.clear_cache()
+        cold.append(await _get(session, url))
+
+    await _get(session, url)  # prime
+    warm = [await _get(session, url) for _ in range(args.requests)]
+
+    latencies: list[float] = []
+    deadline = time.perf_counter() + args.duration
+
+    async def client() -> None:
+        while time.perf_counter() < deadline:
+            latencies.append(await _get(session, url))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "cold": _summary(cold) if cold else None,
+        "warm": _summary(warm) if warm else None,
+        "throughput": {
+            **_summary(latencies),
+            "concurrency": args.concurrency,
+            "rps": round(len(latencies) / elapsed, 1),
+        },
+    }
+
+
+def _print_results(results: dict) -> None:
+    print(f"{'endpoint':<12} {'mode':<11} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'req/s':>8}")
+    for name, modes in results.items():
+        for mode, s in modes.items():
+            if s is None:
+                continue
+            rps = f"{s['rps']:>8}" if "rps" in s else f"{'':>8}"
+            print(
+                f"{name:<12} {mode:<11} {s['n']:>6} {s['p50_ms']:>9} {s['p95_ms']:>9} "
+                f"{s['p99_ms']:>9} {s['max_ms']:>9} {rps}"
+            )
+
+
+async def run(args: argparse.Namespace) -> dict:
+    settings.GOOGLE_SHEETS_AUTH = False
+    settings.LEADERBOARD_SOURCE = "sheets"
+    settings.SHEETS_EXPORT_SPREADSHEET_ID = ""
+
+    fake_runner = None
+    fake = None
+    if args.sheets_url:
+        settings.GOOGLE_SHEETS_API_URL = args.sheets_url
+    else:
+        from fake_sheets import FakeSheets, parse_workbooks, start
+
+        fake = FakeSheets(parse_workbooks(args.workbooks), args.latency, args.jitter, args.error_rate)
+        fake_runner, settings.GOOGLE_SHEETS_API_URL = await start(fake)
+
+    from app.api.deps import get_current_user
+    from app.db.models import User
+    from app.main import app
+    from app.services import sheets as sheets_svc
+
+    logging.getLogger().setLevel(logging.WARNING)
+    # "Could not persist Sheets snapshot" on every cold request without a DB
+    logging.getLogger("app.services.sheets").setLevel(logging.ERROR)
+    app.dependency_overrides[get_current_user] = lambda: User(id=0, full_name="bench", is_admin=True)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, lifespan="off", log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    results = {}
+    try:
+        connector = aiohttp.TCPConnector(limit=args.concurrency)
+        async with aiohttp.ClientSession(f"http://127.0.0.1:{port}", connector=connector) as session:
+            for name, path in ENDPOINTS.items():
+                if args.only and name not in args.only:
+                    continue
+                results[name] = await _bench_endpoint(session, path.format(week=args.week), args)
+    finally:
+        server.should_exit = True
+        await server_task
+        await sheets_svc.close_clients()
+        if fake_runner is not None:
+            await fake_runner.cleanup()
+
+    _print_results(results)
+    print(f"\nsheets cache: {sheets_svc.cache_stats()}")
+    if fake is not None:
+        print(f"fake sheets calls: {dict(fake.stats)}")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Sheets-backed endpoints")
+    parser.add_argument("workbooks", nargs="*", default=["../ЕБЛ.xlsx"], help="[SPREADSHEET_ID=]path.xlsx")
+    parser.add_argument("--sheets-url", default=None, help="Use this Sheets API base URL instead of a fake server")
+    parser.add_argument("--latency", type=float, default=0.15, help="Fake Sheets latency per call, seconds")
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--cold", type=int, default=10, help="Cold requests per endpoint")
+    parser.add_argument("--requests", type=int, default=200, help="Warm sequential requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=5, help="Seconds of the throughput run")
+    parser.add_argument("--week", type=int, default=1, help="Week for /api/visits/weekly")
+    parser.add_argument("--only", nargs="+", choices=list(ENDPOINTS), help="Benchmark these endpoints only")
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+"""Local stand-in for the Google Sheets v4 API, backed by .xlsx workbooks.
+
+Serves the calls SheetsClient makes (spreadsheet properties, values:batchGet,
+values/{range}, values:batchUpdate and spreadsheets:batchUpdate) from
+workbooks loaded into memory, with optional latency and error injection.
+Writes change the in-memory grids only.
+
+Usage (from backend/):
+    python scripts/fake_sheets.py ../ЕБЛ.xlsx [--port 8090] [--latency 0.2]
+        [--jitter 0.1] [--error-rate 0.05] [--error-status 503]
+
+    GOOGLE_SHEETS_API_URL=http://127.0.0.1:8090/v4 GOOGLE_SHEETS_AUTH=false \\
+        uvicorn app.main:app
+
+A workbook argument may be given as ID=path to serve it under one
+spreadsheet id only; a plain path is served for every other id.
+
+Control endpoints:
+    GET/POST /_fake/config   latency, jitter, error_rate, error_status (JSON)
+    GET      /_fake/stats    request and error counts per call
+    POST     /_fake/reload   re-read the workbooks from disk
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+import openpyxl
+from aiohttp import web
+
+logger = logging.getLogger("fake_sheets")
+
+DEFAULT_ROW_COUNT = 1000
+DEFAULT_KEY = "*"
+
+
+def _format(value) -> str:
+    """Cell value as the API renders it (FORMATTED_VALUE, roughly)."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime):
+        return value.strftime("%d.%m.%Y %H:%M:%S")
+    if isinstance(value, date):
+        return value.strftime("%d.%m.%Y")
+    return str(value)
+
+
+def _trim(rows: list[list[str]]) -> list[list[str]]:
+    """Drop trailing empty cells and rows, like the API does."""
+    out = []
+    for row in rows:
+        end = len(row)
+        while end and row[end - 1] == "":
+            end -= 1
+        out.append(row[:end])
+    while out and not out[-1]:
+        out.pop()
+    return out
+
+
+@dataclass
+class Sheet:
+    sheet_id: int
+    title: str
+    rows: list[list[str]]
+    row_count: int
+    column_count: int = 26
+
+
+@dataclass
+class Spreadsheet:
+    path: str | None
+    sheets: dict[str, Sheet] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: str) -> "Spreadsheet":
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            book = cls(path)
+            for i, ws in enumerate(wb.worksheets):
+                rows = _trim([[_format(v) for v in row] for row in ws.iter_rows(values_only=True)])
+                width = max((len(r) for r in rows), default=0)
+                book.sheets[ws.title] = Sheet(
+                    i, ws.title, rows, max(len(rows), DEFAULT_ROW_COUNT), max(width, 26)
+                )
+        finally:
+            wb.close()
+        return book
+
+    def copy(self) -> "Spreadsheet":
+        return Spreadsheet(self.path, {
+            title: Sheet(s.sheet_id, s.title, [row[:] for row in s.rows], s.row_count, s.column_count)
+            for title, s in self.sheets.items()
+        })
+
+    def sheet(self, title: str) -> Sheet:
+        if title in self.sheets:
+            return self.sheets[title]
+        for sheet in self.sheets.values():  # sheet names in ranges are case-insensitive
+            if sheet.title.lower() == title.lower():
+                return sheet
+        raise BadRequest(f"Unable to parse range: {title}")
+
+
+class BadRequest(Exception):
+    pass
+
+
+# ---------------------------------------------------------------------------
+# A1 ranges
+# ---------------------------------------------------------------------------
+
+_CELL = re.compile(r"([A-Za-z]*)(\d*)")
+
+
+def _column_index(letters: str) -> int:
+    n = 0
+    for ch in letters.upper():
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+
+def parse_range(rng: str) -> tuple[str, int, int, int | None, int | None]:
+    """'Sheet'!A1:C10 -> (title, row0, col0, row1, col1), ends exclusive or None."""
+    if "!" in rng:
+        title, _, cells = rng.rpartition("!")
+    else:
+        title, cells = rng, ""
+    if title.startswith("'") and title.endswith("'"):
+        title = title[1:-1].replace("''", "'")
+    if not cells:
+        return title, 0, 0, None, None
+    start, _, end = cells.partition(":")
+    end = end or start
+    m1, m2 = _CELL.fullmatch(start), _CELL.fullmatch(end)
+    if not m1 or not m2:
+        raise BadRequest(f"Unable to parse range: {rng}")
+    row0 = int(m1.group(2)) - 1 if m1.group(2) else 0
+    col0 = _column_index(m1.group(1)) if m1.group(1) else 0
+    row1 = int(m2.group(2)) if m2.group(2) else None
+    col1 = _column_index(m2.group(1)) + 1 if m2.group(1) else None
+    return title, row0, col0, row1, col1
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class FakeSheets:
+    def __init__(
+        self,
+        workbooks: dict[str, str],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+    ):
+        self.paths = workbooks  # {spreadsheet id or DEFAULT_KEY: path}
+        self.books: dict[str, Spreadsheet] = {}
+        self.config = {
+            "latency": latency, "jitter": jitter,
+            "error_rate": error_rate, "error_status": error_status,
+        }
+        self.stats: Counter = Counter()
+        self.reload()
+
+    def reload(self) -> None:
+        self.books = {key: Spreadsheet.load(path) for key, path in self.paths.items()}
+
+    def book(self, spreadsheet_id: str) -> Spreadsheet:
+        book = self.books.get(spreadsheet_id) or self.books.get(DEFAULT_KEY)
+        if book is None:
+            raise web.HTTPNotFound(
+                text=_error_body(404, "Requested entity was not found."), content_type="application/json"
+            )
+        if spreadsheet_id not in self.books:
+            # Writes to an id served by the default workbook must not leak into other ids
+            book = book.copy()
+            self.books[spreadsheet_id] = book
+        return book
+
+    # -- middleware -----------------------------------------------------------
+
+    @web.middleware
+    async def inject(self, request: web.Request, handler):
+        if request.path.startswith("/_fake/"):
+            return await handler(request)
+        call = request.match_info.route.name or request.path
+        self.stats[call] += 1
+        delay = self.config["latency"] + random.uniform(0, self.config["jitter"])
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if random.random() < self.config["error_rate"]:
+            self.stats["injected_errors"] += 1
+            status = int(self.config["error_status"])
+            return web.json_response(_error_obj(status, "Injected error"), status=status)
+        try:
+            return await handler(request)
+        except BadRequest as e:
+            return web.json_response(_error_obj(400, str(e)), status=400)
+
+    # -- Sheets API -------------------------------------------------------------
+
+    async def get_spreadsheet(self, request: web.Request) -> web.Response:
+        book = self.book(request.match_info["id"])
+        return web.json_response({
+            "spreadsheetId": request.match_info["id"],
+            "sheets": [
+                {"properties": {
+                    "sheetId": s.sheet_id,
+                    "title": s.title,
+                    "index": s.sheet_id,
+                    "gridProperties": {"rowCount": s.row_count, "columnCount": s.column_count},
+                }}
+                for s in book.sheets.values()
+            ],
+        })
+
+    def _read(self, book: Spreadsheet, rng: str) -> dict:
+        title, row0, col0, row1, col1 = parse_range(rng)
+        sheet = book.sheet(title)
+        rows = [row[col0:col1] for row in sheet.rows[row0:row1]]
+        return {"range": rng, "majorDimension": "ROWS", "values": _trim(rows)}
+
+    async def batch_get(self, request: web.Request) -> web.Response:
+        book = self.book(request.match_info["id"])
+        ranges = request.query.getall("ranges", [])
+        return web.json_response({
+            "spreadsheetId": request.match_info["id"],
+            "valueRanges": [self._read(book, rng) for rng in ranges],
+        })
+
+    async def get_values(self, request: web.Request) -> web.Response:
+        book = self.book(request.match_info["id"])
+        return web.json_response(self._read(book, request.match_info["range"]))
+
+    async def batch_update_values(self, request: web.Request) -> web.Response:
+        book = self.book(request.match_info["id"])
+        body = await request.json()
+        cells = 0
+        for block in body.get("data", []):
+            title, row0, col0, _, _ = parse_range(block["range"])
+            sheet = book.sheet(title)
+            for r, values in enumerate(block.get("values", [])):
+                row_index = row0 + r
+                if row_index >= sheet.row_count:
+                    raise BadRequest(f"Range {block['range']} exceeds grid limits")
+                while len(sheet.rows) <= row_index:
+                    sheet.rows.append([])
+                row = sheet.rows[row_index]
+                if len(row) < col0 + len(values):
+                    row.extend([""] * (col0 + len(values) - len(row)))
+                row[col0:col0 + len(values)] = [_format(v) for v in values]
+                cells += len(values)
+        return web.json_response({"spreadsheetId": request.match_info["id"], "totalUpdatedCells": cells})
+
+    async def batch_update(self, request: web.Request) -> web.Response:
+        book = self.book(request.match_info["id"])
+        body = await request.json()
+        replies = []
+        for req in body.get("requests", []):
+            if "addSheet" in req:
+                title = req["addSheet"].get("properties", {}).get("title")
+                if not title or title in book.sheets:
+                    raise BadRequest(f"Invalid addSheet: {title!r}")
+                sheet = Sheet(max((s.sheet_id for s in book.sheets.values()), default=-1) + 1,
+                              title, [], DEFAULT_ROW_COUNT)
+                book.sheets[title] = sheet
+                replies.append({"addSheet": {"properties": {
+                    "sheetId": sheet.sheet_id, "title": title,
+                    "gridProperties": {"rowCount": sheet.row_count, "columnCount": sheet.column_count},
+                }}})
+            elif "appendDimension" in req:
+                dim = req["appendDimension"]
+                sheet = next((s for s in book.sheets.values() if s.sheet_id == dim["sheetId"]), None)
+                if sheet is None:
+                    raise BadRequest(f"No grid with id: {dim['sheetId']}")
+                if dim.get("dimension") == "ROWS":
+                    sheet.row_count += dim["length"]
+                else:
+                    sheet.column_count += dim["length"]
+                replies.append({})
+            else:
+                raise BadRequest(f"Unsupported request: {', '.join(req)}")
+        return web.json_response({"spreadsheetId": request.match_info["id"], "replies": replies})
+
+    # -- control ---------------------------------------------------------------
+
+    async def get_config(self, request: web.Request) -> web.Response:
+        return web.json_response(self.config)
+
+    async def set_config(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        for key, value in body.items():
+            if key in self.config:
+                self.config[key] = type(self.config[key])(value)
+        return web.json_response(self.config)
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(dict(self.stats))
+
+    async def post_reload(self, request: web.Request) -> web.Response:
+        await asyncio.to_thread(self.reload)
+        return web.json_response({"reloaded": list(self.paths)})
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.inject])
+        sid = "{id:[^/:]+}"
+        app.router.add_get(f"/v4/spreadsheets/{sid}", self.get_spreadsheet, name="get")
+        app.router.add_get(f"/v4/spreadsheets/{sid}/values:batchGet", self.batch_get, name="values.batchGet")
+        app.router.add_post(
+            f"/v4/spreadsheets/{sid}/values:batchUpdate", self.batch_update_values, name="values.batchUpdate"
+        )
+        app.router.add_get(f"/v4/spreadsheets/{sid}/values/{{range}}", self.get_values, name="values.get")
+        app.router.add_post(f"/v4/spreadsheets/{sid}:batchUpdate", self.batch_update, name="batchUpdate")
+        app.router.add_get("/_fake/config", self.get_config)
+        app.router.add_post("/_fake/config", self.set_config)
+        app.router.add_get("/_fake/stats", self.get_stats)
+        app.router.add_post("/_fake/reload", self.post_reload)
+        return app
+
+
+def _error_obj(status: int, message: str) -> dict:
+    reasons = {400: "INVALID_ARGUMENT", 404: "NOT_FOUND", 429: "RESOURCE_EXHAUSTED"}
+    return {"error": {"code": status, "message": message, "status": reasons.get(status, "UNAVAILABLE")}}
+
+
+def _error_body(status: int, message: str) -> str:
+    return json.dumps(_error_obj(status, message))
+
+
+def parse_workbooks(args: list[str]) -> dict[str, str]:
+    books = {}
+    for arg in args:
+        key, sep, path = arg.partition("=")
+        books[key if sep else DEFAULT_KEY] = path if sep else arg
+    return books
+
+
+async def start(fake: FakeSheets, host: str = "127.0.0.1", port: int = 0) -> tuple[web.AppRunner, str]:
+    """Start *fake* on the running loop; returns the runner and the API base URL."""
+    runner = web.AppRunner(fake.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound = runner.addresses[0][1]
+    return runner, f"http://{host}:{bound}/v4"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Google Sheets v4 API backed by .xlsx files")
+    parser.add_argument("workbooks", nargs="+", help="[SPREADSHEET_ID=]path.xlsx")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra seconds, 0..jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="Status of injected failures")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    fake = FakeSheets(
+        parse_workbooks(args.workbooks), args.latency, args.jitter, args.error_rate, args.error_status
+    )
+    logger.info(f"Serving {', '.join(args.workbooks)} on http://{args.host}:{args.port}/v4")
+    web.run_app(fake.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()